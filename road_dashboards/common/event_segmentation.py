@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = ["startframe", "endframe", "event_length"]
+
+# gaps and islands partitioned by clip, so Athena sorts every clip on its own instead of the whole dataset on one worker
+EVENTS_QUERY = """
+    SELECT "{clip_column}",
+    CAST(MIN("{frame_column}") AS INTEGER) AS "startframe",
+    CAST(MAX("{frame_column}") AS INTEGER) AS "endframe",
+    CAST(MAX("{frame_column}") - MIN("{frame_column}") + 1 AS INTEGER) AS "event_length"{extra_columns}
+    FROM (
+        SELECT *, SUM("is_new_event") OVER (
+            PARTITION BY "{clip_column}" ORDER BY "{frame_column}" ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS "event_id"
+        FROM (
+            SELECT *, CASE
+                WHEN "{frame_column}" - LAG("{frame_column}") OVER (
+                    PARTITION BY "{clip_column}" ORDER BY "{frame_column}"
+                ) <= {diff_tolerance} THEN 0
+                ELSE 1
+            END AS "is_new_event"
+            FROM ({frames_query})
+        )
+    )
+    GROUP BY "{clip_column}", "event_id"
+    {length_filter}
+    {limit}
+    """
+
+
+def generate_events_query(
+    frames_query,
+    extra_columns=(),
+    diff_tolerance=0,
+    min_event_length=None,
+    max_event_length=None,
+    limit=None,
+    clip_column="clip_name",
+    frame_column="grabindex",
+):
+    """
+    Groups the frames of frames_query (one row per frame) to events: runs of frames of a clip whose consecutive
+    frames are at most diff_tolerance apart. Every event gets its start / end frame, its length in frames
+    and an arbitrary value of each of extra_columns, events shorter than min_event_length or longer than
+    max_event_length are dropped.
+    """
+    extra_columns = "".join(f', ARBITRARY("{column}") AS "{column}"' for column in extra_columns)
+    length_conditions = get_event_length_conditions(
+        f'MAX("{frame_column}") - MIN("{frame_column}") + 1', min_event_length, max_event_length
+    )
+    query = EVENTS_QUERY.format(
+        frames_query=frames_query,
+        extra_columns=extra_columns,
+        diff_tolerance=diff_tolerance,
+        clip_column=clip_column,
+        frame_column=frame_column,
+        length_filter=f"HAVING {' AND '.join(length_conditions)}" if length_conditions else "",
+        limit=f"LIMIT {limit}" if limit is not None else "",
+    )
+    return query
+
+
+def get_event_length_conditions(event_length, min_event_length=None, max_event_length=None):
+    conditions = []
+    if min_event_length is not None:
+        conditions.append(f"{event_length} >= {min_event_length}")
+    if max_event_length is not None:
+        conditions.append(f"{event_length} <= {max_event_length}")
+    return conditions
+
+
+def get_event_ids(clip_names, frames, diff_tolerance=0):
+    """The event of every frame, for frames sorted by (clip, frame), with the same grouping as generate_events_query"""
+    clip_names = np.asarray(clip_names)
+    frames = np.asarray(frames, dtype=np.int64)
+    is_new_event = np.ones(frames.size, dtype=bool)
+    is_new_event[1:] = (clip_names[1:] != clip_names[:-1]) | (np.diff(frames) > diff_tolerance)
+    return np.cumsum(is_new_event) - 1
+
+
+def segment_events(
+    clip_names,
+    frames,
+    diff_tolerance=0,
+    min_event_length=None,
+    max_event_length=None,
+    is_sorted=True,
+    clip_column="clip_name",
+):
+    """
+    Local equivalent of generate_events_query over frames already in memory.
+    Returns a DataFrame of the events (clip, startframe, endframe, event_length), ordered by clip and start frame.
+    """
+    clip_names = np.asarray(clip_names)
+    frames = np.asarray(frames, dtype=np.int64)
+    if not is_sorted:
+        order = np.lexsort((frames, clip_names))
+        clip_names, frames = clip_names[order], frames[order]
+    if frames.size == 0:
+        return pd.DataFrame(columns=[clip_column] + EVENT_COLUMNS)
+
+    event_ids = get_event_ids(clip_names, frames, diff_tolerance)
+    starts = np.flatnonzero(np.diff(event_ids, prepend=-1))
+    ends = np.append(starts[1:], frames.size) - 1
+    events = pd.DataFrame(
+        {
+            clip_column: clip_names[starts],
+            "startframe": frames[starts],
+            "endframe": frames[ends],
+            "event_length": frames[ends] - frames[starts] + 1,
+        }
+    )
+
+    length_filter = np.ones(len(events), dtype=bool)
+    if min_event_length is not None:
+        length_filter &= events["event_length"].to_numpy() >= min_event_length
+    if max_event_length is not None:
+        length_filter &= events["event_length"].to_numpy() <= max_event_length
+    return events[length_filter].reset_index(drop=True)
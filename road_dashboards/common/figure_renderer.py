@@ -0,0 +1,85 @@
+import hashlib
+import os
+from queue import Queue
+from threading import Lock, Thread
+
+import orjson
+import plotly.graph_objects as go
+from kaleido.scopes.plotly import PlotlyScope
+from loguru import logger
+
+from road_dashboards.common.lru_cache import LRUCache
+
+FIGURE_RENDERER_POOL_SIZE = int(os.environ.get("FIGURE_RENDERER_POOL_SIZE", 2))
+FIGURE_RENDERER_CACHE_ENTRIES = int(os.environ.get("FIGURE_RENDERER_CACHE_ENTRIES", 256))
+
+
+def get_figure_id(figure: dict | go.Figure) -> str:
+    figure = figure.to_plotly_json() if isinstance(figure, go.Figure) else figure
+    figure_json = orjson.dumps(figure, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return hashlib.sha256(figure_json).hexdigest()
+
+
+class FigureRenderer:
+    """
+    Renders plotly figures to PNG on a pool of warm Kaleido processes.
+    Rendered images are cached by figure id, so copying / downloading / exporting the same figure again
+    skips Kaleido, and callers that already rendered a figure can refer to it by id alone.
+    """
+
+    def __init__(self, pool_size: int = FIGURE_RENDERER_POOL_SIZE, cache_entries: int = FIGURE_RENDERER_CACHE_ENTRIES):
+        self.pool_size = pool_size
+        self._images = LRUCache(maxsize=cache_entries)
+        self._scopes: Queue[PlotlyScope] = Queue()
+        self._started = False
+        self._lock = Lock()
+
+    def warm_up(self):
+        """Starts the Kaleido processes in the background, so the first render doesn't pay their startup"""
+        Thread(target=self._warm_up, name="figure-renderer-warm-up", daemon=True).start()
+
+    def render_png(self, figure: dict | go.Figure | None, figure_id: str | None = None) -> bytes | None:
+        """
+        The PNG of the figure, rendered once per figure id (computed from the figure if not given).
+        Returns None if only an id is given and it is not in the cache.
+        """
+        if figure_id is None and figure is None:
+            return None
+
+        figure_id = figure_id or get_figure_id(figure)
+        image_bytes = self._images.get(figure_id)
+        if image_bytes is not None or figure is None:
+            return image_bytes
+
+        figure = go.Figure(figure).to_dict()
+        self._start_scopes()
+        scope = self._scopes.get()
+        try:
+            image_bytes = scope.transform(figure, format="png")
+        finally:
+            self._scopes.put(scope)
+
+        self._images.set(figure_id, image_bytes)
+        return image_bytes
+
+    def _start_scopes(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(self.pool_size):
+                self._scopes.put(PlotlyScope())
+
+    def _warm_up(self):
+        self._start_scopes()
+        for _ in range(self.pool_size):
+            scope = self._scopes.get()
+            try:
+                scope.transform(go.Figure().to_dict(), format="png")
+            except Exception as e:
+                logger.warning(f"Failed to warm up the figure renderer: {e}")
+            finally:
+                self._scopes.put(scope)
+
+
+figure_renderer = FigureRenderer()
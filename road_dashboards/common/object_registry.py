@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle as pkl
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from threading import Lock, get_ident
+
+from road_dashboards.common.private_dir import make_private_dir
+
+OBJECT_REGISTRY_DIR = os.environ.get(
+    "OBJECT_REGISTRY_DIR", os.path.join(tempfile.gettempdir(), "road_dashboards_object_registry")
+)
+OBJECT_REGISTRY_MAX_ENTRIES = int(os.environ.get("OBJECT_REGISTRY_MAX_ENTRIES", 1024))
+OBJECT_REGISTRY_MAX_DISK_BYTES = int(os.environ.get("OBJECT_REGISTRY_MAX_DISK_MB", 1024)) * 2**20
+OBJECT_REGISTRY_TTL_HOURS = float(os.environ.get("OBJECT_REGISTRY_TTL_HOURS", 72))
+OBJECT_REGISTRY_CLEANUP_INTERVAL_SECONDS = 5 * 60
+# a use of an object in memory refreshes the modification time of its payload at most once per this interval
+OBJECT_REGISTRY_TOUCH_INTERVAL_SECONDS = 60 * 60
+HANDLE_PREFIX = "obj:"
+_HANDLE_PATTERN = re.compile(rf"{HANDLE_PREFIX}[0-9a-f]{{20}}")
+
+
+class _Entry:
+    __slots__ = ("obj", "sql", "touched_at")
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.sql = None
+        self.touched_at = time.time()
+
+
+class ObjectRegistry:
+    """
+    Server-side store of session objects (table lists, filters, queries), addressed by a short content hash.
+    Callbacks pass the handle through dcc.Store instead of the serialized object itself.
+    Unpickled objects (and their compiled SQL) are kept in an LRU, the pickled payload is also written to disk
+    so a handle evicted from memory, or created before a restart, can still be resolved.
+    Payloads not used for ttl_hours are deleted, and the oldest ones beyond max_disk_bytes, except those of
+    the objects in memory.
+    Objects registered with pin (the defaults of the page layouts, built once per process) are never evicted,
+    so their handles resolve even if the payload on disk is gone or the disk store is disabled.
+    """
+
+    def __init__(
+        self,
+        storage_dir: str | None = OBJECT_REGISTRY_DIR,
+        max_entries: int = OBJECT_REGISTRY_MAX_ENTRIES,
+        max_disk_bytes: int = OBJECT_REGISTRY_MAX_DISK_BYTES,
+        ttl_hours: float = OBJECT_REGISTRY_TTL_HOURS,
+    ):
+        self.storage_dir = storage_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_hours * 60 * 60
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._pinned: dict[str, _Entry] = {}
+        self._lock = Lock()
+        self._last_cleanup = 0.0
+        if self.storage_dir and not make_private_dir(self.storage_dir):
+            self.storage_dir = None
+
+    def register(self, obj, pin: bool = False) -> str:
+        payload = pkl.dumps(obj, protocol=pkl.HIGHEST_PROTOCOL)
+        handle = HANDLE_PREFIX + hashlib.sha256(payload).hexdigest()[:20]
+        with self._lock:
+            if pin:
+                self._pinned.setdefault(handle, self._entries.pop(handle, None) or _Entry(obj))
+            elif handle in self._pinned:
+                return handle
+            elif handle in self._entries:
+                self._entries.move_to_end(handle)
+                return handle
+            else:
+                self._put(handle, _Entry(obj))
+        self._save(handle, payload)
+        return handle
+
+    def get(self, handle: str):
+        return self._get_entry(handle).obj
+
+    def get_sql(self, handle: str) -> str:
+        entry = self._get_entry(handle)
+        if entry.sql is None:
+            entry.sql = str(entry.obj)
+        return entry.sql
+
+    def __len__(self):
+        return len(self._entries) + len(self._pinned)
+
+    def _get_entry(self, handle: str) -> _Entry:
+        with self._lock:
+            entry = self._pinned.get(handle) or self._entries.get(handle)
+            if entry is not None and handle in self._entries:
+                self._entries.move_to_end(handle)
+        if entry is not None:
+            # keeps the payload of an object used from memory from expiring on disk, in case it's evicted later
+            if self.storage_dir and time.time() - entry.touched_at > OBJECT_REGISTRY_TOUCH_INTERVAL_SECONDS:
+                entry.touched_at = time.time()
+                self._touch(self._path(handle))
+            return entry
+
+        entry = _Entry(self._load(handle))
+        with self._lock:
+            self._put(handle, entry)
+        return entry
+
+    def _put(self, handle: str, entry: _Entry):
+        self._entries[handle] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.storage_dir, f"{handle.removeprefix(HANDLE_PREFIX)}.pkl")
+
+    def _save(self, handle: str, payload: bytes):
+        if not self.storage_dir:
+            return
+        path = self._path(handle)
+        if os.path.exists(path):
+            self._touch(path)
+            return
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if time.time() - self._last_cleanup > OBJECT_REGISTRY_CLEANUP_INTERVAL_SECONDS:
+            self._last_cleanup = time.time()
+            self._enforce_disk_limits()
+
+    def _load(self, handle: str):
+        if not self.storage_dir or not isinstance(handle, str) or not _HANDLE_PATTERN.fullmatch(handle):
+            raise KeyError(f"Unknown object handle: {handle}")
+        path = self._path(handle)
+        try:
+            with open(path, "rb") as f:
+                obj = pkl.load(f)
+        except OSError:
+            raise KeyError(f"Unknown object handle: {handle}")
+        self._touch(path)
+        return obj
+
+    def _enforce_disk_limits(self):
+        with self._lock:
+            in_memory = {self._path(handle) for handle in [*self._entries, *self._pinned]}
+        files = []
+        for name in os.listdir(self.storage_dir):
+            path = os.path.join(self.storage_dir, name)
+            if not name.endswith(".pkl") or path in in_memory:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        expired_before = time.time() - self.ttl_seconds
+        total_size = sum(size for _, size, _ in files)
+        for mtime, size, path in sorted(files):
+            if mtime >= expired_before and total_size <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _touch(path: str):
+        # the modification time of a payload is its last use
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+object_registry = ObjectRegistry()
@@ -0,0 +1,408 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, fields
+from threading import Lock
+from urllib.parse import urlparse
+
+import boto3
+import flask
+import numpy as np
+from loguru import logger
+
+from road_dashboards.common.query_scheduler import get_current_user
+
+PERF_MONITOR_ENABLED = os.environ.get("PERF_MONITOR_ENABLED", "true").lower() != "false"
+PERF_MAX_RECORDS = int(os.environ.get("PERF_MAX_RECORDS", 5000))
+PAGE_MAX_QUERIES = int(os.environ.get("PERF_PAGE_MAX_QUERIES", 100))
+PAGE_MAX_SCANNED_GB = float(os.environ.get("PERF_PAGE_MAX_SCANNED_GB", 50))
+# callbacks of the same user and page closer than this belong to the same page load
+PAGE_LOAD_IDLE_SECONDS = float(os.environ.get("PERF_PAGE_LOAD_IDLE_SECONDS", 10))
+PERF_PAGE_PATH = "/perf"
+PERF_JSON_ROUTE = "/api/perf"
+DASH_CALLBACK_ROUTE = "/_dash-update-component"
+BACKGROUND_PAGE = "background"
+QUERY_WAIT_STAGE = "query_wait"
+FIGURE_STAGE = "figure"
+PREVIEW_LENGTH = 300
+GB = 2**30
+PAGE_TOTALS = ["callbacks", "callback_seconds", "queries", "cached_queries", "executed_queries", "scanned_bytes"]
+
+_ATHENA_EXECUTION_ID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+@dataclass
+class PageLoad:
+    load_id: int
+    page: str
+    user: str
+    started_at: float
+    last_activity: float
+    callbacks: int = 0
+    queries: int = 0
+    scanned_bytes: int = 0
+    over_budget: list[str] = field(default_factory=list)
+
+
+@dataclass
+class CallbackRecord:
+    page: str
+    callback: str
+    user: str
+    load_id: int
+    started_at: float
+    duration_seconds: float = 0.0
+    queries: int = 0
+    scanned_bytes: int = 0
+    stages: dict[str, float] = field(default_factory=dict)
+    # callback time not spent waiting for queries or building figures, mostly pandas post-processing
+    post_processing_seconds: float = 0.0
+    status_code: int | None = None
+    _active_stages: set[str] = field(default_factory=set, repr=False)
+
+
+@dataclass
+class QueryRecord:
+    fingerprint: str
+    source: str
+    page: str
+    callback: str
+    load_id: int | None
+    preview: str
+    submitted_at: float
+    total_seconds: float | None = None
+    queue_seconds: float | None = None
+    engine_seconds: float | None = None
+    scanned_bytes: int | None = None
+    rows: int | None = None
+    cached: bool = False
+    # deduplicated with an identical in-flight query, its cost is counted on that query
+    shared: bool = False
+    executed: bool = False
+    error: str | None = None
+    _callback: CallbackRecord | None = field(default=None, repr=False)
+
+
+@dataclass
+class PageBudget:
+    max_queries: int = PAGE_MAX_QUERIES
+    max_scanned_gb: float = PAGE_MAX_SCANNED_GB
+
+
+def to_dict(record) -> dict:
+    return {f.name: getattr(record, f.name) for f in fields(record) if not f.name.startswith("_")}
+
+
+_current_callback: ContextVar[CallbackRecord | None] = ContextVar("perf_current_callback", default=None)
+
+
+class measure_stage(ContextDecorator):
+    """
+    Adds the time spent in a block (or decorated function) to a stage of the current callback, e.g. FIGURE_STAGE.
+    Nested blocks of the same stage are counted once, outside of a callback it does nothing.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._callback = None
+        self._start = None
+
+    def _recreate_cm(self):
+        # a new instance per call, so a decorated function can run concurrently
+        return measure_stage(self.stage)
+
+    def __enter__(self):
+        callback = _current_callback.get()
+        if callback is not None and self.stage not in callback._active_stages:
+            callback._active_stages.add(self.stage)
+            self._callback = callback
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._callback is not None:
+            self._callback._active_stages.discard(self.stage)
+            add_stage_seconds(self._callback, self.stage, time.perf_counter() - self._start)
+        return False
+
+
+def add_stage_seconds(callback: CallbackRecord | None, stage: str, seconds: float):
+    if callback is not None:
+        callback.stages[stage] = callback.stages.get(stage, 0.0) + seconds
+
+
+class PerfMonitor:
+    """
+    Records the cost and latency of every Dash callback and of the queries it runs, attributed to the page
+    (the referrer of the callback request) and to the page load (callbacks of a user on a page in a burst).
+    Athena statistics (queue / engine time, bytes scanned) are fetched in the background from the execution id
+    in the results path. Page loads exceeding their budget of executed queries or scanned GB log a warning.
+    Recent records are kept in memory, the per page totals since startup are kept aside.
+    """
+
+    def __init__(self, max_records: int = PERF_MAX_RECORDS, enabled: bool = PERF_MONITOR_ENABLED):
+        self.enabled = enabled
+        self.callbacks: deque[CallbackRecord] = deque(maxlen=max_records)
+        self.queries: deque[QueryRecord] = deque(maxlen=max_records)
+        self.default_budget = PageBudget()
+        self.budgets: dict[str, PageBudget] = {}
+        self._page_loads: OrderedDict[int, PageLoad] = OrderedDict()
+        self._current_loads: dict[tuple[str, str], int] = {}
+        self._page_totals: dict[str, dict[str, float]] = {}
+        self._max_records = max_records
+        self._next_load_id = 0
+        self._lock = Lock()
+        self._statistics_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="perf_monitor")
+        self._athena_client = None
+
+    def init_app(self, app, instrument_sqlalchemy: bool = False):
+        """Instruments the callbacks of a Dash app and serves the records at PERF_JSON_ROUTE"""
+        if not self.enabled:
+            return
+        server = app.server
+        server.before_request(self._before_request)
+        server.after_request(self._after_request)
+        server.teardown_request(self._teardown_request)
+        server.add_url_rule(PERF_JSON_ROUTE, "perf_monitor_json", self._serve_json)
+        if instrument_sqlalchemy:
+            self.instrument_sqlalchemy()
+
+    def set_page_budget(
+        self, page: str, max_queries: int = PAGE_MAX_QUERIES, max_scanned_gb: float = PAGE_MAX_SCANNED_GB
+    ):
+        self.budgets[page] = PageBudget(max_queries, max_scanned_gb)
+
+    def current_callback(self) -> CallbackRecord | None:
+        return _current_callback.get()
+
+    def start_callback(self, page: str, callback: str, user: str) -> CallbackRecord:
+        now = time.time()
+        with self._lock:
+            page_load = self._get_page_load(page, user, now)
+            page_load.callbacks += 1
+            record = CallbackRecord(page=page, callback=callback, user=user, load_id=page_load.load_id, started_at=now)
+        return record
+
+    def finish_callback(self, record: CallbackRecord, status_code: int | None = None):
+        record.duration_seconds = time.time() - record.started_at
+        record.status_code = status_code
+        record.post_processing_seconds = max(record.duration_seconds - sum(record.stages.values()), 0.0)
+        with self._lock:
+            self.callbacks.append(record)
+            totals = self._get_page_totals(record.page)
+            totals["callbacks"] += 1
+            totals["callback_seconds"] += record.duration_seconds
+
+    def start_query(self, fingerprint: str, query: str, source: str) -> QueryRecord | None:
+        if not self.enabled:
+            return None
+        callback = _current_callback.get()
+        return QueryRecord(
+            fingerprint=fingerprint[:16],
+            source=source,
+            page=callback.page if callback else BACKGROUND_PAGE,
+            callback=callback.callback if callback else "",
+            load_id=callback.load_id if callback else None,
+            preview=re.sub(r"\s+", " ", query).strip()[:PREVIEW_LENGTH],
+            submitted_at=time.time(),
+            _callback=callback,
+        )
+
+    def finish_query(self, record: QueryRecord | None, rows: int | None = None, error: str | None = None, **stats):
+        if record is None:
+            return
+        record.total_seconds = time.time() - record.submitted_at
+        record.rows = rows
+        record.error = error
+        for name, value in stats.items():
+            setattr(record, name, value)
+        with self._lock:
+            self.queries.append(record)
+            totals = self._get_page_totals(record.page)
+            totals["queries"] += 1
+            totals["cached_queries"] += int(record.cached)
+            if record.executed:
+                self._add_cost(record, queries=1, scanned_bytes=record.scanned_bytes or 0)
+
+    def mark_executed(self, record: QueryRecord | None):
+        if record is not None:
+            record.executed = True
+
+    def finish_athena_query(self, record: QueryRecord | None, future: Future):
+        """Done callback of a scheduled Athena query, its statistics are fetched in the background"""
+        if record is None:
+            return
+        if future.exception() is not None:
+            self.finish_query(record, error=str(future.exception()))
+            return
+        df, s3_path = future.result()
+        self.finish_query(record, rows=len(df), shared=not record.executed)
+        if record.executed and s3_path:
+            self._statistics_executor.submit(self._add_athena_statistics, record, s3_path)
+
+    def instrument_sqlalchemy(self):
+        """Records the statements of every SQLAlchemy engine of the process"""
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def summary(self, limit: int = 200) -> dict:
+        with self._lock:
+            callbacks = list(self.callbacks)
+            queries = list(self.queries)
+            page_loads = list(self._page_loads.values())
+            page_totals = {page: dict(totals) for page, totals in self._page_totals.items()}
+
+        pages = []
+        for page, totals in sorted(page_totals.items()):
+            durations = [record.duration_seconds for record in callbacks if record.page == page]
+            loads = [page_load for page_load in page_loads if page_load.page == page]
+            pages.append(
+                {
+                    "page": page,
+                    **totals,
+                    "scanned_gb": totals["scanned_bytes"] / GB,
+                    "p50_callback_seconds": float(np.percentile(durations, 50)) if durations else None,
+                    "p95_callback_seconds": float(np.percentile(durations, 95)) if durations else None,
+                    "max_load_queries": max((page_load.queries for page_load in loads), default=0),
+                    "max_load_scanned_gb": max((page_load.scanned_bytes for page_load in loads), default=0) / GB,
+                    "budget": asdict(self.budgets.get(page, self.default_budget)),
+                }
+            )
+        return {
+            "pages": pages,
+            "slowest_callbacks": [
+                to_dict(record) for record in sorted(callbacks, key=lambda r: r.duration_seconds, reverse=True)[:limit]
+            ],
+            "recent_callbacks": [to_dict(record) for record in callbacks[-limit:][::-1]],
+            "recent_queries": [to_dict(record) for record in queries[-limit:][::-1]],
+            "over_budget_loads": [to_dict(page_load) for page_load in page_loads if page_load.over_budget][-limit:],
+        }
+
+    def clear(self):
+        with self._lock:
+            self.callbacks.clear()
+            self.queries.clear()
+            self._page_loads.clear()
+            self._current_loads.clear()
+            self._page_totals.clear()
+
+    def _before_request(self):
+        if flask.request.path != DASH_CALLBACK_ROUTE:
+            return
+        page = urlparse(flask.request.referrer or "").path or "/"
+        if page == PERF_PAGE_PATH:
+            return
+        body = flask.request.get_json(silent=True) or {}
+        record = self.start_callback(page, str(body.get("output", ""))[:PREVIEW_LENGTH], get_current_user())
+        flask.g.perf_callback_token = _current_callback.set(record)
+
+    def _after_request(self, response):
+        record = _current_callback.get()
+        if record is not None:
+            self.finish_callback(record, response.status_code)
+        return response
+
+    def _teardown_request(self, exc=None):
+        token = flask.g.pop("perf_callback_token", None)
+        if token is not None:
+            _current_callback.reset(token)
+
+    def _serve_json(self):
+        limit = flask.request.args.get("limit", 200, type=int)
+        return flask.jsonify(self.summary(limit))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        fingerprint = hashlib.sha256(statement.encode("utf-8")).hexdigest()
+        record = self.start_query(fingerprint, statement, conn.dialect.name)
+        conn.info.setdefault("perf_queries", []).append((record, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        queries = conn.info.get("perf_queries")
+        if not queries:
+            return
+        record, start = queries.pop()
+        engine_seconds = time.perf_counter() - start
+        add_stage_seconds(_current_callback.get(), QUERY_WAIT_STAGE, engine_seconds)
+        self.mark_executed(record)
+        rows = cursor.rowcount if cursor.rowcount >= 0 else None
+        self.finish_query(record, rows=rows, engine_seconds=engine_seconds)
+
+    def _add_athena_statistics(self, record: QueryRecord, s3_path: str):
+        execution_id = _ATHENA_EXECUTION_ID.search(s3_path)
+        if execution_id is None:
+            return
+        try:
+            if self._athena_client is None:
+                self._athena_client = boto3.session.Session().client("athena")
+            execution = self._athena_client.get_query_execution(QueryExecutionId=execution_id.group(0))
+        except Exception as e:
+            logger.warning(f"Failed to get the statistics of Athena query {execution_id.group(0)}: {e}")
+            return
+
+        statistics = execution["QueryExecution"].get("Statistics", {})
+        scanned_bytes = statistics.get("DataScannedInBytes", 0)
+        with self._lock:
+            record.queue_seconds = statistics.get("QueryQueueTimeInMillis", 0) / 1000
+            record.engine_seconds = statistics.get("EngineExecutionTimeInMillis", 0) / 1000
+            record.scanned_bytes = scanned_bytes
+            self._add_cost(record, queries=0, scanned_bytes=scanned_bytes)
+
+    def _add_cost(self, record: QueryRecord, queries: int, scanned_bytes: int):
+        # called with the lock held, statistics of Athena queries may arrive after their callback returned
+        totals = self._get_page_totals(record.page)
+        totals["executed_queries"] += queries
+        totals["scanned_bytes"] += scanned_bytes
+        if record._callback is not None:
+            record._callback.queries += queries
+            record._callback.scanned_bytes += scanned_bytes
+        page_load = self._page_loads.get(record.load_id)
+        if page_load is None:
+            return
+        page_load.queries += queries
+        page_load.scanned_bytes += scanned_bytes
+        self._check_budget(page_load)
+
+    def _check_budget(self, page_load: PageLoad):
+        # each limit is reported once per page load
+        budget = self.budgets.get(page_load.page, self.default_budget)
+        exceeded = {}
+        if page_load.queries > budget.max_queries:
+            exceeded["queries"] = f"{page_load.queries} queries (budget {budget.max_queries})"
+        if page_load.scanned_bytes > budget.max_scanned_gb * GB:
+            scanned_gb = page_load.scanned_bytes / GB
+            exceeded["scanned_gb"] = f"{scanned_gb:.2f} GB scanned (budget {budget.max_scanned_gb} GB)"
+        new_exceeded = {limit: message for limit, message in exceeded.items() if limit not in page_load.over_budget}
+        if new_exceeded:
+            page_load.over_budget.extend(new_exceeded)
+            exceeded_limits = ", ".join(new_exceeded.values())
+            logger.warning(f"Page load of {page_load.page} by {page_load.user} is over budget: {exceeded_limits}")
+
+    def _get_page_load(self, page: str, user: str, now: float) -> PageLoad:
+        # called with the lock held
+        page_load = self._page_loads.get(self._current_loads.get((user, page)))
+        if page_load is None or now - page_load.last_activity > PAGE_LOAD_IDLE_SECONDS:
+            self._next_load_id += 1
+            page_load = PageLoad(load_id=self._next_load_id, page=page, user=user, started_at=now, last_activity=now)
+            self._page_loads[page_load.load_id] = page_load
+            self._current_loads[(user, page)] = page_load.load_id
+            while len(self._page_loads) > self._max_records:
+                _, evicted = self._page_loads.popitem(last=False)
+                if self._current_loads.get((evicted.user, evicted.page)) == evicted.load_id:
+                    del self._current_loads[(evicted.user, evicted.page)]
+        page_load.last_activity = now
+        return page_load
+
+    def _get_page_totals(self, page: str) -> dict[str, float]:
+        # called with the lock held
+        return self._page_totals.setdefault(page, dict.fromkeys(PAGE_TOTALS, 0))
+
+
+perf_monitor = PerfMonitor()
@@ -0,0 +1,119 @@
+from dash import Input, Output, callback, dash_table, dcc, html
+
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, GB, PERF_JSON_ROUTE, QUERY_WAIT_STAGE, perf_monitor
+
+PERF_REFRESH_INTERVAL = "perf-refresh-interval"
+PERF_PAGES_TABLE = "perf-pages-table"
+PERF_CALLBACKS_TABLE = "perf-callbacks-table"
+PERF_QUERIES_TABLE = "perf-queries-table"
+PERF_REFRESH_SECONDS = 10
+PERF_TABLES_ROWS = 100
+
+PAGES_COLUMNS = [
+    "page",
+    "callbacks",
+    "p50_callback_seconds",
+    "p95_callback_seconds",
+    "queries",
+    "cached_queries",
+    "executed_queries",
+    "scanned_gb",
+    "max_load_queries",
+    "max_load_scanned_gb",
+]
+CALLBACKS_COLUMNS = [
+    "page",
+    "callback",
+    "duration_seconds",
+    "query_wait_seconds",
+    "figure_seconds",
+    "post_processing_seconds",
+    "queries",
+    "scanned_gb",
+    "status_code",
+]
+QUERIES_COLUMNS = [
+    "page",
+    "callback",
+    "source",
+    "fingerprint",
+    "total_seconds",
+    "queue_seconds",
+    "engine_seconds",
+    "scanned_gb",
+    "rows",
+    "cached",
+    "shared",
+    "error",
+    "preview",
+]
+
+
+def perf_table(table_id, columns):
+    return dash_table.DataTable(
+        id=table_id,
+        columns=[{"name": column, "id": column} for column in columns],
+        sort_action="native",
+        filter_action="native",
+        page_size=20,
+        style_table={"overflowX": "auto"},
+        style_cell={"textAlign": "left", "maxWidth": "400px", "overflow": "hidden", "textOverflow": "ellipsis"},
+        tooltip_duration=None,
+    )
+
+
+def perf_layout():
+    """The /perf page shared by the dashboards, showing the records of the perf monitor of the app"""
+    return html.Div(
+        [
+            html.H1("Performance", className="mb-3"),
+            html.P(
+                [
+                    f"Callbacks and queries of this server, refreshed every {PERF_REFRESH_SECONDS} seconds. "
+                    "Also available as JSON at ",
+                    html.A(PERF_JSON_ROUTE, href=PERF_JSON_ROUTE, target="_blank"),
+                    ".",
+                ]
+            ),
+            dcc.Interval(id=PERF_REFRESH_INTERVAL, interval=PERF_REFRESH_SECONDS * 1000),
+            html.H4("Pages"),
+            perf_table(PERF_PAGES_TABLE, PAGES_COLUMNS),
+            html.H4("Slowest callbacks", className="mt-4"),
+            perf_table(PERF_CALLBACKS_TABLE, CALLBACKS_COLUMNS),
+            html.H4("Recent queries", className="mt-4"),
+            perf_table(PERF_QUERIES_TABLE, QUERIES_COLUMNS),
+        ],
+        className="p-3",
+    )
+
+
+@callback(
+    Output(PERF_PAGES_TABLE, "data"),
+    Output(PERF_CALLBACKS_TABLE, "data"),
+    Output(PERF_QUERIES_TABLE, "data"),
+    Input(PERF_REFRESH_INTERVAL, "n_intervals"),
+)
+def update_perf_tables(_):
+    summary = perf_monitor.summary(limit=PERF_TABLES_ROWS)
+    callbacks = [
+        {
+            **record,
+            "query_wait_seconds": record["stages"].get(QUERY_WAIT_STAGE, 0.0),
+            "figure_seconds": record["stages"].get(FIGURE_STAGE, 0.0),
+            "scanned_gb": record["scanned_bytes"] / GB,
+        }
+        for record in summary["slowest_callbacks"]
+    ]
+    queries = [
+        {**record, "scanned_gb": record["scanned_bytes"] / GB if record["scanned_bytes"] is not None else None}
+        for record in summary["recent_queries"]
+    ]
+    return (
+        [round_values(row, PAGES_COLUMNS) for row in summary["pages"]],
+        [round_values(row, CALLBACKS_COLUMNS) for row in callbacks],
+        [round_values(row, QUERIES_COLUMNS) for row in queries],
+    )
+
+
+def round_values(row, columns):
+    return {column: round(row[column], 3) if isinstance(row[column], float) else row[column] for column in columns}
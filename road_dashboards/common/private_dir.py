@@ -0,0 +1,25 @@
+import os
+import stat
+
+from loguru import logger
+
+
+def make_private_dir(path: str) -> bool:
+    """
+    Creates a directory only the current user can access, or checks that an existing one is owned by them
+    (tightening its permissions). Pickles are loaded from these directories, a directory other users can
+    write to, e.g. a fixed name under the shared temp dir, would let them run code in the dashboard.
+    Returns False when the directory can't be used safely.
+    """
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        dir_stat = os.lstat(path)
+        if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid():
+            logger.warning(f"{path} is not a directory owned by the current user, not storing files in it")
+            return False
+        if stat.S_IMODE(dir_stat.st_mode) & 0o077:
+            os.chmod(path, 0o700)
+    except OSError as e:
+        logger.warning(f"Failed to create the private directory {path}: {e}")
+        return False
+    return True
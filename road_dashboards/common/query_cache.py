@@ -0,0 +1,264 @@
+import hashlib
+import os
+import pickle as pkl
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+from threading import Lock, get_ident
+
+import pandas as pd
+from road_database_toolkit.athena.athena_utils import query_athena
+
+from road_dashboards.common.perf_monitor import QUERY_WAIT_STAGE, measure_stage, perf_monitor
+from road_dashboards.common.private_dir import make_private_dir
+from road_dashboards.common.query_scheduler import query_scheduler
+
+QUERY_CACHE_DIR = os.environ.get("QUERY_CACHE_DIR", os.path.join(tempfile.gettempdir(), "road_dashboards_query_cache"))
+QUERY_CACHE_TTL_MINUTES = float(os.environ.get("QUERY_CACHE_TTL_MINUTES", 60))
+QUERY_CACHE_MAX_MEMORY_BYTES = int(os.environ.get("QUERY_CACHE_MAX_MEMORY_MB", 512)) * 2**20
+QUERY_CACHE_MAX_DISK_BYTES = int(os.environ.get("QUERY_CACHE_MAX_DISK_MB", 4096)) * 2**20
+QUERY_CACHE_ENABLED = os.environ.get("QUERY_CACHE_ENABLED", "true").lower() != "false"
+
+_QUOTED_OR_TEXT = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|([^'\"]+)")
+_PUNCTUATION_SPACES = re.compile(r"\s*([(),=<>+\-*/])\s*")
+_SUBQUERY_ALIAS = re.compile(r'"sq\d+"')
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a SQL string, used as the cache key.
+    Whitespace and keyword case are normalized outside of quoted literals and identifiers,
+    and pypika's generated subquery aliases ("sq0", "sq1", ...) are renumbered by order of appearance.
+    """
+    parts = []
+    for quoted, text in _QUOTED_OR_TEXT.findall(query):
+        if quoted:
+            parts.append(quoted)
+            continue
+        text = re.sub(r"\s+", " ", re.sub(r"--[^\n]*", "", text)).lower()
+        parts.append(_PUNCTUATION_SPACES.sub(r"\1", text))
+    normalized = "".join(parts).strip().rstrip(";")
+
+    aliases = {}
+    return _SUBQUERY_ALIAS.sub(lambda m: aliases.setdefault(m.group(0), f'"sq{len(aliases)}"'), normalized)
+
+
+def get_query_key(query: str, database: str) -> str:
+    return hashlib.sha256(f"{database}:{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """
+    Two level cache of query results: an in-process LRU bounded by memory size,
+    backed by an on-disk store of pickled DataFrames with a TTL and a total size cap.
+    The on-disk store is used only if cache_dir is private to the current user, see make_private_dir.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | None = QUERY_CACHE_DIR,
+        ttl_minutes: float = QUERY_CACHE_TTL_MINUTES,
+        max_memory_bytes: int = QUERY_CACHE_MAX_MEMORY_BYTES,
+        max_disk_bytes: int = QUERY_CACHE_MAX_DISK_BYTES,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_minutes * 60
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[float, float, int, pd.DataFrame, str | None]] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir and not make_private_dir(self.cache_dir):
+            self.cache_dir = None
+
+    def get(self, key: str, ttl_minutes: float | None = None) -> tuple[pd.DataFrame, str | None] | None:
+        ttl_seconds = self.ttl_seconds if ttl_minutes is None else ttl_minutes * 60
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[0] <= min(ttl_seconds, entry[1]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[3].copy(), entry[4]
+
+        entry = self._load_from_disk(key, ttl_seconds)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_in_memory(key, *entry)
+            return entry[2].copy(), entry[3]
+
+    def set(self, key: str, df: pd.DataFrame, s3_path: str | None = None, ttl_minutes: float | None = None):
+        created_at = time.time()
+        ttl_seconds = self.ttl_seconds if ttl_minutes is None else ttl_minutes * 60
+        df = df.copy()
+        with self._lock:
+            self._put_in_memory(key, created_at, ttl_seconds, df, s3_path)
+        self._save_to_disk(key, created_at, ttl_seconds, df, s3_path)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for path in self._disk_files():
+            self._remove_file(path)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / requests if requests else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def _put_in_memory(self, key, created_at, ttl_seconds, df, s3_path):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[2]
+        self._memory[key] = (created_at, ttl_seconds, size, df, s3_path)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted[2]
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _disk_files(self) -> list[str]:
+        if not self.cache_dir:
+            return []
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".pkl")]
+
+    def _load_from_disk(self, key, ttl_seconds):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                created_at, entry_ttl_seconds, df, s3_path = pkl.load(f)
+        except (OSError, EOFError, pkl.UnpicklingError, ValueError):
+            return None
+        if time.time() - created_at > min(ttl_seconds, entry_ttl_seconds):
+            self._remove_file(path)
+            return None
+        return created_at, entry_ttl_seconds, df, s3_path
+
+    def _save_to_disk(self, key, created_at, ttl_seconds, df, s3_path):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pkl.dump((created_at, ttl_seconds, df, s3_path), f, protocol=pkl.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove_file(tmp_path)
+            return
+        self._enforce_disk_cap()
+
+    def _enforce_disk_cap(self):
+        files = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+query_cache: QueryResultCache | None = QueryResultCache() if QUERY_CACHE_ENABLED else None
+
+
+def set_query_cache(cache: QueryResultCache | None):
+    """Replace the shared cache (or disable caching by passing None)."""
+    global query_cache
+    query_cache = cache
+
+
+def _fetch_query(key: str, query: str, database: str, cache_duration_minutes: float | None, perf_record=None):
+    perf_monitor.mark_executed(perf_record)
+    athena_kwargs = {} if cache_duration_minutes is None else {"cache_duration_minutes": cache_duration_minutes}
+    df, s3_path = query_athena(database=database, query=query, **athena_kwargs)
+    if query_cache is not None:
+        query_cache.set(key, df, s3_path, ttl_minutes=cache_duration_minutes)
+    return df, s3_path
+
+
+def submit_query_athena(
+    query: str, database: str = "run_eval_db", cache_duration_minutes: float | None = None
+) -> Future:
+    """
+    Non blocking variant of cached_query_athena: returns a future of (df, s3_path).
+    Cache hits resolve immediately, misses are queued on the shared query scheduler,
+    where identical in-flight queries are executed only once.
+    """
+    key = get_query_key(query, database)
+    perf_record = perf_monitor.start_query(key, query, source="athena")
+    cached = None if query_cache is None else query_cache.get(key, ttl_minutes=cache_duration_minutes)
+    if cached is not None:
+        perf_monitor.finish_query(perf_record, rows=len(cached[0]), cached=True)
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    future = query_scheduler.submit(
+        key, partial(_fetch_query, key, query, database, cache_duration_minutes, perf_record)
+    )
+    future.add_done_callback(partial(perf_monitor.finish_athena_query, perf_record))
+    return future
+
+
+def get_query_result(future: Future) -> tuple[pd.DataFrame, str | None]:
+    # scheduled results may be shared between deduplicated callers
+    with measure_stage(QUERY_WAIT_STAGE):
+        df, s3_path = future.result()
+    return df.copy(), s3_path
+
+
+def cached_query_athena(
+    query: str, database: str = "run_eval_db", cache_duration_minutes: float | None = None
+) -> tuple[pd.DataFrame, str | None]:
+    """
+    Drop-in replacement for query_athena that serves repeated queries from the shared result cache.
+    cache_duration_minutes is forwarded to Athena and also used as the local TTL of the entry.
+    """
+    return get_query_result(submit_query_athena(query, database, cache_duration_minutes))
+
+
+def cached_athena_run_multiple_queries(
+    query_list: list[str], database: str = "run_eval_db"
+) -> tuple[list[pd.DataFrame], list[str | None]]:
+    """Runs only the queries missing from the cache (concurrently), and returns results in the input order."""
+    futures = [submit_query_athena(query, database) for query in query_list]
+    results = [get_query_result(future) for future in futures]
+    dfs = [df for df, _ in results]
+    s3_paths = [s3_path for _, s3_path in results]
+    return dfs, s3_paths
@@ -0,0 +1,105 @@
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from threading import Condition, Thread
+from typing import Callable
+
+import flask
+
+QUERY_SCHEDULER_WORKERS = int(os.environ.get("QUERY_SCHEDULER_WORKERS", 16))
+ANONYMOUS_USER = "anonymous"
+
+
+def get_current_user() -> str:
+    """Identifies the user of the current Dash request (the client address), used for fair scheduling."""
+    if not flask.has_request_context():
+        return ANONYMOUS_USER
+    forwarded_for = flask.request.headers.get("X-Forwarded-For", "")
+    return forwarded_for.split(",")[0].strip() or flask.request.remote_addr or ANONYMOUS_USER
+
+
+class QueryScheduler:
+    """
+    Runs queries on a fixed pool of worker threads, so a page's callbacks share the warehouse concurrency
+    instead of each blocking a Dash worker in turn.
+    Identical in-flight queries share one future, and pending queries are picked round-robin across users
+    so one user loading a heavy page does not starve everyone else.
+    """
+
+    def __init__(self, max_workers: int = QUERY_SCHEDULER_WORKERS):
+        self.max_workers = max_workers
+        self._pending: OrderedDict[str, deque[tuple[str, Callable, Future]]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._running = 0
+        self._condition = Condition()
+        self._workers: list[Thread] = []
+
+    def submit(self, key: str, func: Callable, user: str | None = None) -> Future:
+        """
+        Schedules func() and returns its future. If a query with the same key is pending or running,
+        its future is returned instead and func is not scheduled again.
+        """
+        user = get_current_user() if user is None else user
+        with self._condition:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+
+            future = self._inflight[key] = Future()
+            self._pending.setdefault(user, deque()).append((key, func, future))
+            self._start_workers()
+            self._condition.notify()
+            return future
+
+    def run(self, key: str, func: Callable, user: str | None = None):
+        return self.submit(key, func, user).result()
+
+    def queue_depth(self) -> dict[str, int]:
+        with self._condition:
+            return {user: len(jobs) for user, jobs in self._pending.items()}
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {
+                "pending": sum(len(jobs) for jobs in self._pending.values()),
+                "running": self._running,
+                "users": len(self._pending),
+                "workers": len(self._workers),
+            }
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_workers:
+            worker = Thread(target=self._work, name=f"query-scheduler-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self) -> tuple[str, Callable, Future]:
+        user, jobs = next(iter(self._pending.items()))
+        job = jobs.popleft()
+        # rotate the user to the back of the line, so the next job is taken from another user
+        del self._pending[user]
+        if jobs:
+            self._pending[user] = jobs
+        return job
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                key, func, future = self._next_job()
+                self._running += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(func())
+                    except Exception as e:
+                        future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._running -= 1
+                    self._inflight.pop(key, None)
+
+
+query_scheduler = QueryScheduler()
@@ -0,0 +1,180 @@
+import functools
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+SWR_CACHE_REFRESH_WORKERS = int(os.environ.get("SWR_CACHE_REFRESH_WORKERS", 4))
+REFRESH_AHEAD_FRACTION = 0.8
+POPULAR_HITS = 3
+
+_refresh_executor = ThreadPoolExecutor(max_workers=SWR_CACHE_REFRESH_WORKERS, thread_name_prefix="swr_cache")
+
+
+def make_key(args: tuple, kwargs: dict) -> Hashable:
+    return freeze(args), freeze(kwargs)
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments: lists, tuples, sets and dicts are converted recursively"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    elif isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(item) for item in value))
+    return value
+
+
+class _Entry:
+    __slots__ = ("value", "computed_at", "hits", "args", "kwargs")
+
+    def __init__(self, value: Any, computed_at: float, args: tuple, kwargs: dict):
+        self.value = value
+        self.computed_at = computed_at
+        self.hits = 0
+        self.args = args
+        self.kwargs = kwargs
+
+
+class StaleWhileRevalidateCache:
+    """
+    Memoizes a function with a TTL per entry. An expired entry (up to max_stale_seconds old) is served immediately
+    while a background thread recomputes it, so only the first call of a key waits for the function.
+    Popular entries (read POPULAR_HITS times since computed) are refreshed ahead, once they are older than
+    REFRESH_AHEAD_FRACTION of the TTL, so they rarely expire at all.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        ttl_seconds: float,
+        maxsize: int = 128,
+        max_stale_seconds: float | None = None,
+        executor: ThreadPoolExecutor = _refresh_executor,
+    ):
+        self.func = func
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.max_stale_seconds = 24 * ttl_seconds if max_stale_seconds is None else max_stale_seconds
+        self.executor = executor
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._refreshing: dict[Hashable, Future] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self._refresh_seconds_total = 0.0
+        self._refresh_seconds_max = 0.0
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+    def get(self, *args, **kwargs) -> Any:
+        key = make_key(args, kwargs)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.computed_at <= self.max_stale_seconds:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                age = now - entry.computed_at
+                if age > self.ttl_seconds:
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, args, kwargs)
+                else:
+                    self.hits += 1
+                    if entry.hits >= POPULAR_HITS and age > REFRESH_AHEAD_FRACTION * self.ttl_seconds:
+                        self._schedule_refresh(key, args, kwargs)
+                self._served_age_total += age
+                self._served_age_max = max(self._served_age_max, age)
+                return entry.value
+            self.misses += 1
+
+        value = self.func(*args, **kwargs)
+        self._set(key, value, now, args, kwargs)
+        return value
+
+    def refresh_all(self) -> list[Future]:
+        """Recomputes every cached entry in the background, the current values are served until they are replaced"""
+        with self._lock:
+            return [self._schedule_refresh(key, entry.args, entry.kwargs) for key, entry in self._entries.items()]
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            served = self.hits + self.stale_hits
+            requests = served + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": served / requests if requests else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "mean_refresh_seconds": self._refresh_seconds_total / self.refreshes if self.refreshes else 0.0,
+                "max_refresh_seconds": self._refresh_seconds_max,
+                "mean_served_age_seconds": self._served_age_total / served if served else 0.0,
+                "max_served_age_seconds": self._served_age_max,
+            }
+
+    def _set(self, key: Hashable, value: Any, computed_at: float, args: tuple, kwargs: dict):
+        with self._lock:
+            self._entries[key] = _Entry(value, computed_at, args, kwargs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, key: Hashable, args: tuple, kwargs: dict) -> Future:
+        # called with the lock held
+        future = self._refreshing.get(key)
+        if future is None:
+            future = self._refreshing[key] = self.executor.submit(self._refresh, key, args, kwargs)
+        return future
+
+    def _refresh(self, key: Hashable, args: tuple, kwargs: dict):
+        start = time.time()
+        try:
+            value = self.func(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.refresh_failures += 1
+            raise
+        else:
+            self._set(key, value, start, args, kwargs)
+            with self._lock:
+                duration = time.time() - start
+                self.refreshes += 1
+                self._refresh_seconds_total += duration
+                self._refresh_seconds_max = max(self._refresh_seconds_max, duration)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+
+def swr_cache(ttl_seconds: float, maxsize: int = 128, max_stale_seconds: float | None = None) -> Callable:
+    """
+    Decorator memoizing a function (or method) with a StaleWhileRevalidateCache.
+    The cache is available as func.cache, with func.cache_clear() and func.cache_stats() as shortcuts.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache = StaleWhileRevalidateCache(func, ttl_seconds, maxsize, max_stale_seconds)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache.get(*args, **kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.cache_clear
+        wrapper.cache_stats = cache.stats
+        return wrapper
+
+    return decorator
@@ -7,6 +7,7 @@ import dash_bootstrap_components as dbc
 import pandas as pd
 from dash import Dash, Input, Output, callback, dcc, html, no_update
 
+from road_dashboards.common.perf_monitor import perf_monitor
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import (
     LOAD_DATASETS_DATA_NOTIFICATION,
     MEXSENSE_DATA,
@@ -16,7 +17,7 @@ from road_dashboards.road_dump_dashboard.logical_components.constants.init_data_
     EXISTING_TABLES,
     init_tables,
 )
-from road_dashboards.road_dump_dashboard.logical_components.grid_objects.catalog_table import dump_db_manager
+from road_dashboards.road_dump_dashboard.logical_components.dump_catalog import dump_catalog
 from road_dashboards.road_dump_dashboard.logical_components.multi_page_objects import (
     load_datasets_modal,
     page_content,
@@ -36,6 +37,7 @@ app = Dash(
     external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME],
     suppress_callback_exceptions=True,
 )
+perf_monitor.init_app(app)
 
 
 app.layout = html.Div(
@@ -68,7 +70,7 @@ def init_run(tables_list):
         return *([no_update] * len(EXISTING_TABLES)), no_update
 
     datasets_ids = json.loads(base64.b64decode(tables_list))
-    datasets = [dump_db_manager.get_item(datasets_id) for datasets_id in datasets_ids]
+    datasets = dump_catalog.get_items(datasets_ids)
     datasets = pd.DataFrame(datasets)
     tables = get_tables(datasets)
     return *(dump_object(table) if table else None for table in tables), True
@@ -0,0 +1,61 @@
+import timeit
+import tracemalloc
+
+import fire
+
+from road_dashboards.road_dump_dashboard.logical_components.constants.query_abstractions import base_data_subquery
+from road_dashboards.road_dump_dashboard.table_schemes.lane_marks import LaneMarks
+from road_dashboards.road_dump_dashboard.table_schemes.meta_data import MetaData
+
+
+def build_query(main_tables, md_tables, num_filter_columns):
+    columns = MetaData.get_columns(names_only=False)
+    data_filter = LaneMarks.role == "host"
+    for column in columns[:num_filter_columns]:
+        data_filter &= column.notnull()
+    terms = [
+        LaneMarks.role,
+        LaneMarks.type,
+        LaneMarks.color,
+        MetaData.dump_name,
+        MetaData.road_type,
+        *LaneMarks.get_columns(names_only=False),
+    ]
+    return base_data_subquery(main_tables, md_tables, terms, data_filter=data_filter, intersection_on=True)
+
+
+def benchmark_query_construction(num_tables=50, num_filter_columns=20, repeat=5, number=10, compile_sql=True):
+    """
+    Micro-benchmark of building (and compiling with compile_sql) a base_data_subquery over num_tables datasets,
+    with num_filter_columns meta data columns in the filter. Prints the best time per query and the memory
+    allocated by one construction.
+    """
+    main_tables = [LaneMarks(f"lm_table_{ind}", f"dataset_{ind}") for ind in range(num_tables)]
+    md_tables = [MetaData(f"md_table_{ind}", f"dataset_{ind}") for ind in range(num_tables)]
+
+    def run():
+        query = build_query(main_tables, md_tables, num_filter_columns)
+        return str(query) if compile_sql else query
+
+    first_time = timeit.timeit(run, number=1)
+    best_time = min(timeit.repeat(run, repeat=repeat, number=number)) / number
+    columns_time = min(timeit.repeat(MetaData.get_columns, repeat=repeat, number=number * 100)) / (number * 100)
+
+    tracemalloc.start()
+    run()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"base_data_subquery over {num_tables} tables ({'with' if compile_sql else 'without'} compiling SQL):")
+    print(f"  first query:        {first_time * 1e3:.2f} ms")
+    print(f"  warm query:         {best_time * 1e3:.2f} ms")
+    print(f"  peak allocations:   {peak_bytes / 2**10:.1f} KiB")
+    print(f"MetaData.get_columns: {columns_time * 1e6:.2f} us")
+
+
+def main():
+    fire.Fire(benchmark_query_construction)
+
+
+if __name__ == "__main__":
+    main()
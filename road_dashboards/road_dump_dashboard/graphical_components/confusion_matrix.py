@@ -3,6 +3,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
+
 
 def compute_confusion_matrix(
     data: pd.DataFrame, main_val: str, secondary_val: str
@@ -13,6 +15,7 @@ def compute_confusion_matrix(
     return conf_matrix, normalize_mat
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_confusion_matrix(
     conf_matrix: pd.DataFrame, normalize_mat: pd.DataFrame, x_label: str = "", y_label: str = "", title: str = ""
 ) -> go.Figure:
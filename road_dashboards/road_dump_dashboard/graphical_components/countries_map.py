@@ -8,6 +8,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pycountry
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
+
 main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 with open(f"{main_dir}/assets/custom.geo.json") as f:
     geojson = json.load(f)
@@ -25,6 +27,7 @@ COUNTRIES_NORMALIZATION: dict[str, str] = {
 }
 
 
+@measure_stage(FIGURE_STAGE)
 def generate_world_map(
     countries_data: pd.DataFrame, locations: str, color: str, hover_data: str | list[str] | None = None
 ) -> go.Figure:
@@ -1,5 +1,3 @@
-from dataclasses import dataclass
-
 import numpy as np
 import pandas as pd
 import plotly.express as px
@@ -7,6 +5,8 @@ import plotly.graph_objects as go
 from dash import dcc
 from scipy import interpolate
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
+
 VERT = np.array(range(0, 256, 4))
 IGNORE_VAL = -999
 IMG_AXIS = {"width": [0, 771], "height": [0, 256]}
@@ -15,120 +15,118 @@ FIGS_HEIGHT = 800
 COLOR_SCHEME = px.colors.qualitative.Plotly
 
 
-@dataclass
-class CandidateParams:
-    obj_id: int
-    color: str
-    x: np.array
-    y: np.array
-    type: str | None = None
-    role: str | None = None
-    half_width: np.ndarray | None = None
-    view_range: int | None = None
-    max_view_range_idx: int | None = None
-    dashed_y: np.ndarray | None = None
-
-    def __post_init__(self):
-        self.color = self.select_color(self.color, self.obj_id)
-        self.x, self.y, self.half_width, self.dashed_y = self.cut_max_view_range(
-            self.x, self.y, self.half_width, self.dashed_y, self.max_view_range_idx
-        )
-        self.x, self.y, self.half_width, self.dashed_y = self.remove_ignores(
-            self.x, self.y, self.half_width, self.dashed_y
-        )
-
-    @staticmethod
-    def select_color(color_str=None, obj_id=None):
-        if color_str == "ignore":
-            return "green"
-
-        elif color_str:
-            return color_str
-
-        return COLOR_SCHEME[obj_id % len(COLOR_SCHEME)]
-
-    @staticmethod
-    def cut_max_view_range(x, y=None, half_width=None, dashed_y=None, max_view_range_idx=None):
-        if max_view_range_idx is not None:
-            x = x[:max_view_range_idx]
-            y = y[:max_view_range_idx] if y is not None else None
-            half_width = half_width[:max_view_range_idx] if half_width is not None else None
-
-        max_y = np.max(y, initial=0) if y is not None else None
-        dashed_y = (
-            dashed_y[(dashed_y[:, 0] <= max_y) & (dashed_y[:, 1] <= max_y)]
-            if dashed_y is not None and max_y is not None
-            else None
-        )
-        return x, y, half_width, dashed_y
-
-    @staticmethod
-    def remove_ignores(x, y, half_width=None, dashed_y=None):
-        if x is None or y is None:
-            return x, y, half_width, dashed_y
-
-        dashed_y = (
-            dashed_y[(dashed_y[:, 0] > IGNORE_VAL) & (dashed_y[:, 1] > IGNORE_VAL)] if dashed_y is not None else None
-        )
-        valid = x > IGNORE_VAL
-        x = x[valid]
-        y = y[valid] if y is not None else None
-        half_width = half_width[valid] if half_width is not None else None
-        return x, y, half_width, dashed_y
-
-
-def get_candidate(cand: pd.Series, is_img: bool = True):
-    obj_id = int(cand["obj_id"])
-    color = cand.get("color")
-    type = cand.get("type")
-    role = cand.get("role")
-    view_range = cand.get("max_view_range")
-    max_view_range_idx = cand.get("max_view_range_idx")
-    if is_img:
-        x = cand["dv_dp_points"][:, 0] if "dv_dp_points" in cand.keys() else cand.get("pos")
-        y = cand["dv_dp_points"][:, 1] if "dv_dp_points" in cand.keys() else VERT
-        half_width = cand.get("half_width")
-        dashed_y = get_aggregated_dashed_y(cand.get("dashed_start_y"), cand.get("dashed_end_y"))
-        cand = CandidateParams(
-            obj_id=obj_id,
-            color=color,
-            type=type,
-            role=role,
-            view_range=view_range,
-            max_view_range_idx=max_view_range_idx,
-            x=x,
-            y=y,
-            half_width=half_width,
-            dashed_y=dashed_y,
-        )
+def get_candidates_points(candidates: pd.DataFrame, is_img: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Packs the candidates of a frame into one row per point, with the max view range cut and the ignored points
+    removed in bulk over all candidates. Returns a frame of the candidates (obj_id, color, annotation, dashed_y)
+    and a frame of their points (cand, order, x, y, half_width), where cand is the candidate's row in the first.
+    """
+    candidates = candidates.reset_index(drop=True)
+    if is_img and "dv_dp_points" in candidates:
+        xs = [points[:, 0] if isinstance(points, np.ndarray) else None for points in candidates["dv_dp_points"]]
+        ys = [points[:, 1] if isinstance(points, np.ndarray) else None for points in candidates["dv_dp_points"]]
+    elif is_img:
+        xs = list(candidates["pos"]) if "pos" in candidates else [None] * len(candidates)
+        ys = [VERT] * len(candidates)
+    elif "dp_points" in candidates:
+        xs = [points[:, 0] if isinstance(points, np.ndarray) else None for points in candidates["dp_points"]]
+        ys = [points[:, 2] if isinstance(points, np.ndarray) else None for points in candidates["dp_points"]]
     else:
-        x = cand["dp_points"][:, 0] if "dp_points" in cand.keys() else cand.get("pos_x")
-        z = cand["dp_points"][:, 2] if "dp_points" in cand.keys() else cand.get("pos_z")
-        cand = CandidateParams(
-            obj_id=obj_id,
-            color=color,
-            type=type,
-            view_range=view_range,
-            max_view_range_idx=max_view_range_idx,
-            x=x,
-            y=z,
-        )
-    return cand
-
+        xs = list(candidates["pos_x"]) if "pos_x" in candidates else [None] * len(candidates)
+        ys = list(candidates["pos_z"]) if "pos_z" in candidates else [None] * len(candidates)
+
+    half_widths = list(candidates["half_width"]) if is_img and "half_width" in candidates else [None] * len(candidates)
+    valid = [isinstance(x, np.ndarray) and isinstance(y, np.ndarray) for x, y in zip(xs, ys)]
+    lengths = np.array([min(len(x), len(y)) if is_valid else 0 for x, y, is_valid in zip(xs, ys, valid)], dtype=int)
+
+    cands = pd.DataFrame({"obj_id": candidates["obj_id"].astype(int), "valid": valid})
+    cands["color"] = get_colors(candidates.get("color"), cands["obj_id"])
+    annotation_columns = [_column_or_none(candidates, col) for col in ["type", "role", "max_view_range"]]
+    cands["annotation"] = [parser_annotation(*annotation) for annotation in zip(*annotation_columns)]
+    cands["has_width"] = [
+        is_valid and isinstance(half_width, np.ndarray) for half_width, is_valid in zip(half_widths, valid)
+    ]
+
+    cand = np.repeat(np.arange(len(cands)), lengths)
+    order = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    points = pd.DataFrame(
+        {
+            "cand": cand,
+            "order": order,
+            "x": _pack([x for x, is_valid in zip(xs, valid) if is_valid], lengths[valid]),
+            "y": _pack([y for y, is_valid in zip(ys, valid) if is_valid], lengths[valid]),
+            "half_width": _pack(
+                [half_width for half_width, has_width in zip(half_widths, cands["has_width"]) if has_width],
+                lengths[cands["has_width"].to_numpy()],
+                np.repeat(cands["has_width"].to_numpy(), lengths),
+            ),
+        }
+    )
 
-def get_aggregated_dashed_y(start_y=None, end_y=None):
-    if start_y is None or end_y is None:
-        return
+    max_view_range_idx = _column_or_none(candidates, "max_view_range_idx")
+    max_view_range_idx = np.array([np.inf if pd.isnull(idx) else idx for idx in max_view_range_idx], dtype=float)
+    in_view_range = points["order"].to_numpy() < max_view_range_idx[cand]
+    max_y = points[in_view_range].groupby("cand")["y"].max().reindex(cands.index).fillna(0).clip(lower=0)
+    cands["dashed_y"] = pd.Series(get_dashed_y(candidates, cands, max_y), index=cands.index, dtype=object)
+
+    points = points[in_view_range & (points["x"].to_numpy() > IGNORE_VAL)]
+    return cands, points
+
+
+def _column_or_none(df: pd.DataFrame, column: str) -> list:
+    return list(df[column]) if column in df else [None] * len(df)
+
+
+def _pack(arrays: list[np.ndarray], lengths: np.ndarray, mask: np.ndarray | None = None) -> np.ndarray:
+    """Concatenates the first `length` values of each array (NaN padded), scattered into the rows of mask if given"""
+    packed = np.full(int(np.sum(lengths)), np.nan)
+    offsets = np.cumsum(lengths) - lengths
+    for arr, offset, length in zip(arrays, offsets, lengths):
+        values = np.asarray(arr[:length], dtype=float)
+        packed[offset : offset + values.size] = values
+    if mask is None:
+        return packed
+    values = np.full(mask.size, np.nan)
+    values[mask] = packed
+    return values
+
+
+def get_colors(colors: pd.Series | None, obj_ids: pd.Series) -> np.ndarray:
+    default_colors = np.array(COLOR_SCHEME)[obj_ids.to_numpy() % len(COLOR_SCHEME)]
+    if colors is None:
+        return default_colors
+    colors = colors.reset_index(drop=True)
+    has_color = colors.notna().to_numpy() & (colors.astype(str) != "").to_numpy()
+    return np.where(colors == "ignore", "green", np.where(has_color, colors.astype(str), default_colors))
+
+
+def get_dashed_y(candidates: pd.DataFrame, cands: pd.DataFrame, max_y: pd.Series) -> list[np.ndarray | None]:
+    """Dashes are drawn only for deceleration / dashed lane marks, and only up to the drawn part of the line"""
+    dashed_y = []
+    for start_y, end_y, type, has_width, cand_max_y in zip(
+        _column_or_none(candidates, "dashed_start_y"),
+        _column_or_none(candidates, "dashed_end_y"),
+        _column_or_none(candidates, "type"),
+        cands["has_width"],
+        max_y,
+    ):
+        is_dashed = type is not None and ("deceleration" in type.lower() or "dash" in type.lower())
+        if not has_width or not is_dashed or start_y is None or end_y is None:
+            dashed_y.append(None)
+            continue
+
+        cand_dashed_y = np.column_stack((start_y, end_y))
+        cand_dashed_y = cand_dashed_y[(cand_dashed_y[:, 0] <= cand_max_y) & (cand_dashed_y[:, 1] <= cand_max_y)]
+        cand_dashed_y = cand_dashed_y[(cand_dashed_y[:, 0] > IGNORE_VAL) & (cand_dashed_y[:, 1] > IGNORE_VAL)]
+        dashed_y.append(cand_dashed_y)
 
-    dashed_y = np.column_stack((start_y, end_y))
     return dashed_y
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_top_view(candidates: pd.DataFrame):
     fig = go.Figure()
-    for _, cand_row in candidates.iterrows():
-        cand = get_candidate(cand_row, is_img=False)
-        draw_line(fig, cand)
+    draw_candidates(fig, candidates, is_img=False)
 
     fig.update_layout(showlegend=False, height=FIGS_HEIGHT)
     fig.update_xaxes(range=WORLD_AXIS["width"])
@@ -137,11 +135,10 @@ def draw_top_view(candidates: pd.DataFrame):
     return graph
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_img(image, candidates: pd.DataFrame, dump_name, clip_name, grab_index):
     fig = px.imshow(image, color_continuous_scale="gray", origin="lower", aspect="auto")
-    for _, cand_row in candidates.iterrows():
-        cand = get_candidate(cand_row)
-        draw_line(fig, cand)
+    draw_candidates(fig, candidates, is_img=True)
 
     fig.update_layout(
         title=f"{dump_name} <br><sup>{clip_name}, {grab_index}</sup>", coloraxis_showscale=False, height=FIGS_HEIGHT
@@ -152,67 +149,88 @@ def draw_img(image, candidates: pd.DataFrame, dump_name, clip_name, grab_index):
     return graph
 
 
-def draw_line(fig, cand):
-    if cand.x is None or cand.y is None:
-        return
+def draw_candidates(fig, candidates: pd.DataFrame, is_img: bool = True):
+    """Draws all candidates with one width trace and one line trace per color, candidates are split by gaps"""
+    cands, points = get_candidates_points(candidates, is_img)
+    points = points.assign(color=cands["color"].to_numpy()[points["cand"].to_numpy()])
+    for color, color_points in points.groupby("color", sort=False):
+        color_cands = cands.loc[color_points["cand"].unique()]
+        width_points = color_points[cands["has_width"].to_numpy()[color_points["cand"].to_numpy()]]
+        solid_points = width_points[cands["dashed_y"].isna().to_numpy()[width_points["cand"].to_numpy()]]
+        width_x, width_y = get_width_polygons(solid_points)
+        for cand_ind, cand in color_cands[color_cands["dashed_y"].notna()].iterrows():
+            dashed_x, dashed_y = get_dashed_polygons(width_points[width_points["cand"] == cand_ind], cand["dashed_y"])
+            width_x, width_y = np.concatenate([width_x, dashed_x]), np.concatenate([width_y, dashed_y])
+
+        draw_line_width(fig, width_x, width_y, color)
+        draw_line_scatter(fig, color_points, color_cands, color)
+
 
-    if cand.half_width is not None:
-        if (
-            cand.dashed_y is not None
-            and cand.type is not None
-            and ("deceleration" in cand.type.lower() or "dash" in cand.type.lower())
-        ):
-            draw_interpolated_dashed_points(fig, cand)
-        else:
-            draw_line_width(fig, cand.x, cand.y, cand.half_width, cand.color, cand.obj_id)
+def _with_gaps(segments: pd.DataFrame) -> pd.DataFrame:
+    """Orders the rows by (cand, order) and closes every candidate with a NaN row, so plotly draws them apart"""
+    gaps = pd.DataFrame({"cand": segments["cand"].unique(), "order": np.inf})
+    return pd.concat([segments, gaps], ignore_index=True).sort_values(["cand", "order"], kind="stable")
 
-    draw_line_scatter(fig, cand.x, cand.y, cand.obj_id, cand.color, cand.type, cand.role, cand.view_range)
 
+def get_width_polygons(points: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    left = points.assign(x=points["x"] - points["half_width"])
+    right = points.assign(x=points["x"] + points["half_width"], order=np.iinfo(np.int32).max - points["order"])
+    polygons = _with_gaps(pd.concat([left, right], ignore_index=True)) if len(points) else points
+    return polygons["x"].to_numpy(dtype=float), polygons["y"].to_numpy(dtype=float)
 
-def draw_interpolated_dashed_points(fig, cand):
-    interp_half_w = interpolate.interp1d(cand.y, cand.half_width, fill_value="extrapolate", assume_sorted=True)
-    interp_x = interpolate.interp1d(cand.y, cand.x, fill_value="extrapolate", assume_sorted=True)
 
-    dashed_half_w = np.maximum(interp_half_w(cand.dashed_y), 0.5)
-    dashed_x = interp_x(cand.dashed_y)
-    for curr_x, curr_y, curr_half_w in zip(dashed_x, cand.dashed_y, dashed_half_w):
-        draw_line_width(fig, curr_x, curr_y, curr_half_w, cand.color, cand.obj_id)
+def get_dashed_polygons(points: pd.DataFrame, dashed_y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if len(points) < 2 or not len(dashed_y):
+        return np.array([]), np.array([])
 
+    y = points["y"].to_numpy()
+    interp_half_w = interpolate.interp1d(y, points["half_width"], fill_value="extrapolate", assume_sorted=True)
+    interp_x = interpolate.interp1d(y, points["x"], fill_value="extrapolate", assume_sorted=True)
+    dashed_half_w = np.maximum(interp_half_w(dashed_y), 0.5)
+    dashed_x = interp_x(dashed_y)
+
+    gap = np.full((len(dashed_y), 1), np.nan)
+    polygons_x = np.hstack([dashed_x - dashed_half_w, (dashed_x + dashed_half_w)[:, ::-1], gap])
+    polygons_y = np.hstack([dashed_y, dashed_y[:, ::-1], gap])
+    return polygons_x.ravel(), polygons_y.ravel()
+
+
+def draw_line_width(fig, x, y, color):
+    if not len(x):
+        return
 
-def draw_line_width(fig, x, y, half_width, color, obj_id):
-    x_left_limit = x - half_width
-    x_right_limit = x + half_width
-    x_limits = np.concatenate([x_left_limit, x_right_limit[::-1]])
-    extended_y = np.concatenate([y, y[::-1]])
     fig.add_trace(
         go.Scatter(
-            x=x_limits,
-            y=extended_y,
+            x=x,
+            y=y,
             opacity=0.3,
             fill="toself",
             fillcolor=color,
             line_color="rgba(255,255,255,0)",
             showlegend=False,
-            legendgroup=obj_id,
+            hoverinfo="skip",
         )
     )
 
 
-def draw_line_scatter(fig, x, y, obj_id, color, type=None, role=None, view_range=None):
+def draw_line_scatter(fig, points: pd.DataFrame, cands: pd.DataFrame, color):
+    lines = _with_gaps(points)
+    cand = lines["cand"].to_numpy()
     fig.add_trace(
         go.Scatter(
-            x=x,
-            y=y,
+            x=lines["x"],
+            y=lines["y"],
             mode="lines",
-            legendgroup=obj_id,
-            name=f"candidate {obj_id}",
-            hovertemplate=parser_annotation(type, role, view_range),
+            name=", ".join(f"candidate {obj_id}" for obj_id in cands["obj_id"]),
+            text=cands["annotation"].reindex(cand).to_numpy(),
+            customdata=cands["obj_id"].reindex(cand).to_numpy(),
+            hovertemplate="%{text}<extra>candidate %{customdata}</extra>",
             line=dict(color=color, width=2),
         )
     )
 
 
 def parser_annotation(type=None, role=None, view_range=None):
-    view_range = f"vr={view_range}" if view_range else ""
-    txt_str = ", ".join(label.title() for label in [type, role, view_range] if label)
+    view_range = f"vr={view_range}" if view_range and not pd.isnull(view_range) else ""
+    txt_str = ", ".join(label.title() for label in [type, role, view_range] if isinstance(label, str) and label)
     return txt_str
@@ -2,7 +2,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 
+
+@measure_stage(FIGURE_STAGE)
 def basic_pie_chart(
     data: pd.DataFrame, names: str, values: str, title: str = "", hover: str | list[str] | None = None
 ) -> go.Figure:
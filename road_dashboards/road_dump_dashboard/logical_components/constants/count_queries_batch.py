@@ -0,0 +1,123 @@
+from concurrent.futures import Future
+from threading import Lock
+
+import pandas as pd
+from pypika import Case, Criterion, EmptyCriterion, Field, Query, functions
+from pypika.queries import QueryBuilder
+from pypika.terms import Term
+
+from road_dashboards.road_dump_dashboard.logical_components.constants.query_abstractions import base_data_subquery
+from road_dashboards.road_dump_dashboard.table_schemes.base import Base
+from road_dashboards.road_dump_dashboard.table_schemes.custom_functions import Grouping, GroupingSets, execute
+from road_dashboards.road_dump_dashboard.table_schemes.meta_data import MetaData
+
+
+class CountQueriesBatch:
+    """
+    Fuses the count queries of sibling grid objects into a single GROUP BY GROUPING SETS scan.
+    All members must share the same main table, page filters and intersection switch,
+    the result of the fused query is split back into a DataFrame per member.
+
+    Attributes:
+            members (list[tuple[Term, Criterion]]): the group by term and data filter of each member
+    """
+
+    def __init__(self):
+        self.members: list[tuple[Term, Criterion]] = []
+        self._inflight: dict[str, Future] = {}
+        self._lock = Lock()
+
+    def register(self, term: Term, data_filter: Criterion = EmptyCriterion()) -> int:
+        self.members.append((term, data_filter))
+        return len(self.members) - 1
+
+    def get_counts(
+        self,
+        member_id: int,
+        main_tables: list[Base],
+        meta_data_tables: list[Base],
+        page_filters: Criterion = EmptyCriterion(),
+        intersection_on: bool = False,
+    ) -> pd.DataFrame:
+        query = self.build_query(main_tables, meta_data_tables, page_filters, intersection_on)
+        query_key = str(query)
+        with self._lock:
+            future = self._inflight.get(query_key)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[query_key] = Future()
+
+        if is_owner:
+            try:
+                future.set_result(self.split_by_member(execute(query)))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(query_key, None)
+
+        return future.result()[member_id].copy()
+
+    def build_query(
+        self,
+        main_tables: list[Base],
+        meta_data_tables: list[Base],
+        page_filters: Criterion = EmptyCriterion(),
+        intersection_on: bool = False,
+    ) -> QueryBuilder:
+        dump_name = MetaData.dump_name
+        terms = [dump_name]
+        grouping_sets = []
+        for ind, (term, data_filter) in enumerate(self.members):
+            terms.append(term.as_(self.value_alias(ind)))
+            grouping_set = [Field(self.value_alias(ind))]
+            if not isinstance(data_filter, EmptyCriterion):
+                terms.append(Case().when(data_filter, 1).else_(0).as_(self.keep_alias(ind)))
+                grouping_set.append(Field(self.keep_alias(ind)))
+            grouping_sets.append([*grouping_set, Field(dump_name.alias)])
+
+        base = base_data_subquery(
+            main_tables=main_tables,
+            meta_data_tables=meta_data_tables,
+            terms=terms,
+            page_filters=page_filters,
+            intersection_on=intersection_on,
+            to_order=False,
+        )
+        selected_columns = [Field(column) for grouping_set in grouping_sets for column in grouping_set[:-1]]
+        grouping_flags = [
+            Grouping(Field(self.value_alias(ind)), alias=self.grouping_alias(ind)) for ind in range(len(self.members))
+        ]
+        query = (
+            Query.from_(base)
+            .groupby(GroupingSets(*grouping_sets))
+            .select(dump_name.alias, *selected_columns, *grouping_flags, functions.Count("*", "overall"))
+        )
+        return query
+
+    def split_by_member(self, data: pd.DataFrame) -> list[pd.DataFrame]:
+        dump_name = MetaData.dump_name.alias
+        members_data = []
+        for ind, (term, data_filter) in enumerate(self.members):
+            member_rows = data[data[self.grouping_alias(ind)] == 0]
+            if not isinstance(data_filter, EmptyCriterion):
+                member_rows = member_rows[member_rows[self.keep_alias(ind)] == 1]
+
+            member_data = member_rows[[self.value_alias(ind), dump_name, "overall"]].rename(
+                columns={self.value_alias(ind): term.alias}
+            )
+            members_data.append(member_data.reset_index(drop=True))
+
+        return members_data
+
+    @staticmethod
+    def value_alias(ind: int) -> str:
+        return f"value_{ind}"
+
+    @staticmethod
+    def keep_alias(ind: int) -> str:
+        return f"keep_{ind}"
+
+    @staticmethod
+    def grouping_alias(ind: int) -> str:
+        return f"grouping_{ind}"
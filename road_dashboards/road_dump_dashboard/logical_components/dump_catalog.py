@@ -0,0 +1,173 @@
+import copy
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from threading import Lock, local
+
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+DUMP_CATALOG_TABLE = "algoroad_dump_catalog"
+DUMP_CATALOG_PRIMARY_KEY = "dump_name"
+DUMP_CATALOG_ITEMS_TTL_SECONDS = float(os.environ.get("DUMP_CATALOG_ITEMS_TTL_SECONDS", 300))
+DUMP_CATALOG_SCAN_TTL_SECONDS = float(os.environ.get("DUMP_CATALOG_SCAN_TTL_SECONDS", 60))
+DUMP_CATALOG_SCAN_SEGMENTS = int(os.environ.get("DUMP_CATALOG_SCAN_SEGMENTS", 4))
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+VERSION_ATTRIBUTES = ("stage", "last_change")
+
+
+def from_dynamo(value):
+    """Converts the Decimals of a DynamoDB item to ints / floats, so items are JSON serializable"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    elif isinstance(value, dict):
+        return {k: from_dynamo(v) for k, v in value.items()}
+    elif isinstance(value, (list, set)):
+        return [from_dynamo(v) for v in value]
+    return value
+
+
+def get_item_version(item):
+    return tuple(item.get(attribute) for attribute in VERSION_ATTRIBUTES)
+
+
+class DumpCatalog:
+    """
+    Access layer of the dumps catalog table shared by all the grid objects.
+    Items are kept in an in-process cache for items_ttl_seconds; multi dataset loads fetch the missing items with
+    BatchGetItem, and the catalog is read with a parallel scan of scan_segments segments, cached for scan_ttl_seconds.
+    Every scan also refreshes the cached items whose stage / last_change changed, so an updated dump is not served
+    stale until its TTL expires.
+    Each thread reads through its own DynamoDB resource made by dynamodb_factory, by default from a new boto3 session
+    configured by the standard AWS environment (credentials, AWS_DEFAULT_REGION), since boto3 sessions and resources
+    can't be shared between threads.
+    """
+
+    def __init__(
+        self,
+        table_name=DUMP_CATALOG_TABLE,
+        primary_key=DUMP_CATALOG_PRIMARY_KEY,
+        items_ttl_seconds=DUMP_CATALOG_ITEMS_TTL_SECONDS,
+        scan_ttl_seconds=DUMP_CATALOG_SCAN_TTL_SECONDS,
+        scan_segments=DUMP_CATALOG_SCAN_SEGMENTS,
+        dynamodb_factory=None,
+    ):
+        self.table_name = table_name
+        self.primary_key = primary_key
+        self.items_ttl_seconds = items_ttl_seconds
+        self.scan_ttl_seconds = scan_ttl_seconds
+        self.scan_segments = scan_segments
+        self.dynamodb_factory = dynamodb_factory or (lambda: boto3.session.Session().resource("dynamodb"))
+        self._local = local()
+        self._items = {}
+        self._scans = {}
+        self._lock = Lock()
+
+    @property
+    def dynamodb(self):
+        # boto3 resources aren't thread safe, each thread (callbacks, scan segments) uses its own
+        if getattr(self._local, "dynamodb", None) is None:
+            self._local.dynamodb = self.dynamodb_factory()
+        return self._local.dynamodb
+
+    def get_item(self, key):
+        return self.get_items([key])[0]
+
+    def get_items(self, keys):
+        """
+        The items of keys in the same order, fetched with BatchGetItem.
+        Raises a KeyError for keys missing from the catalog, rather than returning empty items that would show
+        as datasets without data.
+        """
+        items = self._get_cached_items(keys)
+        uncached_keys = [key for key in dict.fromkeys(keys) if key not in items]
+        if uncached_keys:
+            fetched_items = self._batch_get(uncached_keys)
+            self._cache_items(fetched_items.values(), refresh=True)
+            items.update(fetched_items)
+        missing_keys = [key for key in keys if key not in items]
+        if missing_keys:
+            raise KeyError(f"{missing_keys} not found in {self.table_name}")
+        return [copy.deepcopy(items[key]) for key in keys]
+
+    def scan(self, only_done=False):
+        """All the catalog items (only the ones whose stage is done with only_done), read with a parallel scan"""
+        now = time.time()
+        with self._lock:
+            cached_scan = self._scans.get(only_done)
+        if cached_scan is not None and now - cached_scan[0] <= self.scan_ttl_seconds:
+            return copy.deepcopy(cached_scan[1])
+
+        scan_kwargs = {"FilterExpression": Attr("stage").eq("done")} if only_done else {}
+        with ThreadPoolExecutor(max_workers=self.scan_segments) as executor:
+            segments = [
+                executor.submit(self._scan_segment, segment, **scan_kwargs) for segment in range(self.scan_segments)
+            ]
+            items = [item for segment in segments for item in segment.result()]
+
+        self._cache_items(items)
+        with self._lock:
+            self._scans[only_done] = (now, items)
+        return copy.deepcopy(items)
+
+    def invalidate(self, keys=None):
+        with self._lock:
+            if keys is None:
+                self._items.clear()
+            else:
+                for key in keys:
+                    self._items.pop(key, None)
+            self._scans.clear()
+
+    def _get_cached_items(self, keys):
+        now = time.time()
+        with self._lock:
+            return {
+                key: self._items[key][1]
+                for key in keys
+                if key in self._items and now - self._items[key][0] <= self.items_ttl_seconds
+            }
+
+    def _cache_items(self, items, refresh=False):
+        now = time.time()
+        with self._lock:
+            for item in items:
+                key = item[self.primary_key]
+                cached = self._items.get(key)
+                # without refresh (scan results) the TTL of an unchanged cached item isn't extended
+                if refresh or cached is None or get_item_version(cached[1]) != get_item_version(item):
+                    self._items[key] = (now, item)
+
+    def _batch_get(self, keys):
+        items = {}
+        for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+            batch_keys = keys[start : start + BATCH_GET_MAX_KEYS]
+            request = {self.table_name: {"Keys": [{self.primary_key: key} for key in batch_keys]}}
+            for attempt in range(BATCH_GET_MAX_RETRIES):
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response["Responses"].get(self.table_name, []):
+                    item = from_dynamo(item)
+                    items[item[self.primary_key]] = item
+                request = response.get("UnprocessedKeys")
+                if not request:
+                    break
+                time.sleep(0.05 * 2**attempt)
+            else:
+                raise RuntimeError(f"Failed to get {len(request[self.table_name]['Keys'])} items of {self.table_name}")
+        return items
+
+    def _scan_segment(self, segment, **scan_kwargs):
+        table = self.dynamodb.Table(self.table_name)
+        scan_kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=self.scan_segments)
+        items = []
+        while True:
+            response = table.scan(**scan_kwargs)
+            items.extend(from_dynamo(item) for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+dump_catalog = DumpCatalog()
@@ -11,7 +11,7 @@ from pypika.terms import LiteralValue
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import META_DATA
 from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wrappers import loading_wrapper
 from road_dashboards.road_dump_dashboard.logical_components.constants.query_abstractions import base_data_subquery
-from road_dashboards.road_dump_dashboard.logical_components.grid_objects.catalog_table import dump_db_manager
+from road_dashboards.road_dump_dashboard.logical_components.dump_catalog import dump_catalog
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.grid_object import GridObject
 from road_dashboards.road_dump_dashboard.table_schemes.base import Base
 from road_dashboards.road_dump_dashboard.table_schemes.custom_functions import execute, load_object, optional_inputs
@@ -199,7 +199,7 @@ class BoostingControl(GridObject):
     def get_conditions_list(
         chosen_dataset: str, population: str, split_data: dict[str, list[dict[str, str]]] | None
     ) -> list[dict[str, str]]:
-        conditions_dict = split_data or dump_db_manager.get_item(chosen_dataset).get("split_conditions", {})
+        conditions_dict = split_data or dump_catalog.get_item(chosen_dataset).get("split_conditions", {})
         conditions = conditions_dict.get(f"{population}_batch_conditions") or conditions_dict["all_batch_conditions"]
         return [{"unfiltered": "TRUE"}] + conditions
 
@@ -7,20 +7,17 @@ import pandas as pd
 from angie_shuffle_service.shuffle_service import (
     get_dataset,
 )
-from boto3.dynamodb.conditions import Attr
 from dash import Input, Output, State, callback, dash_table, html, no_update
-from road_database_toolkit.dynamo_db.db_manager import DBManager
 
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import MEXSENSE_DATA, URL
 from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wrappers import (
     card_wrapper,
     loading_wrapper,
 )
+from road_dashboards.road_dump_dashboard.logical_components.dump_catalog import dump_catalog
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.grid_object import GridObject
 from road_dashboards.road_dump_dashboard.logical_components.mexsense_link import get_mexsense_link
 
-dump_db_manager = DBManager(table_name="algoroad_dump_catalog", primary_key="dump_name")
-
 table_columns = {
     "dump_name": "Dataset Name",
     "use_case": "Use Case",
@@ -162,8 +159,9 @@ class CatalogTable(GridObject):
             Input(self.filter_not_completed_switch_id, "on"),
         )
         def update_catalog_data(dummy_trigger, filter_not_completed):
-            filter_condition = {"FilterExpression": Attr("stage").eq("done")} if filter_not_completed else {}
-            catalog_data = pd.DataFrame(dump_db_manager.scan(**filter_condition), columns=list(table_columns.keys()))
+            catalog_data = pd.DataFrame(
+                dump_catalog.scan(only_done=bool(filter_not_completed)), columns=list(table_columns.keys())
+            )
             catalog_data["total_frames"] = catalog_data["total_frames"].apply(lambda x: sum(x.values()))
             catalog_data_dict = catalog_data.to_dict("records")
             return catalog_data_dict
@@ -192,7 +190,7 @@ class CatalogTable(GridObject):
                 return no_update, ""
 
             datasets_ids = self.parse_catalog_rows(rows, derived_virtual_selected_rows)["dump_name"]
-            datasets = [dump_db_manager.get_item(dataset_id) for dataset_id in datasets_ids]
+            datasets = dump_catalog.get_items(list(datasets_ids))
             datasets = pd.DataFrame(datasets)
 
             dumps_list = list(datasets["dump_name"])
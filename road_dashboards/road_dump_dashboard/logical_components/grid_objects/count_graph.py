@@ -11,6 +11,7 @@ from road_dashboards.road_dump_dashboard.graphical_components.histogram_plot imp
 from road_dashboards.road_dump_dashboard.graphical_components.line_graph import draw_line_graph
 from road_dashboards.road_dump_dashboard.graphical_components.pie_chart import basic_pie_chart
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import META_DATA
+from road_dashboards.road_dump_dashboard.logical_components.constants.count_queries_batch import CountQueriesBatch
 from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wrappers import (
     card_wrapper,
     loading_wrapper,
@@ -35,6 +36,7 @@ class CountGraph(GridObject):
             columns (list[Selectable]): columns to group by (and count)
             slider_value (int): optional. round after n decimal places, default None
             filter (str): optional. filter to apply on the datasets
+            query_batch (CountQueriesBatch): optional. batch to fuse this graph's default query with its siblings
     """
 
     def __init__(
@@ -47,6 +49,7 @@ class CountGraph(GridObject):
         columns_dropdown_id: str = "",
         filter: Criterion = EmptyCriterion(),
         slider_value: int | None = None,
+        query_batch: CountQueriesBatch | None = None,
         full_grid_row: bool = False,
         component_id: str = "",
     ):
@@ -61,6 +64,12 @@ class CountGraph(GridObject):
         assert self.column or self.columns_dropdown_id, (
             "you have to provide input column, explicitly or through dropdown"
         )
+        self.query_batch = query_batch if self.column else None
+        self.batch_member_id = (
+            self.query_batch.register(self.round_term(self.column, self.slider_value), self.filter)
+            if self.query_batch
+            else None
+        )
         super().__init__(full_grid_row=full_grid_row, component_id=component_id)
 
     def _generate_ids(self):
@@ -148,6 +157,20 @@ class CountGraph(GridObject):
             page_filters: Criterion = load_object(page_filters) if page_filters else EmptyCriterion()
 
             dump_name = MetaData.dump_name
+            y_col = "percentage" if compute_percentage else "overall"
+            title = self.title or f"{column.alias.title()} Distribution"
+            if self.is_batch_state(round_n_decimal_place, filter_ignores):
+                data = self.query_batch.get_counts(
+                    self.batch_member_id,
+                    main_tables=main_tables,
+                    meta_data_tables=md_tables,
+                    page_filters=page_filters,
+                    intersection_on=intersection_on,
+                )
+                if compute_percentage:
+                    data = self.local_percentage(data, "overall", [dump_name.alias], [column.alias])
+                return self.pie_or_line_graph(data, column.alias, y_col, title=title, color=dump_name.alias)
+
             base = base_data_subquery(
                 main_tables=main_tables,
                 meta_data_tables=md_tables,
@@ -164,12 +187,17 @@ class CountGraph(GridObject):
             if compute_percentage:
                 query = self.percentage_wrapper(query, query.overall, [dump_name], [column])
 
-            y_col = "percentage" if compute_percentage else "overall"
             data = execute(query)
-            title = self.title or f"{column.alias.title()} Distribution"
             fig = self.pie_or_line_graph(data, column.alias, y_col, title=title, color=dump_name.alias)
             return fig
 
+    def is_batch_state(self, round_n_decimal_place: int | None, filter_ignores: bool) -> bool:
+        return (
+            self.query_batch is not None
+            and round_n_decimal_place == self.slider_value
+            and (filter_ignores or isinstance(self.filter, EmptyCriterion))
+        )
+
     @staticmethod
     def pie_or_line_graph(
         data: pd.DataFrame,
@@ -207,3 +235,15 @@ class CountGraph(GridObject):
             "percentage"
         )
         return Query.from_(sub_query).select(*partition_columns, *[term.alias for term in terms], percentage_calc)
+
+    @staticmethod
+    def local_percentage(
+        data: pd.DataFrame,
+        percentage_column: str,
+        partition_columns: list[str],
+        columns: list[str],
+    ) -> pd.DataFrame:
+        data = data.copy()
+        partition_sum = data.groupby(partition_columns)[percentage_column].transform("sum")
+        data["percentage"] = data[percentage_column] * 100.0 / partition_sum
+        return data[[*partition_columns, *columns, "percentage"]]
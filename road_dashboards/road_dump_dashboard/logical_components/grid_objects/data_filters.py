@@ -53,7 +53,7 @@ class DataFilters(GridObject):
     def layout(self):
         empty_layout = card_wrapper(
             [
-                dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion())),
+                dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion(), pin=True)),
                 html.H3("Filters"),
                 html.Div(
                     id=self.component_id,
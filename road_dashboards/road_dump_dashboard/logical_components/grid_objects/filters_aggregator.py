@@ -18,7 +18,7 @@ class FiltersAggregator(GridObject):
         self.final_filter_id = self._generate_id("final_filter")
 
     def layout(self):
-        return dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion()))
+        return dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion(), pin=True))
 
     def _callbacks(self):
         @callback(
@@ -1,13 +1,20 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import get_origin
+
 import dash_bootstrap_components as dbc
 import numpy as np
 import orjson
 import pandas as pd
-from dash import Input, Output, Patch, State, callback, callback_context, clientside_callback, dcc, html, no_update
+from dash import Input, Output, State, callback, callback_context, clientside_callback, dcc, html, no_update
+from dash.development.base_component import Component
 from pypika import Criterion, EmptyCriterion, Query, Tuple
 from pypika.queries import QueryBuilder
 from pypika.terms import Term
 from road_database_toolkit.dynamo_db.drone_view_images.db_manager import DroneViewDBManager
 
+from road_dashboards.common.lru_cache import LRUCache
 from road_dashboards.road_dump_dashboard.graphical_components.frame_drawer import draw_img, draw_top_view
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import META_DATA
 from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wrappers import loading_wrapper
@@ -19,18 +26,32 @@ from road_dashboards.road_dump_dashboard.logical_components.constants.query_abst
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.conf_mat_graph import ConfMatGraph
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.data_filters import DataFilters
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.grid_object import GridObject
-from road_dashboards.road_dump_dashboard.table_schemes.base import Base
+from road_dashboards.road_dump_dashboard.table_schemes.base import Base, Column
 from road_dashboards.road_dump_dashboard.table_schemes.custom_functions import (
     dump_object,
     execute,
     load_object,
+    load_sql,
     optional_inputs,
 )
 from road_dashboards.road_dump_dashboard.table_schemes.meta_data import MetaData
 
+# per worker process, shared by all users: a few queries, the frames around the current ones and their images
+FRAMES_MODAL_QUERIES_CACHE_ENTRIES = int(os.environ.get("FRAMES_MODAL_QUERIES_CACHE_ENTRIES", 8))
+FRAMES_MODAL_GRAPHS_CACHE_ENTRIES = int(os.environ.get("FRAMES_MODAL_GRAPHS_CACHE_ENTRIES", 16))
+FRAMES_MODAL_IMAGES_CACHE_BYTES = int(os.environ.get("FRAMES_MODAL_IMAGES_CACHE_MB", 64)) * 2**20
+
+_dumps_frames_cache = LRUCache(maxsize=FRAMES_MODAL_QUERIES_CACHE_ENTRIES)
+_frame_graphs_cache = LRUCache(maxsize=FRAMES_MODAL_GRAPHS_CACHE_ENTRIES)
+_images_cache = LRUCache(maxsize=256, maxbytes=FRAMES_MODAL_IMAGES_CACHE_BYTES, sizeof=lambda image: image.nbytes)
+_frames_inflight: dict[tuple[str, int], Future] = {}
+_frames_inflight_lock = Lock()
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="frames-prefetch")
+
 
 class FramesModal(GridObject):
     IMG_LIMIT: int = 64
+    PREFETCH_WINDOW: int = 2
 
     def __init__(
         self,
@@ -46,7 +67,7 @@ class FramesModal(GridObject):
 
     def _generate_ids(self):
         self.curr_img_index_id = self._generate_id("curr_img_index")
-        self.curr_num_of_drawn_datasets_id = self._generate_id("curr_num_of_drawn_datasets")
+        self.curr_num_of_frames_id = self._generate_id("curr_num_of_frames")
         self.curr_query_id = self._generate_id("curr_query")
 
         self.images_layout_id = self._generate_id("images_layout")
@@ -57,7 +78,7 @@ class FramesModal(GridObject):
         frames_layout = dbc.Modal(
             [
                 dcc.Store(id=self.curr_img_index_id, data=0),
-                dcc.Store(id=self.curr_num_of_drawn_datasets_id),
+                dcc.Store(id=self.curr_num_of_frames_id),
                 dcc.Store(id=self.curr_query_id),
                 html.Div(id=self.prev_btn_id, hidden=True),
                 html.Div(id=self.next_btn_id, hidden=True),
@@ -123,7 +144,7 @@ class FramesModal(GridObject):
                     page_filters=page_filters,
                     limit=self.IMG_LIMIT,
                 )
-                return dump_object(query), True
+                return self.frames_query_data(query, extra_columns), True
 
         for triggering_filter in self.triggering_filters:
 
@@ -157,7 +178,7 @@ class FramesModal(GridObject):
                     page_filters=load_object(filters),
                     limit=self.IMG_LIMIT,
                 )
-                return dump_object(query), True
+                return self.frames_query_data(query, extra_columns), True
 
         clientside_callback(
             """
@@ -181,7 +202,7 @@ class FramesModal(GridObject):
 
         @callback(
             Output(self.images_layout_id, "children"),
-            Output(self.curr_num_of_drawn_datasets_id, "data"),
+            Output(self.curr_num_of_frames_id, "data"),
             Output(self.curr_img_index_id, "data"),
             Input(self.curr_query_id, "data"),
             prevent_initial_call=True,
@@ -189,9 +210,16 @@ class FramesModal(GridObject):
         def init_frame_graphs(
             curr_query,
         ):
-            data = execute(load_object(curr_query))
-            images_layout = self.generate_layout_from_query_data(data)
-            return images_layout, len(images_layout), 0
+            if not curr_query:
+                return no_update, no_update, no_update
+
+            num_of_frames = max((len(frames) for frames in self.get_dumps_frames(curr_query)), default=0)
+            if not num_of_frames:
+                return [], 0, 0
+
+            images_layout = self.generate_frame_layout(curr_query, 0)
+            self.prefetch_frames(curr_query, 0, num_of_frames)
+            return images_layout, num_of_frames, 0
 
         @callback(
             Output(self.images_layout_id, "children", allow_duplicate=True),
@@ -199,93 +227,165 @@ class FramesModal(GridObject):
             Input(self.prev_btn_id, "n_clicks"),
             Input(self.next_btn_id, "n_clicks"),
             State(self.curr_img_index_id, "data"),
-            State(self.curr_num_of_drawn_datasets_id, "data"),
+            State(self.curr_num_of_frames_id, "data"),
+            State(self.curr_query_id, "data"),
             prevent_initial_call=True,
         )
         def update_frame_graphs(
             prev_n_clicks,
             next_n_clicks,
             img_ind,
-            num_of_drawn_datasets,
+            num_of_frames,
+            curr_query,
         ):
-            images_layout = Patch()
             n_clicks = callback_context.triggered[0]["value"]
-            if n_clicks == 0:
+            if n_clicks == 0 or not num_of_frames:
                 return no_update, no_update
 
-            self.edit_display_of_images_in_each_layout_row(images_layout, num_of_drawn_datasets, img_ind, "none")
             triggered_id = callback_context.triggered_id
             if triggered_id == self.prev_btn_id:
-                img_ind = (img_ind - 1) % self.IMG_LIMIT
+                img_ind = (img_ind - 1) % num_of_frames
             elif triggered_id == self.next_btn_id:
-                img_ind = (img_ind + 1) % self.IMG_LIMIT
+                img_ind = (img_ind + 1) % num_of_frames
 
-            self.edit_display_of_images_in_each_layout_row(images_layout, num_of_drawn_datasets, img_ind, "block")
+            images_layout = self.generate_frame_layout(curr_query, img_ind)
+            self.prefetch_frames(curr_query, img_ind, num_of_frames)
             return images_layout, img_ind
 
     @staticmethod
-    def edit_display_of_images_in_each_layout_row(
-        images_layout: Patch, num_of_drawn_datasets: int, img_ind: int, display: str
-    ):
-        for dataset_ind in range(num_of_drawn_datasets):
-            images_layout[dataset_ind]["props"]["children"][0]["props"]["children"]["props"]["children"][img_ind][
-                "props"
-            ]["style"]["display"] = display
-            images_layout[dataset_ind]["props"]["children"][1]["props"]["children"]["props"]["children"][img_ind][
-                "props"
-            ]["style"]["display"] = display
-
-    @staticmethod
-    def generate_layout_from_query_data(data: pd.DataFrame):
-        labels_df = FramesModal.parse_labels_df(data)
-
-        indexes_df = labels_df[["clip_name", "grabindex"]].drop_duplicates()
-        clip_names = indexes_df.clip_name
-        grab_indexes = [int(gi) for gi in indexes_df.grabindex]
-        data_types = ["data"] * len(clip_names)
-        images = DroneViewDBManager.load_multiple_clips_images(clip_names, grab_indexes, data_types)
-
-        dumps_df_list = [d for _, d in labels_df.groupby(["dump_name"])]
+    def generate_frame_layout(curr_query: dict, img_ind: int) -> list[Component]:
         final_layout = []
-        for dump_df in dumps_df_list:
-            frames_df_list = [i for _, i in dump_df.groupby(["clip_name", "grabindex"])]
-            img_graphs = []
-            world_graphs = []
-            for frames_df in frames_df_list:
-                curr_img = images[frames_df.clip_name.iloc[0]]["data"][frames_df.grabindex.iloc[0]][0][0]
-                img_graphs.append(
-                    draw_img(
-                        curr_img,
-                        frames_df,
-                        frames_df.dump_name.iloc[0],
-                        frames_df.clip_name.iloc[0],
-                        frames_df.grabindex.iloc[0],
-                    )
-                )
-                world_graphs.append(draw_top_view(frames_df))
-
-            img_graphs[0].style["display"] = "block"
-            world_graphs[0].style["display"] = "block"
+        for img_graph, world_graph in FramesModal.get_frame_graphs(curr_query, img_ind):
             dump_row = dbc.Row(
-                [dbc.Col(loading_wrapper(img_graphs), width=10), dbc.Col(loading_wrapper(world_graphs), width=2)]
+                [dbc.Col(loading_wrapper(img_graph), width=10), dbc.Col(loading_wrapper(world_graph), width=2)]
             )
             final_layout.append(dump_row)
 
         return final_layout
 
     @staticmethod
-    def parse_labels_df(labels_df: pd.DataFrame):
-        if labels_df.empty:
-            return {}
+    def prefetch_frames(curr_query: dict, img_ind: int, num_of_frames: int):
+        """Draws the frames around img_ind in the background, so moving to them is served from the cache"""
+        for offset in range(1, FramesModal.PREFETCH_WINDOW + 1):
+            for frame_ind in {(img_ind + offset) % num_of_frames, (img_ind - offset) % num_of_frames}:
+                key = (curr_query["query"], frame_ind)
+                with _frames_inflight_lock:
+                    if key in _frame_graphs_cache or key in _frames_inflight:
+                        continue
+                _prefetch_executor.submit(FramesModal.get_frame_graphs, curr_query, frame_ind)
+
+    @staticmethod
+    def get_frame_graphs(curr_query: dict, img_ind: int) -> list[tuple[Component, Component]]:
+        """The image and top view graphs of frame img_ind for each drawn dump, drawn once and kept in an LRU"""
+        key = (curr_query["query"], img_ind)
+        frame_graphs = _frame_graphs_cache.get(key)
+        if frame_graphs is not None:
+            return frame_graphs
+
+        with _frames_inflight_lock:
+            future = _frames_inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = _frames_inflight[key] = Future()
+
+        if is_owner:
+            try:
+                frame_graphs = FramesModal.draw_frame_graphs(curr_query, img_ind)
+                _frame_graphs_cache.set(key, frame_graphs)
+                future.set_result(frame_graphs)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with _frames_inflight_lock:
+                    _frames_inflight.pop(key, None)
+
+        return future.result()
+
+    @staticmethod
+    def draw_frame_graphs(curr_query: dict, img_ind: int) -> list[tuple[Component, Component]]:
+        frames_df_list = [frames[img_ind % len(frames)] for frames in FramesModal.get_dumps_frames(curr_query)]
+        frame_ids = [(frames_df.clip_name.iloc[0], int(frames_df.grabindex.iloc[0])) for frames_df in frames_df_list]
+        images = FramesModal.load_images(frame_ids)
+
+        frame_graphs = []
+        for frames_df, frame_id in zip(frames_df_list, frame_ids):
+            img_graph = draw_img(
+                images[frame_id],
+                frames_df,
+                frames_df.dump_name.iloc[0],
+                frames_df.clip_name.iloc[0],
+                frames_df.grabindex.iloc[0],
+            )
+            world_graph = draw_top_view(frames_df)
+            img_graph.style["display"] = "block"
+            world_graph.style["display"] = "block"
+            frame_graphs.append((img_graph, world_graph))
+
+        return frame_graphs
+
+    @staticmethod
+    def load_images(frame_ids: list[tuple[str, int]]) -> dict[tuple[str, int], np.ndarray]:
+        images = {frame_id: _images_cache.get(frame_id) for frame_id in frame_ids}
+        missing = list({frame_id for frame_id, image in images.items() if image is None})
+        if missing:
+            clip_names = [clip_name for clip_name, _ in missing]
+            grab_indexes = [grab_index for _, grab_index in missing]
+            data_types = ["data"] * len(missing)
+            loaded = DroneViewDBManager.load_multiple_clips_images(clip_names, grab_indexes, data_types)
+            for clip_name, grab_index in missing:
+                image = loaded[clip_name]["data"][grab_index][0][0]
+                _images_cache.set((clip_name, grab_index), image)
+                images[(clip_name, grab_index)] = image
+
+        return images
+
+    @staticmethod
+    def get_dumps_frames(curr_query: dict) -> list[list[pd.DataFrame]]:
+        """The labels of the query, split per dump and then per frame. Parsed once per query handle"""
+        dumps_frames = _dumps_frames_cache.get(curr_query["query"])
+        if dumps_frames is not None:
+            return dumps_frames
+
+        labels_df = FramesModal.parse_labels_df(execute(load_sql(curr_query["query"])), curr_query["list_columns"])
+        dumps_frames = []
+        if len(labels_df):
+            for _, dump_df in labels_df.groupby(["dump_name"]):
+                dumps_frames.append([frames_df for _, frames_df in dump_df.groupby(["clip_name", "grabindex"])])
+
+        _dumps_frames_cache.set(curr_query["query"], dumps_frames)
+        return dumps_frames
+
+    @staticmethod
+    def frames_query_data(query: QueryBuilder, label_columns: list[Column]) -> dict:
+        list_columns = [column.alias for column in label_columns if get_origin(column.type) is list]
+        return {"query": dump_object(query), "list_columns": list_columns}
+
+    @staticmethod
+    def parse_labels_df(labels_df: pd.DataFrame, list_columns: list[str]) -> pd.DataFrame:
+        """Decodes the JSON list columns into NumPy arrays, one orjson call per column"""
+        for column in list_columns:
+            if column not in labels_df:
+                continue
+
+            values = labels_df[column]
+            is_json = values.map(lambda value: isinstance(value, str)).to_numpy()
+            try:
+                decoded = orjson.loads("[" + ",".join(values[is_json]) + "]")
+            except orjson.JSONDecodeError:
+                labels_df[column] = values.map(FramesModal.safe_json)
+                continue
+
+            parsed = values.to_numpy(dtype=object, copy=True)
+            parsed[is_json] = pd.Series([np.array(value) for value in decoded], dtype=object).to_numpy()
+            labels_df[column] = parsed
 
-        labels_df = labels_df.map(FramesModal.safe_json)
         return labels_df
 
     @staticmethod
     def safe_json(x):
         try:
             return np.array(orjson.loads(x))
-        except orjson.JSONDecodeError:
+        except (orjson.JSONDecodeError, TypeError):
             return x
 
     @staticmethod
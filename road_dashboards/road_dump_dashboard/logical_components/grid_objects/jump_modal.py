@@ -3,12 +3,11 @@ from typing import Callable
 
 import dash_bootstrap_components as dbc
 from dash import Input, Output, State, callback, dcc, no_update
-from pypika import Criterion, EmptyCriterion, Query, functions
-from pypika import analytics as an
-from pypika.enums import SqlTypes
+from pypika import Criterion, EmptyCriterion, Query
 from pypika.queries import QueryBuilder, Selectable
-from pypika.terms import Case, Term
+from pypika.terms import Term
 
+from road_dashboards.common.event_segmentation import generate_events_query
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import META_DATA
 from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wrappers import loading_wrapper
 from road_dashboards.road_dump_dashboard.logical_components.constants.query_abstractions import (
@@ -50,6 +49,7 @@ class JumpModal(GridObject):
         self.extra_columns_dropdown_id = self._generate_id("extra_columns_dropdown")
         self.diff_tolerance_input_id = self._generate_id("diff_tolerance_input")
         self.limit_input_id = self._generate_id("limit_input")
+        self.min_event_length_input_id = self._generate_id("min_event_length_input")
         self.generate_jump_btn_id = self._generate_id("generate_jump_btn")
         self.download_jump_id = self._generate_id("download_jump")
         self.curr_query_id = self._generate_id("curr_query")
@@ -105,6 +105,15 @@ class JumpModal(GridObject):
                                         type="number",
                                     )
                                 ),
+                                dbc.Col(
+                                    dcc.Input(
+                                        id=self.min_event_length_input_id,
+                                        style={"minWidth": "100%"},
+                                        placeholder="Min event length in frames (default 1):",
+                                        type="number",
+                                        min=1,
+                                    )
+                                ),
                             ],
                             className="mt-3",
                         ),
@@ -211,11 +220,14 @@ class JumpModal(GridObject):
             State(self.curr_query_id, "data"),
             State(self.diff_tolerance_input_id, "value"),
             State(self.limit_input_id, "value"),
+            State(self.min_event_length_input_id, "value"),
             State(self.extra_columns_dropdown_id, "value"),
             State(self.page_filters_id, "data"),
             State(self.jump_name_input_id, "value"),
         )
-        def generate_jump(n_clicks, curr_query, diff_tolerance, lines_limit, extra_terms, page_filters, jump_name):
+        def generate_jump(
+            n_clicks, curr_query, diff_tolerance, lines_limit, min_event_length, extra_terms, page_filters, jump_name
+        ):
             if not n_clicks or not curr_query:
                 return no_update
 
@@ -239,6 +251,7 @@ class JumpModal(GridObject):
                 terms=updated_terms,
                 limit=lines_limit,
                 diff_tolerance=diff_tolerance,
+                min_event_length=min_event_length,
             )
             jump_frames = execute(query)
             if jump_frames.empty:
@@ -253,10 +266,16 @@ class JumpModal(GridObject):
         terms: list[Term],
         limit: int | None = None,
         diff_tolerance: int = 0,
-    ) -> QueryBuilder:
+        min_event_length: int | None = None,
+    ) -> str:
         unique_frames_query = JumpModal.select_unique_frames(sub_query, terms)
-        group_ids_query = JumpModal.add_groups_ids_based_on_diff(unique_frames_query, terms, diff_tolerance)
-        final_query = JumpModal.select_one_term_per_group(group_ids_query, terms, limit)
+        final_query = generate_events_query(
+            unique_frames_query,
+            extra_columns=[term.alias for term in terms if term.alias not in ["clip_name", "grabindex", "obj_id"]],
+            diff_tolerance=diff_tolerance,
+            min_event_length=min_event_length,
+            limit=limit,
+        )
         return final_query
 
     @staticmethod
@@ -267,55 +286,3 @@ class JumpModal(GridObject):
             .groupby(base_data_query.clip_name, base_data_query.grabindex)
         )
         return query
-
-    @staticmethod
-    def add_groups_ids_based_on_diff(
-        unique_frames_query: QueryBuilder, terms: list[Term], diff_tolerance: int
-    ) -> QueryBuilder:
-        new_groups_query = Query.from_(unique_frames_query).select(
-            *terms,
-            Case(alias="is_new_group")
-            .when(
-                (
-                    unique_frames_query.grabindex
-                    - an.Lag(unique_frames_query.grabindex)
-                    .over()
-                    .orderby(unique_frames_query.clip_name, unique_frames_query.grabindex)
-                )
-                > diff_tolerance,
-                1,
-            )
-            .else_(0),
-        )
-        cum_sum_groups_query = Query.from_(new_groups_query).select(
-            *terms,
-            an.Sum(new_groups_query.is_new_group)
-            .orderby(new_groups_query.clip_name, new_groups_query.grabindex)
-            .as_("group_id"),
-        )
-        return cum_sum_groups_query
-
-    @staticmethod
-    def select_one_term_per_group(
-        sum_groups_query: QueryBuilder, terms: list[Term], limit: int | None = None
-    ) -> QueryBuilder:
-        final_query = (
-            Query.from_(sum_groups_query)
-            .select(
-                MetaData.clip_name,
-                functions.Cast(functions.Min(sum_groups_query.grabindex), SqlTypes.INTEGER).as_("startframe"),
-                functions.Cast(functions.Max(sum_groups_query.grabindex), SqlTypes.INTEGER).as_("endframe"),
-                functions.Cast(
-                    functions.Max(sum_groups_query.grabindex) - functions.Min(sum_groups_query.grabindex) + 1,
-                    SqlTypes.INTEGER,
-                ).as_("event_length"),
-                *[
-                    Arbitrary(term, alias=term.alias)
-                    for term in terms
-                    if term.alias not in ["clip_name", "grabindex", "obj_id"]
-                ],
-            )
-            .groupby(sum_groups_query.clip_name, sum_groups_query.group_id)
-            .limit(limit)
-        )
-        return final_query
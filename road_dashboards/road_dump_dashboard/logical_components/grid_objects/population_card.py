@@ -24,7 +24,7 @@ class PopulationCard(GridObject):
 
     def layout(self):
         population_layout = [
-            dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion())),
+            dcc.Store(self.final_filter_id, data=dump_object(EmptyCriterion(), pin=True)),
             dcc.Dropdown(
                 options={population: population.title() for population in self.populations},
                 value=self.populations[0],
@@ -6,7 +6,7 @@ from road_dashboards.road_dump_dashboard.logical_components.constants.layout_wra
     card_wrapper,
     loading_wrapper,
 )
-from road_dashboards.road_dump_dashboard.logical_components.grid_objects.catalog_table import dump_db_manager
+from road_dashboards.road_dump_dashboard.logical_components.dump_catalog import dump_catalog
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.grid_object import GridObject
 
 
@@ -106,7 +106,7 @@ class WorkflowTable(GridObject):
 
     @staticmethod
     def get_workflow_dict(chosen_dataset: str, drop_successes: bool = False) -> dict[str, any]:
-        workflow_dict = dump_db_manager.get_item(chosen_dataset).get("common_exit_codes", {})
+        workflow_dict = dump_catalog.get_item(chosen_dataset).get("common_exit_codes", {})
         if drop_successes:
             workflow_dict.pop("0", None)
 
@@ -1,5 +1,6 @@
 from dash import html, register_page
 
+from road_dashboards.road_dump_dashboard.logical_components.constants.count_queries_batch import CountQueriesBatch
 from road_dashboards.road_dump_dashboard.logical_components.constants.page_properties import PageProperties
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.columns_dropdown import ColumnsDropdown
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.conf_mat_graph import ConfMatGraph
@@ -32,12 +33,14 @@ obj_count_card = ObjCountCard(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
 )
+count_graphs_batch = CountQueriesBatch()
 type_count = CountGraph(
     main_table=page.main_table,
     title="Type Distribution",
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=LaneMarks.type,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 color_count = CountGraph(
@@ -46,6 +49,7 @@ color_count = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=LaneMarks.color,
+    query_batch=count_graphs_batch,
 )
 role_count = CountGraph(
     main_table=page.main_table,
@@ -53,6 +57,7 @@ role_count = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=LaneMarks.role,
+    query_batch=count_graphs_batch,
 )
 vr_hist = CountGraph(
     main_table=page.main_table,
@@ -62,6 +67,7 @@ vr_hist = CountGraph(
     column=LaneMarks.max_view_range,
     filter=LaneMarks.max_view_range < 250,
     slider_value=0,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 dashed_len_hist = CountGraph(
@@ -72,6 +78,7 @@ dashed_len_hist = CountGraph(
     column=LaneMarks.dashed_length,
     filter=LaneMarks.dashed_length[0:20],
     slider_value=1,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 dashed_gap_hist = CountGraph(
@@ -82,6 +89,7 @@ dashed_gap_hist = CountGraph(
     column=LaneMarks.dashed_gap,
     filter=LaneMarks.dashed_gap[0:25],
     slider_value=1,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 lm_width_hist = CountGraph(
@@ -92,6 +100,7 @@ lm_width_hist = CountGraph(
     column=LaneMarks.avg_width,
     filter=(LaneMarks.avg_width > 0) & (LaneMarks.avg_width < 1.5),
     slider_value=2,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 obj_count = ObjCountGraph(
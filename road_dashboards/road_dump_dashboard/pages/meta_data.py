@@ -1,6 +1,7 @@
 from dash import html, register_page
 
 from road_dashboards.road_dump_dashboard.logical_components.constants.components_ids import META_DATA
+from road_dashboards.road_dump_dashboard.logical_components.constants.count_queries_batch import CountQueriesBatch
 from road_dashboards.road_dump_dashboard.logical_components.constants.page_properties import PageProperties
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.columns_dropdown import ColumnsDropdown
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.conf_mat_graph import ConfMatGraph
@@ -34,12 +35,14 @@ obj_count_card = ObjCountCard(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
 )
+count_graphs_batch = CountQueriesBatch()
 tv_prefects_count = CountGraph(
     main_table=page.main_table,
     title="Top View Perfects Exists",
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.is_tv_perfect,
+    query_batch=count_graphs_batch,
 )
 gtem_count = CountGraph(
     main_table=page.main_table,
@@ -47,6 +50,7 @@ gtem_count = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.gtem_labels_exist,
+    query_batch=count_graphs_batch,
 )
 curve_rad_hist = CountGraph(
     main_table=page.main_table,
@@ -56,6 +60,7 @@ curve_rad_hist = CountGraph(
     column=MetaData.curve_rad_ahead,
     filter=MetaData.curve_rad_ahead != 99999,
     slider_value=-2,
+    query_batch=count_graphs_batch,
     full_grid_row=True,
 )
 road_type_hist = CountGraph(
@@ -64,6 +69,7 @@ road_type_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.road_type,
+    query_batch=count_graphs_batch,
 )
 lm_color_hist = CountGraph(
     main_table=page.main_table,
@@ -71,6 +77,7 @@ lm_color_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.lm_color,
+    query_batch=count_graphs_batch,
 )
 hwe_hist = CountGraph(
     main_table=page.main_table,
@@ -78,6 +85,7 @@ hwe_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.hwe_event,
+    query_batch=count_graphs_batch,
 )
 curve_hist = CountGraph(
     main_table=page.main_table,
@@ -85,6 +93,7 @@ curve_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.curve,
+    query_batch=count_graphs_batch,
 )
 driving_conditions_hist = CountGraph(
     main_table=page.main_table,
@@ -92,6 +101,7 @@ driving_conditions_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.driving_conditions,
+    query_batch=count_graphs_batch,
 )
 sensors_hist = CountGraph(
     main_table=page.main_table,
@@ -99,6 +109,7 @@ sensors_hist = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=MetaData.sensors,
+    query_batch=count_graphs_batch,
 )
 
 count_columns_dropdown = ColumnsDropdown(main_table=page.main_table, full_grid_row=True)
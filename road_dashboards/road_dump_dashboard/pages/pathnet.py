@@ -1,5 +1,6 @@
 from dash import html, register_page
 
+from road_dashboards.road_dump_dashboard.logical_components.constants.count_queries_batch import CountQueriesBatch
 from road_dashboards.road_dump_dashboard.logical_components.constants.page_properties import PageProperties
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.columns_dropdown import ColumnsDropdown
 from road_dashboards.road_dump_dashboard.logical_components.grid_objects.conf_mat_graph import ConfMatGraph
@@ -32,12 +33,14 @@ obj_count_card = ObjCountCard(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
 )
+count_graphs_batch = CountQueriesBatch()
 role_count = CountGraph(
     main_table=page.main_table,
     title="Role Distribution",
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=PathNet.dp_role,
+    query_batch=count_graphs_batch,
 )
 split_count = CountGraph(
     main_table=page.main_table,
@@ -46,6 +49,7 @@ split_count = CountGraph(
     intersection_switch_id=intersection_switch.component_id,
     column=PathNet.dp_split_role,
     filter=PathNet.dp_split_role != "IGNORE",
+    query_batch=count_graphs_batch,
 )
 primary_count = CountGraph(
     main_table=page.main_table,
@@ -54,6 +58,7 @@ primary_count = CountGraph(
     intersection_switch_id=intersection_switch.component_id,
     column=PathNet.dp_primary_role,
     filter=PathNet.dp_primary_role != "IGNORE",
+    query_batch=count_graphs_batch,
 )
 merge_count = CountGraph(
     main_table=page.main_table,
@@ -62,6 +67,7 @@ merge_count = CountGraph(
     intersection_switch_id=intersection_switch.component_id,
     column=PathNet.dp_merge_role,
     filter=PathNet.dp_merge_role != "IGNORE",
+    query_batch=count_graphs_batch,
 )
 oncoming_count = CountGraph(
     main_table=page.main_table,
@@ -69,6 +75,7 @@ oncoming_count = CountGraph(
     page_filters_id=filters_agg.final_filter_id,
     intersection_switch_id=intersection_switch.component_id,
     column=PathNet.dp_points_oncoming,
+    query_batch=count_graphs_batch,
 )
 obj_count = ObjCountGraph(
     main_table=page.main_table,
@@ -0,0 +1,10 @@
+from dash import register_page
+
+from road_dashboards.common.perf_monitor import PERF_PAGE_PATH
+from road_dashboards.common.perf_page import perf_layout
+from road_dashboards.road_dump_dashboard.logical_components.constants.page_properties import PageProperties
+
+page = PageProperties(order=100, icon="tachometer-alt", path=PERF_PAGE_PATH, title="Performance")
+register_page(__name__, **page.__dict__)
+
+layout = perf_layout()
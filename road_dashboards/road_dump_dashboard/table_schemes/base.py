@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import copy
 import inspect
-from typing import Literal, get_origin, overload
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Literal, Mapping, get_origin, overload
 
 from pypika import Field, Table
 from pypika.queries import Selectable
 from pypika.terms import BasicCriterion, Criterion, Term
-from pypika.utils import builder
+
+BOUND_TERMS_ATTR = "_bound_terms"
 
 
 class Column(Field):
@@ -24,9 +28,13 @@ class Column(Field):
         self.drawable = drawable
         self.ignore = ignore
 
-    @builder
     def replace_table(self, current_table: Table, new_table: Table) -> Column:
-        self.table = new_table if self.table == current_table and self in new_table else self.table
+        # copied only when the table actually changes, so resolving terms of other tables doesn't allocate
+        if not (self.table == current_table and self in new_table):
+            return self
+        column = copy.copy(self)
+        column.table = new_table
+        return column
 
     def contains(self, expr: str) -> "BasicCriterion":
         return self.like(f"%{expr}%")
@@ -67,24 +75,31 @@ class Base(Table):
     def get_columns(
         cls, names_only: bool = True, include_list_columns: bool = False, only_drawable: bool = False
     ) -> list[str | Column]:
-        cls_columns: list[tuple[str, Column]] = inspect.getmembers(
-            cls,
-            lambda column: isinstance(column, Column)
-            and (include_list_columns or get_origin(column.type) != list)
-            and (not only_drawable or (only_drawable and column.drawable)),
-        )
-        return [column.name if names_only else column for _, column in cls_columns]
+        cls_columns = get_schema_columns(cls, include_list_columns, only_drawable)
+        return [column.name if names_only else column for column in cls_columns]
 
     def __init__(self, table_name: str, dataset_name: str):
         super().__init__(table_name)
         self.dataset_name = dataset_name
 
     def __getattribute__(self, item: str) -> any:
-        try:
-            attr = super().__getattribute__(item)
-            return attr.replace_table(current_table=None, new_table=self) if isinstance(attr, Term) else attr
-        except AttributeError:
-            raise
+        attr = super().__getattribute__(item)
+        if not isinstance(attr, Term):
+            return attr
+        if item not in get_schema_terms(type(self)):
+            return attr.replace_table(current_table=None, new_table=self)
+
+        # schema terms are bound to the table once, pypika builders copy them before any change
+        bound_terms = object.__getattribute__(self, "__dict__").setdefault(BOUND_TERMS_ATTR, {})
+        bound_term = bound_terms.get(item)
+        if bound_term is None:
+            bound_term = bound_terms[item] = attr.replace_table(current_table=None, new_table=self)
+        return bound_term
+
+    def __getstate__(self) -> dict:
+        state = dict(object.__getattribute__(self, "__dict__"))
+        state.pop(BOUND_TERMS_ATTR, None)
+        return state
 
     def __getattr__(self, item):
         raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{item}'")
@@ -98,3 +113,22 @@ class Base(Table):
             return True
         except AttributeError:
             return False
+
+
+@lru_cache(maxsize=None)
+def get_schema_terms(table_class: type[Base]) -> Mapping[str, Term]:
+    """The Term attributes (columns and computed terms) of a table class by name, introspected once per class"""
+    return MappingProxyType(dict(inspect.getmembers(table_class, lambda member: isinstance(member, Term))))
+
+
+@lru_cache(maxsize=None)
+def get_schema_columns(
+    table_class: type[Base], include_list_columns: bool = False, only_drawable: bool = False
+) -> tuple[Column, ...]:
+    return tuple(
+        column
+        for column in get_schema_terms(table_class).values()
+        if isinstance(column, Column)
+        and (include_list_columns or get_origin(column.type) != list)
+        and (not only_drawable or column.drawable)
+    )
@@ -1,25 +1,43 @@
-import base64
-import pickle as pkl
-
 import pandas as pd
 from dash.dependencies import DashDependency
+from dash.exceptions import PreventUpdate
+from loguru import logger
 from pypika.queries import Selectable
 from pypika.terms import Function, Term
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.object_registry import object_registry
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_dump_dashboard.table_schemes.base import Column
 
 
-def dump_object(obj: any) -> str:
-    return base64.b64encode(pkl.dumps(obj)).decode("utf-8")
+def dump_object(obj: any, pin: bool = False) -> str:
+    """
+    Registers obj in the server-side object registry and returns its short handle, to be kept in a dcc.Store.
+    Objects of the page layouts, which are built once per process, are registered with pin so they're never evicted.
+    """
+    return object_registry.register(obj, pin=pin)
 
 
 def load_object(dump_obj: str) -> any:
-    return pkl.loads(base64.b64decode(dump_obj))
+    """The registered object of a handle, an unknown (expired) handle leaves the outputs of the callback as they are"""
+    try:
+        return object_registry.get(dump_obj)
+    except KeyError as e:
+        logger.warning(f"{e.args[0]}, the page has to be reloaded")
+        raise PreventUpdate
+
 
+def load_sql(dump_obj: str) -> str:
+    """The compiled SQL of a registered query, compiled once per handle"""
+    try:
+        return object_registry.get_sql(dump_obj)
+    except KeyError as e:
+        logger.warning(f"{e.args[0]}, the page has to be reloaded")
+        raise PreventUpdate
 
-def execute(query: Selectable) -> pd.DataFrame:
-    results, _ = query_athena(query=str(query), database="run_eval_db")
+
+def execute(query: Selectable | str) -> pd.DataFrame:
+    results, _ = cached_query_athena(query=str(query), database="run_eval_db")
     return results
 
 
@@ -53,3 +71,20 @@ class FormatNumber(Function):
 class Arbitrary(Function):
     def __init__(self, column, alias=None):
         super().__init__("ARBITRARY", column, alias=alias)
+
+
+class Grouping(Function):
+    def __init__(self, *columns, alias=None):
+        super().__init__("GROUPING", *columns, alias=alias)
+
+
+class GroupingSets(Term):
+    def __init__(self, *grouping_sets: list[Term]):
+        super().__init__()
+        self.grouping_sets = grouping_sets
+
+    def get_sql(self, **kwargs) -> str:
+        grouping_sets_sql = ", ".join(
+            f"({', '.join(term.get_sql(**kwargs) for term in grouping_set)})" for grouping_set in self.grouping_sets
+        )
+        return f"GROUPING SETS ({grouping_sets_sql})"
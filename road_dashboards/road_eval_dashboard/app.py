@@ -5,6 +5,8 @@ import dash_bootstrap_components as dbc
 import pandas as pd
 from dash import Dash, Input, Output, State, dcc, html, no_update
 
+from road_dashboards.common.figure_renderer import figure_renderer
+from road_dashboards.common.perf_monitor import perf_monitor
 from road_dashboards.road_eval_dashboard.components import page_content, sidebar
 from road_dashboards.road_eval_dashboard.components.catalog_table import (
     init_nets,
@@ -14,7 +16,6 @@ from road_dashboards.road_eval_dashboard.components.catalog_table import (
 )
 from road_dashboards.road_eval_dashboard.components.components_ids import (
     EFFECTIVE_SAMPLES_PER_BATCH,
-    GRAPH_TO_COPY,
     MD_COLUMNS_OPTION,
     MD_COLUMNS_TO_DISTINCT_VALUES,
     MD_COLUMNS_TO_TYPE,
@@ -43,6 +44,7 @@ app = Dash(
         "state": State(URL, "hash"),
     },
 )
+perf_monitor.init_app(app)
 
 app.layout = html.Div(
     [
@@ -54,31 +56,6 @@ app.layout = html.Div(
     className="wrapper",
 )
 
-app.clientside_callback(
-    """function(stored_image_data) {
-    if (stored_image_data) {
-        const img = new Image();
-        img.src = 'data:image/png;base64,' + stored_image_data;
-
-        img.onload = function() {
-            const canvas = document.createElement('canvas');
-            canvas.width = this.naturalWidth;
-            canvas.height = this.naturalHeight;
-            canvas.getContext('2d').drawImage(this, 0, 0);
-
-            canvas.toBlob(function(blob) {
-                const item = new ClipboardItem({'image/png': blob});
-                navigator.clipboard.write([item]);
-            });
-        };
-    }
-    return window.dash_clientside.no_update, false
-}
-""",
-    Output("saved_alert", "is_open"),
-    Input(GRAPH_TO_COPY, "data"),
-)
-
 
 @app.callback(Output(URL, "pathname"), Input(URL, "pathname"))
 def redirect_to_home(pathname):
@@ -135,4 +112,5 @@ def compare_existing_nets_to_hashed_nets(nets: dict, run_ids: list):
 
 
 if __name__ == "__main__":
+    figure_renderer.warm_up()
     app.run(host="0.0.0.0", port="6007", debug=debug, use_reloader=debug)
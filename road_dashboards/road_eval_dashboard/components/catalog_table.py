@@ -31,6 +31,8 @@ from road_dashboards.road_eval_dashboard.components.init_threads import (
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import loading_wrapper
 from road_dashboards.road_eval_dashboard.components.mexsense_link import get_mexsense_link
 from road_dashboards.road_eval_dashboard.components.net_properties import Nets
+from road_dashboards.road_eval_dashboard.components.queries_manager import materialize_frame_sets
+from road_dashboards.road_eval_dashboard.components.run_state_store import get_run_state, save_run_state
 from road_dashboards.road_eval_dashboard.utils.url_state_utils import NETS_STATE_KEY, add_state
 
 run_eval_db_manager = DBManager(table_name="algoroad_run_eval", primary_key="run_name")
@@ -204,7 +206,27 @@ def update_nets_md_according_to_population(nets, md_columns_to_distinguish_value
     return nets
 
 
-def update_state_by_nets(nets):
+def update_state_by_nets(nets, use_stored=True):
+    """
+    The meta data dicts, effective samples and best fb thresholds of the selected runs. They are read from the run
+    state store when precomputed (see precompute_runs.py), otherwise computed by the three bootstrap threads and stored.
+    """
+    run_state = get_run_state(nets["run_names"]) if use_stored else None
+    if run_state is None:
+        run_state = compute_run_state(nets)
+        if run_state["effective_samples_per_batch"]:
+            save_run_state(nets["run_names"], run_state)
+
+    return (
+        run_state["md_columns_options"],
+        run_state["md_columns_to_distinguish_values"],
+        run_state["md_columns_to_type"],
+        run_state["effective_samples_per_batch"],
+        run_state["net_id_to_best_thresh"],
+    )
+
+
+def compute_run_state(nets):
     q1, q2, q3 = Queue(), Queue(), Queue()
     Thread(target=wrapper, args=(generate_meta_data_dicts, nets, q1)).start()
     Thread(target=wrapper, args=(generate_effective_samples_per_filter, nets, q2)).start()
@@ -212,13 +234,13 @@ def update_state_by_nets(nets):
     md_columns_to_type, md_columns_options, md_columns_to_distinguish_values = q1.get()
     effective_samples_per_batch = q2.get()
     net_id_to_best_thresh = q3.get()
-    return (
-        md_columns_options,
-        md_columns_to_distinguish_values,
-        md_columns_to_type,
-        effective_samples_per_batch,
-        net_id_to_best_thresh,
-    )
+    return {
+        "md_columns_options": md_columns_options,
+        "md_columns_to_distinguish_values": md_columns_to_distinguish_values,
+        "md_columns_to_type": md_columns_to_type,
+        "effective_samples_per_batch": effective_samples_per_batch,
+        "net_id_to_best_thresh": net_id_to_best_thresh,
+    }
 
 
 def wrapper(func, arg, queue):
@@ -235,4 +257,5 @@ def init_nets(rows):
         rows["dataset"],
         **{table: rows[table].tolist() for table in rows.columns if table.endswith("_table") and any(rows[table])},
     ).__dict__
+    materialize_frame_sets(nets)
     return nets
@@ -15,6 +15,7 @@ from road_dashboards.road_eval_dashboard.graphs.confusion_matrix import (
     draw_multiple_nets_confusion_matrix,
 )
 from road_dashboards.road_eval_dashboard.graphs.tp_rate_graph import draw_conf_diagonal_compare
+from road_dashboards.road_eval_dashboard.utils.calculations import divide_consider_zero
 
 
 def generate_matrices_layout(nets, upper_diag_id, lower_diag_id, left_conf_mat_id, right_conf_mat_id):
@@ -171,70 +172,35 @@ def generate_matrices_graphs(
     return diagonal_compare, mats_figs
 
 
-def generate_matrices_graphs_lr(
-    label_col_template,
-    pred_col_template,
-    nets_tables,
-    meta_data_table,
-    time_value,
-    ignore_val,
-    meta_data_filters="",
-    role="",
-    class_names=[],
-    ca_oriented=False,
-    compare_sign=False,
-    extra_filters="",
-):
-    """Generates conf matrix data for left, right, and combined 'all' sides."""
-
+def build_lr_conf_mat_cube(query, seconds, num_classes):
+    """
+    Runs a generate_lr_conf_mat_cube_query query and packs its counts into an int32 cube of shape
+    (nets, sides, seconds, labels, preds), so any time horizon can be sliced without querying again.
+    """
+    data, _ = run_query_with_nets_names_processing(query)
+    data = data.dropna(subset=["label", "pred"])
+    net_names = sorted(data["net_id"].unique())
+    seconds = [round(float(sec), 1) for sec in seconds]
+    cube = np.zeros((len(net_names), 2, len(seconds), num_classes, num_classes), dtype=np.int32)
+
+    net_ind = data["net_id"].map({net_name: ind for ind, net_name in enumerate(net_names)})
+    side_ind = (data["side"] == "right").astype(int)
+    sec_ind = data["sec"].astype(float).round(1).map({sec: ind for ind, sec in enumerate(seconds)})
+    label_ind = data["label"].clip(lower=0).astype(int)
+    pred_ind = data["pred"].clip(lower=0).astype(int)
+    cube[net_ind, side_ind, sec_ind, label_ind, pred_ind] = data["res_count"]
+    return {"net_names": net_names, "seconds": seconds, "cube": cube}
+
+
+def slice_lr_conf_mats(cube_data, time_value):
+    """The conf matrices of the left, right, and combined 'all' sides at time_value, per net"""
     results = {"left": {}, "right": {}, "all": {}}
-
-    # Generate matrices for left side
-    mats_left = generate_conf_matrices(
-        label_col=f"{label_col_template}_left_{time_value}",
-        pred_col=f"{pred_col_template}_left_{time_value}",
-        nets_tables=nets_tables,
-        meta_data_table=meta_data_table,
-        ignore_val=ignore_val,
-        meta_data_filters=meta_data_filters,
-        role=role,
-        class_names=class_names,
-        extra_filters=extra_filters,
-        ca_oriented=ca_oriented,
-        compare_sign=compare_sign,
-    )
-    results["left"] = mats_left
-
-    # Generate matrices for right side
-    mats_right = generate_conf_matrices(
-        label_col=f"{label_col_template}_right_{time_value}",
-        pred_col=f"{pred_col_template}_right_{time_value}",
-        nets_tables=nets_tables,
-        meta_data_table=meta_data_table,
-        ignore_val=ignore_val,
-        meta_data_filters=meta_data_filters,
-        role=role,
-        class_names=class_names,
-        extra_filters=extra_filters,
-        ca_oriented=ca_oriented,
-        compare_sign=compare_sign,
-    )
-    results["right"] = mats_right
-
-    # Calculate combined 'all' matrix data
-    num_classes = len(class_names)
-    default_zero_mat = np.zeros((num_classes, num_classes))
-    net_names = set(mats_left.keys()) | set(mats_right.keys())
-    for net_name in net_names:
-        conf_left = mats_left.get(net_name, {}).get("conf_matrix", default_zero_mat)
-        conf_right = mats_right.get(net_name, {}).get("conf_matrix", default_zero_mat)
-        combined_conf = conf_left + conf_right
-
-        # Normalize the combined matrix
-        row_sums = combined_conf.sum(axis=1, keepdims=True)
-        row_sums[row_sums == 0] = 1  # Avoid division by zero
-        combined_norm = combined_conf / row_sums
-
-        results["all"][net_name] = {"conf_matrix": combined_conf, "normalize_mat": combined_norm}
+    sec_ind = cube_data["seconds"].index(round(float(time_value), 1))
+    for net_ind, net_name in enumerate(cube_data["net_names"]):
+        conf_left, conf_right = cube_data["cube"][net_ind, :, sec_ind]
+        for side, conf_matrix in [("left", conf_left), ("right", conf_right), ("all", conf_left + conf_right)]:
+            row_sums = conf_matrix.sum(axis=1, keepdims=True).astype(float)
+            normalize_mat = divide_consider_zero(conf_matrix.astype(float), row_sums)
+            results[side][net_name] = {"conf_matrix": conf_matrix, "normalize_mat": normalize_mat}
 
     return results
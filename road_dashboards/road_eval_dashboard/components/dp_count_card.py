@@ -1,6 +1,6 @@
 from dash import Input, Output, callback, html
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components.components_ids import DP_COUNT, MD_FILTERS, NETS, PATHNET_PRED
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import card_wrapper, loading_wrapper
 from road_dashboards.road_eval_dashboard.components.queries_manager import generate_count_query
@@ -21,5 +21,5 @@ def get_nets_dp_count(meta_data_filters, nets):
         return 0
 
     query = generate_count_query(nets[PATHNET_PRED], nets["meta_data"], meta_data_filters=meta_data_filters)
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     return human_format_int(data.overall[0])
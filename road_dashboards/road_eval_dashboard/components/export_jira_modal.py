@@ -6,6 +6,7 @@ import plotly.graph_objects as go
 from dash import MATCH, Input, Output, State, callback, dcc, html, no_update
 from jira import JIRAError
 
+from road_dashboards.common.figure_renderer import figure_renderer
 from road_dashboards.road_eval_dashboard.utils.jira_handler import add_image_in_comment, get_jira_issues_from_prefix
 
 
@@ -75,11 +76,10 @@ def add_jira_attachment_in_comment(disabled, jira_issue, jira_comment, graph_wra
     if not disabled:
         return no_update, no_update, no_update
     fig_to_export = graph_wrapper_children[0]["props"]["children"]["props"]["figure"]
-    fig_to_export = go.Figure(fig_to_export)
-    image_bytes_io = fig_to_export.to_image(format="png", engine="kaleido")
+    image_bytes_io = figure_renderer.render_png(fig_to_export)
     attachment = BytesIO()
     attachment.write(image_bytes_io)
-    fig_title = fig_to_export.layout.title.text.strip("<b>").replace(" ", "_").lower()
+    fig_title = go.Figure(fig_to_export).layout.title.text.strip("<b>").replace(" ", "_").lower()
     value_split = jira_issue.split("-")
     issue_key = f"{value_split[0]}-{value_split[1]}" if len(value_split) > 2 else jira_issue
     try:
@@ -32,11 +32,21 @@ from road_dashboards.road_eval_dashboard.components.components_ids import (
 )
 from road_dashboards.road_eval_dashboard.components.graph_wrapper import graph_wrapper
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import card_wrapper
-from road_dashboards.road_eval_dashboard.components.queries_manager import (
-    generate_fb_query,
-    run_query_with_nets_names_processing,
-)
+from road_dashboards.road_eval_dashboard.components.queries_manager import run_segments_fb_query
 from road_dashboards.road_eval_dashboard.graphs.meta_data_filters_graph import calc_fb_per_row, draw_meta_data_filters
+from road_dashboards.road_eval_dashboard.utils.segment_metrics import build_segments_fb, get_segments_filters
+
+# all the graphs (and their host switches) share one segments query, so it runs once per nets / filters / thresholds
+FB_SEGMENTS_GROUPS = {
+    "road_type": ROAD_TYPE_FILTERS,
+    "lane_mark_type": LANE_MARK_TYPE_FILTERS,
+    "lane_mark_color": LANE_MARK_COLOR_FILTERS,
+    "curve_by_rad": CURVE_BY_RAD_FILTERS,
+    "curve_by_dist": CURVE_BY_DIST_FILTERS,
+    "event": EVENT_FILTERS,
+    "weather": WEATHER_FILTERS,
+}
+FB_SEGMENTS_FILTERS = get_segments_filters(FB_SEGMENTS_GROUPS)
 
 
 def get_base_graph_layout(graph_id, host_button_id, sort_by_dist_id=None):
@@ -99,7 +109,7 @@ def fb_per_road_type(meta_data_filters, is_host, nets, effective_samples, thresh
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=ROAD_TYPE_FILTERS,
+        segments_group="road_type",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -123,7 +133,7 @@ def fb_per_lane_mark_type(meta_data_filters, is_host, nets, effective_samples, t
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=LANE_MARK_TYPE_FILTERS,
+        segments_group="lane_mark_type",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -147,7 +157,7 @@ def fb_per_lane_mark_color(meta_data_filters, is_host, nets, effective_samples,
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=LANE_MARK_COLOR_FILTERS,
+        segments_group="lane_mark_color",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -169,11 +179,10 @@ def fb_per_curve(meta_data_filters, is_host, by_dist, nets, effective_samples, t
     if not nets:
         return no_update
 
-    interesting_filters = CURVE_BY_DIST_FILTERS if by_dist else CURVE_BY_RAD_FILTERS
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=interesting_filters,
+        segments_group="curve_by_dist" if by_dist else "curve_by_rad",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -197,7 +206,7 @@ def fb_per_event(meta_data_filters, is_host, nets, effective_samples, thresh):
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=EVENT_FILTERS,
+        segments_group="event",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -221,7 +230,7 @@ def fb_per_weather_type(meta_data_filters, is_host, nets, effective_samples, thr
     fig = get_fb_fig(
         meta_data_filters=meta_data_filters,
         nets=nets,
-        interesting_filters=WEATHER_FILTERS,
+        segments_group="weather",
         effective_samples=effective_samples,
         thresh=thresh if thresh else {net: 0 for net in nets["names"]},
         is_host=is_host,
@@ -230,31 +239,26 @@ def fb_per_weather_type(meta_data_filters, is_host, nets, effective_samples, thr
     return fig
 
 
-def get_fb_fig(meta_data_filters, nets, interesting_filters, effective_samples, thresh, is_host, filter_name):
-    query = generate_fb_query(
+def get_fb_fig(meta_data_filters, nets, segments_group, effective_samples, thresh, is_host, filter_name):
+    recall_counts, precision_counts = run_segments_fb_query(
         nets["gt_tables"],
         nets["pred_tables"],
         nets["meta_data"],
+        FB_SEGMENTS_FILTERS,
         meta_data_filters=meta_data_filters,
-        interesting_filters=interesting_filters,
         input_thresh=thresh,
-        role="host" if is_host else "",
     )
-    data, _ = run_query_with_nets_names_processing(query)
-    data = data_post_process(data, interesting_filters.keys())
+    interesting_filters = list(FB_SEGMENTS_GROUPS[segments_group].keys())
+    data = build_segments_fb(
+        recall_counts, precision_counts, segments_group, interesting_filters, role="host" if is_host else ""
+    )
     host_str = "Host" if is_host else "Overall"
     fig = draw_meta_data_filters(
         data,
-        list(interesting_filters.keys()),
+        interesting_filters,
         calc_fb_per_row,
         hover=True,
         effective_samples=effective_samples,
         title=f"{host_str} Fb per {filter_name}",
     )
     return fig
-
-
-def data_post_process(data, filters):
-    for filter in filters:
-        data[f"recall_{filter}"] = data[f"count_{filter}"] / data[f"overall_{filter}"]
-    return data
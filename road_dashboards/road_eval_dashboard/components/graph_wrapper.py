@@ -1,10 +1,9 @@
 import base64
 
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from dash import ALL, MATCH, Input, Output, State, callback, ctx, dcc, html, no_update
+from dash import MATCH, Input, Output, State, callback, clientside_callback, dcc, html, no_update
 
-from road_dashboards.road_eval_dashboard.components.components_ids import GRAPH_TO_COPY
+from road_dashboards.common.figure_renderer import figure_renderer
 from road_dashboards.road_eval_dashboard.components.export_jira_modal import get_jira_modal_layout
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import loading_wrapper
 
@@ -49,6 +48,9 @@ def graph_wrapper(graph_id):
             ),
             get_jira_modal_layout(graph_id_str),
             dcc.Download(id={"type": "download", "id": graph_id_str}),
+            dcc.Store(id={"type": "figure_render_request", "id": graph_id_str}),
+            dcc.Store(id={"type": "rendered_figure_id", "id": graph_id_str}),
+            dcc.Store(id={"type": "figure_png", "id": graph_id_str}),
             dbc.Alert(
                 "Copied!",
                 id={"type": "copy_alert", "id": graph_id_str},
@@ -71,37 +73,106 @@ def get_str_id(graph_id):
     return graph_id_str
 
 
-@callback(
-    Output(GRAPH_TO_COPY, "data", allow_duplicate=True),
-    Output({"type": "copy_alert", "id": ALL}, "is_open"),
-    Input({"type": "copy_button", "id": ALL}, "n_clicks"),
-    State({"type": "graph_wrapper", "id": ALL}, "children"),
-    State({"type": "copy_alert", "id": ALL}, "is_open"),
+def get_figure_file_name(title):
+    return f"{(title or 'figure').strip('<b>').replace(' ', '_').lower()}.png"
+
+
+# The figure is hashed in the browser and only its id is sent to the server, the full figure is sent only
+# when the server hasn't rendered it yet (or dropped it from its cache, in which case the request is resent).
+clientside_callback(
+    """
+    function(copy_n_clicks, download_n_clicks, rendered_figure_id, graph_wrapper_children, last_request) {
+        const triggered = dash_clientside.callback_context.triggered.map(t => t.prop_id);
+        if (triggered.some(prop_id => prop_id.includes('"rendered_figure_id"'))) {
+            if (rendered_figure_id !== null || !last_request || last_request.figure !== null) {
+                return dash_clientside.no_update;
+            }
+            const figure = graph_wrapper_children[0].props.children.props.figure;
+            return {...last_request, figure: figure, requested_at: Date.now()};
+        }
+
+        const figure = graph_wrapper_children[0].props.children.props.figure;
+        if (!figure) {
+            return dash_clientside.no_update;
+        }
+        const figure_json = JSON.stringify(figure);
+        let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (let i = 0; i < figure_json.length; i++) {
+            const ch = figure_json.charCodeAt(i);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        const figure_id = "client-" + (h2 >>> 0).toString(16) + (h1 >>> 0).toString(16) + figure_json.length;
+
+        const action = triggered.some(prop_id => prop_id.includes('"copy_button"')) ? "copy" : "download";
+        const title = figure.layout && figure.layout.title ? figure.layout.title.text : null;
+        return {
+            action: action,
+            figure_id: figure_id,
+            title: title,
+            figure: figure_id === rendered_figure_id ? null : figure,
+            requested_at: Date.now(),
+        };
+    }
+    """,
+    Output({"type": "figure_render_request", "id": MATCH}, "data"),
+    Input({"type": "copy_button", "id": MATCH}, "n_clicks"),
+    Input({"type": "download_button", "id": MATCH}, "n_clicks"),
+    Input({"type": "rendered_figure_id", "id": MATCH}, "data"),
+    State({"type": "graph_wrapper", "id": MATCH}, "children"),
+    State({"type": "figure_render_request", "id": MATCH}, "data"),
     prevent_initial_call=True,
 )
-def copy_graph_image_to_store(all_n_clicks, all_graph_wrapper_children, all_is_alert_open):
-    if all(v is None for v in all_n_clicks):
-        return no_update, [no_update for _ in all_n_clicks]
-    button_id = ctx.triggered_id
-    button_id_index = [i for i in range(len(ctx.inputs_list[0])) if ctx.inputs_list[0][i]["id"] == button_id][0]
-    graph_wrapper_children = all_graph_wrapper_children[button_id_index]
-    fig_to_copy = graph_wrapper_children[0]["props"]["children"]["props"]["figure"]
-    fig_to_copy = go.Figure(fig_to_copy)
-    image_bytes_io = fig_to_copy.to_image(format="png", engine="kaleido")
-    encoded_image = base64.b64encode(image_bytes_io).decode("utf-8")
-    all_is_alert_open[button_id_index] = True
-    return encoded_image, all_is_alert_open
 
 
 @callback(
+    Output({"type": "figure_png", "id": MATCH}, "data"),
     Output({"type": "download", "id": MATCH}, "data"),
-    Input({"type": "download_button", "id": MATCH}, "n_clicks"),
-    State({"type": "graph_wrapper", "id": MATCH}, "children"),
+    Output({"type": "rendered_figure_id", "id": MATCH}, "data"),
+    Output({"type": "copy_alert", "id": MATCH}, "is_open"),
+    Input({"type": "figure_render_request", "id": MATCH}, "data"),
+    prevent_initial_call=True,
+)
+def render_figure(request):
+    if not request:
+        return no_update, no_update, no_update, no_update
+
+    image_bytes = figure_renderer.render_png(request["figure"], figure_id=request["figure_id"])
+    if image_bytes is None:  # evicted from the server cache, ask the browser to send the figure
+        return no_update, no_update, None, no_update
+
+    if request["action"] == "copy":
+        return base64.b64encode(image_bytes).decode("utf-8"), no_update, request["figure_id"], True
+
+    download = dcc.send_bytes(image_bytes, filename=get_figure_file_name(request["title"]))
+    return no_update, download, request["figure_id"], no_update
+
+
+clientside_callback(
+    """
+    function(image_data) {
+        if (image_data) {
+            const img = new Image();
+            img.src = 'data:image/png;base64,' + image_data;
+
+            img.onload = function() {
+                const canvas = document.createElement('canvas');
+                canvas.width = this.naturalWidth;
+                canvas.height = this.naturalHeight;
+                canvas.getContext('2d').drawImage(this, 0, 0);
+
+                canvas.toBlob(function(blob) {
+                    const item = new ClipboardItem({'image/png': blob});
+                    navigator.clipboard.write([item]);
+                });
+            };
+        }
+        return window.dash_clientside.no_update
+    }
+    """,
+    Output({"type": "copy_alert", "id": MATCH}, "is_open", allow_duplicate=True),
+    Input({"type": "figure_png", "id": MATCH}, "data"),
     prevent_initial_call=True,
 )
-def download_plot(n_clicks, graph_wrapper_children):
-    fig_to_download = graph_wrapper_children[0]["props"]["children"]["props"]["figure"]
-    fig_to_download = go.Figure(fig_to_download)
-    image_bytes_io = fig_to_download.to_image(format="png", engine="kaleido")
-    fig_title = fig_to_download.layout.title.text.strip("<b>").replace(" ", "_").lower()
-    return dcc.send_bytes(image_bytes_io, filename=f"{fig_title}.png")
@@ -1,34 +1,67 @@
-from road_database_toolkit.athena.athena_utils import query_athena
+from loguru import logger
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components.common_filters import ALL_FILTERS
+from road_dashboards.road_eval_dashboard.components.meta_data_catalog import (
+    get_columns_to_type_from_catalog,
+    get_meta_data_catalog,
+    get_top_values_from_catalog,
+)
 from road_dashboards.road_eval_dashboard.components.queries_manager import (
+    THRESHOLDS,
     generate_base_query,
-    generate_fb_query,
+    generate_fb_histogram_queries,
     generate_grab_index_hist_query,
 )
 from road_dashboards.road_eval_dashboard.graphs.precision_recall_curve import calc_best_thresh
+from road_dashboards.road_eval_dashboard.utils.threshold_curves import build_fb_curves
 
 THREE_DAYS = 60 * 24 * 3
 
 
 def generate_meta_data_dicts(nets):
-    md_columns_to_type = get_meta_data_columns(nets)
-    distinct_dict = get_distinct_values_dict(nets, md_columns_to_type)
+    try:
+        md_columns_to_type, distinct_dict = get_meta_data_columns_from_catalog(nets)
+    except Exception as e:
+        logger.warning(f"Failed to load the meta data catalog, scanning the selected frames instead: {e}")
+        md_columns_to_type = get_meta_data_columns(nets)
+        distinct_dict = {
+            col: val_list[0].strip("[]").split(",")
+            for col, val_list in get_distinct_values_dict(nets, md_columns_to_type).items()
+        }
 
     md_columns_options = [{"label": col.replace("_", " ").title(), "value": col} for col in md_columns_to_type.keys()]
     md_columns_to_distinguish_values = {
-        col: [{"label": val.strip(" "), "value": f"'{val.strip(' ')}'"} for val in val_list[0].strip("[]").split(",")]
+        col: [{"label": val.strip(" "), "value": f"'{val.strip(' ')}'"} for val in val_list]
         for col, val_list in distinct_dict.items()
     }
     return md_columns_to_type, md_columns_options, md_columns_to_distinguish_values
 
 
+def get_meta_data_columns_from_catalog(nets):
+    catalog = get_meta_data_catalog(nets["meta_data"])
+    md_columns_to_type = get_columns_to_type_from_catalog(catalog)
+    distinct_dict = get_top_values_from_catalog(catalog)
+    # the population of the selected frames narrows the meta data (see update_nets_md_according_to_population),
+    # so it can't be taken from the statistics of the whole table when the table mixes populations
+    if len(distinct_dict.get("population", [])) > 1:
+        distinct_dict["population"] = get_selected_population_values(nets)
+    return md_columns_to_type, distinct_dict
+
+
+def get_selected_population_values(nets):
+    base_query = generate_base_query(nets["frame_tables"], nets["meta_data"])
+    query = f'SELECT DISTINCT "population" FROM ({base_query})'
+    data, _ = cached_query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
+    return data["population"].dropna().astype(str).tolist()
+
+
 def generate_effective_samples_per_filter(nets):
     tables_lists = nets["frame_tables"]
     meta_data = nets["meta_data"]
     query = generate_grab_index_hist_query(tables_lists, meta_data, ALL_FILTERS)
     try:
-        data, _ = query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
+        data, _ = cached_query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
         effective_samples_per_batch = data.to_dict("records")[0]
         return effective_samples_per_batch
     except:
@@ -38,7 +71,7 @@ def generate_effective_samples_per_filter(nets):
 
 def get_meta_data_columns(nets):
     query = f"SELECT * FROM {nets['meta_data']} LIMIT 1"
-    data, _ = query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
+    data, _ = cached_query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
     md_columns_to_type = dict(data.dtypes.apply(lambda x: x.name))
     return md_columns_to_type
 
@@ -58,7 +91,7 @@ def get_distinct_values_dict(nets, md_columns_to_type, max_distinct_values=30):
     meta_data = nets["meta_data"]
     base_query = generate_base_query(tables_lists, meta_data)
     query = f"SELECT {distinct_select} FROM ({base_query})"
-    data, _ = query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
+    data, _ = cached_query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
     distinct_dict = data.to_dict("list")
     return distinct_dict
 
@@ -67,12 +100,16 @@ def get_best_fb_per_net(nets):
     if not nets or not nets["gt_tables"] or not nets["pred_tables"]:
         return None
 
-    query = generate_fb_query(
+    queries = generate_fb_histogram_queries(
         nets["gt_tables"],
         nets["pred_tables"],
         nets["meta_data"],
     )
-    data, _ = query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)
+    recall_hist, precision_hist = [
+        cached_query_athena(database="run_eval_db", query=query, cache_duration_minutes=THREE_DAYS)[0]
+        for query in queries
+    ]
+    data = build_fb_curves(recall_hist, precision_hist, THRESHOLDS)
     data = data.fillna(1)
     net_id_to_best_thresh = calc_best_thresh(data)
     return net_id_to_best_thresh
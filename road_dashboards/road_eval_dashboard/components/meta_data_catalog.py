@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from threading import Lock
+
+import pandas as pd
+from loguru import logger
+
+from road_dashboards.common.query_cache import cached_query_athena
+
+META_DATA_CATALOG_DIR = os.environ.get(
+    "META_DATA_CATALOG_DIR", os.path.join(tempfile.gettempdir(), "road_dashboards_meta_data_catalog")
+)
+META_DATA_CATALOG_REFRESH_SECONDS = float(os.environ.get("META_DATA_CATALOG_REFRESH_HOURS", 24)) * 60 * 60
+TOP_VALUES_COUNT = 30
+TOP_VALUES_CAPACITY = 1000
+TOP_VALUES_SEPARATOR = "\x1f"
+NUMERIC_TYPES = ("int", "float", "double")
+STRING_SQL_TYPES = ("varchar", "char", "string")
+
+COLUMNS_SAMPLE_QUERY = "SELECT * FROM {meta_data} LIMIT 1"
+
+SQL_TYPES_QUERY = """
+    SELECT column_name, data_type
+    FROM information_schema.columns
+    WHERE table_name = '{table_name}'
+    """
+
+ROW_COUNT_QUERY = 'SELECT COUNT(*) AS "row_count" FROM {meta_data}'
+
+COLUMNS_STATS_QUERY = """
+    SELECT COUNT(*) AS "row_count", {stats}
+    FROM {meta_data}
+    """
+
+NULL_COUNT_STAT = 'COUNT_IF("{col}" IS NULL)'
+MIN_STAT = 'MIN("{col}")'
+MAX_STAT = 'MAX("{col}")'
+TOP_VALUES_STAT = (
+    'ARRAY_JOIN(ARRAY_SORT(MAP_KEYS(APPROX_MOST_FREQUENT({count}, CAST("{col}" AS VARCHAR), {capacity}))), '
+    "CHR({separator}))"
+)
+
+_catalog_lock = Lock()
+
+
+def get_meta_data_catalog(meta_data):
+    """
+    Column statistics of a meta data table: per column its (pandas) type, null count, min / max for numeric
+    columns and the most frequent values for string columns.
+    The catalog is computed with a single scan of the table and stored locally. It is refreshed once it is older
+    than META_DATA_CATALOG_REFRESH_HOURS: columns added to the table are scanned on their own,
+    and the whole table is scanned again only if its row count changed.
+    """
+    path = get_catalog_path(meta_data)
+    with _catalog_lock:
+        catalog = load_catalog(path)
+
+    if catalog is not None and time.time() - catalog["updated_at"] <= META_DATA_CATALOG_REFRESH_SECONDS:
+        return catalog
+
+    columns_to_type = get_columns_to_type(meta_data)
+    if catalog is None or get_row_count(meta_data) != catalog["row_count"]:
+        catalog = {"meta_data": meta_data, "columns": {}}
+        new_columns = columns_to_type
+    else:
+        new_columns = {col: col_type for col, col_type in columns_to_type.items() if col not in catalog["columns"]}
+
+    if new_columns:
+        row_count, columns_stats = compute_columns_stats(meta_data, new_columns)
+        catalog["row_count"] = row_count
+        catalog["columns"].update(columns_stats)
+    catalog["columns"] = {col: catalog["columns"][col] for col in columns_to_type if col in catalog["columns"]}
+    catalog["updated_at"] = time.time()
+
+    with _catalog_lock:
+        save_catalog(path, catalog)
+    return catalog
+
+
+def get_catalog_path(meta_data):
+    return os.path.join(META_DATA_CATALOG_DIR, f"{hashlib.sha1(meta_data.encode('utf-8')).hexdigest()}.json")
+
+
+def load_catalog(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_catalog(path, catalog):
+    os.makedirs(META_DATA_CATALOG_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(catalog, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to save meta data catalog of {catalog['meta_data']}: {e}")
+
+
+def get_columns_to_type(meta_data):
+    query = COLUMNS_SAMPLE_QUERY.format(meta_data=meta_data)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
+    return dict(data.dtypes.apply(lambda x: x.name))
+
+
+def get_sql_types(meta_data):
+    query = SQL_TYPES_QUERY.format(table_name=meta_data.split(".")[-1].strip('"').lower())
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
+    return {col.lower(): data_type for col, data_type in zip(data["column_name"], data["data_type"])}
+
+
+def get_row_count(meta_data):
+    data, _ = cached_query_athena(database="run_eval_db", query=ROW_COUNT_QUERY.format(meta_data=meta_data))
+    return int(data["row_count"].iloc[0])
+
+
+def compute_columns_stats(meta_data, columns_to_type):
+    sql_types = get_sql_types(meta_data)
+    stats = []
+    for col, col_type in columns_to_type.items():
+        stats.append((col, "null_count", NULL_COUNT_STAT.format(col=col)))
+        if col_type.startswith(NUMERIC_TYPES):
+            stats.append((col, "min", MIN_STAT.format(col=col)))
+            stats.append((col, "max", MAX_STAT.format(col=col)))
+        elif col_type == "object" and sql_types.get(col.lower(), "varchar").startswith(STRING_SQL_TYPES):
+            top_values = TOP_VALUES_STAT.format(
+                col=col, count=TOP_VALUES_COUNT, capacity=TOP_VALUES_CAPACITY, separator=ord(TOP_VALUES_SEPARATOR)
+            )
+            stats.append((col, "top_values", top_values))
+
+    query = COLUMNS_STATS_QUERY.format(stats=", ".join(stat for _, _, stat in stats), meta_data=meta_data)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
+
+    # the result columns are read by position, Athena lower cases the aliases
+    values = data.iloc[0].tolist()
+    columns_stats = {col: {"type": col_type} for col, col_type in columns_to_type.items()}
+    for (col, stat_name, _), value in zip(stats, values[1:]):
+        if stat_name == "top_values":
+            value = value.split(TOP_VALUES_SEPARATOR) if isinstance(value, str) and value else []
+        elif pd.isnull(value):
+            value = None
+        elif stat_name == "null_count":
+            value = int(value)
+        else:
+            value = float(value)
+        columns_stats[col][stat_name] = value
+
+    return int(values[0]), columns_stats
+
+
+def get_columns_to_type_from_catalog(catalog):
+    return {col: col_stats["type"] for col, col_stats in catalog["columns"].items()}
+
+
+def get_top_values_from_catalog(catalog):
+    return {col: col_stats["top_values"] for col, col_stats in catalog["columns"].items() if "top_values" in col_stats}
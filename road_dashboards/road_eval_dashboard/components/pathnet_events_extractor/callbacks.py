@@ -3,9 +3,7 @@ import json
 import os
 import traceback
 
-import pandas as pd
 from botocore.exceptions import ClientError
-from cloud_storage_utils.file_abstraction import open_file
 from dash import Input, Output, State, callback, no_update
 from road_database_toolkit.cloud_file_system.file_operations import write_json
 
@@ -56,9 +54,14 @@ from road_dashboards.road_eval_dashboard.components.components_ids import (
     PATHNET_GT,
     PATHNET_PRED,
 )
+from road_dashboards.road_eval_dashboard.components.pathnet_events_extractor.events_exporter import (
+    export_events,
+    iter_events_chunks,
+)
 from road_dashboards.road_eval_dashboard.components.queries_manager import (
     generate_avail_query,
     generate_extract_acc_events_query,
+    generate_extract_events_query,
     generate_extract_miss_false_events_query,
     generate_extract_ool_events_query,
     generate_extract_roles_events_query,
@@ -255,7 +258,7 @@ def create_data_dict_for_explorer(events_extractor_dict, dp_sources):
     return {"s3_dir_path": s3_dir_path, "bookmarks_name": bookmarks_file_name, "explorer_params": explorer_params}
 
 
-def get_source_events_df(
+def generate_source_events_query(
     net,
     dp_source,
     meta_data_filters,
@@ -274,7 +277,7 @@ def get_source_events_df(
     bookmarkes_columns = BOOKMARKS_COLUMNS + extra_columns
     if metric == "inaccurate":
         operator = ">" if not is_ref else "<"
-        query, final_columns = generate_extract_acc_events_query(
+        return generate_extract_acc_events_query(
             data_tables=net[PATHNET_PRED],
             meta_data=net["meta_data"],
             meta_data_filters=meta_data_filters,
@@ -288,7 +291,7 @@ def get_source_events_df(
         )
     elif metric == "out-of-lane":
         operator = "<" if not is_ref else ">"
-        query, final_columns = generate_extract_ool_events_query(
+        return generate_extract_ool_events_query(
             data_tables=net[PATHNET_BOUNDARIES],
             meta_data=net["meta_data"],
             meta_data_filters=meta_data_filters,
@@ -303,7 +306,7 @@ def get_source_events_df(
             re_only=re_only,
         )
     elif metric == "role":
-        query, final_columns = generate_extract_roles_events_query(
+        return generate_extract_roles_events_query(
             data_tables=net[PATHNET_PRED],
             meta_data=net["meta_data"],
             meta_data_filters=meta_data_filters,
@@ -314,7 +317,7 @@ def get_source_events_df(
             exclude_none=exclude_none,
         )
     else:  # metric is false/miss
-        query, final_columns = generate_extract_miss_false_events_query(
+        return generate_extract_miss_false_events_query(
             data_tables=net[PATHNET_PRED] if metric == "false" else net[PATHNET_GT],
             meta_data=net["meta_data"],
             meta_data_filters=meta_data_filters,
@@ -323,54 +326,23 @@ def get_source_events_df(
             role="unmatched-non-host" if metric == "false" else f"unmatched-{role}",
         )
 
-    df, _ = run_query_with_nets_names_processing(query)
-    df = df.drop_duplicates(subset=final_columns)
-    return df
-
-
-def subtract_events(df_main, df_ref, metric):
-    if metric == "miss":
-        merge_df = df_main.merge(df_ref, how="left", indicator=True)
-        only_in_main_df = merge_df[merge_df["_merge"] == "left_only"]
-        only_in_main_df = only_in_main_df.drop(columns=["_merge"])
-        return only_in_main_df
-
-    elif metric == "false":
-        df_main_grouped = df_main.groupby(BOOKMARKS_COLUMNS).size().reset_index(name="count_main")
-        df_ref_grouped = df_ref.groupby(BOOKMARKS_COLUMNS).size().reset_index(name="count_ref")
-        frames_count_df = df_main_grouped.merge(df_ref_grouped, on=BOOKMARKS_COLUMNS, how="left")
-        frames_count_df["count_ref"].fillna(0, inplace=True)
-        frames_count_higher_in_main_df = frames_count_df[frames_count_df["count_main"] > frames_count_df["count_ref"]]
-        df_main_filtered = df_main.merge(frames_count_higher_in_main_df[BOOKMARKS_COLUMNS], on=BOOKMARKS_COLUMNS)
-        return df_main_filtered
-
-    elif metric == "inaccurate":
-        df_main_filtered = df_main.merge(
-            df_ref, on=BOOKMARKS_COLUMNS + ["matched_dp_id"], how="inner", suffixes=("", "_ref")
-        )
-        return df_main_filtered
-
-    elif metric == "out-of-lane":
-        df_main_filtered = df_main.merge(df_ref, on=BOOKMARKS_COLUMNS + ["dp_id"], how="inner", suffixes=("", "_ref"))
-        df_main_filtered.drop(columns=[c for c in df_main_filtered.columns if "closer" in c], inplace=True)
-        return df_main_filtered
-
-    else:
-        return df_main
-
 
 def get_events_df(
     events_extractor_dict,
     meta_data_cols,
     meta_data_filters,
 ):
+    """
+    The events are extracted by a single query: deduplication, subtraction of the ref events and the top
+    num_events limit all run in Athena, so only the final events are transferred.
+    """
     if "frame_has_labels_mf" in meta_data_cols:
         meta_data_filters = "frame_has_labels_mf = 1" + (f" AND ({meta_data_filters})" if meta_data_filters else "")
     metric = events_extractor_dict["metric"]
     role = events_extractor_dict["role"]
     semantic_role = events_extractor_dict["semantic_role"]
     dist = events_extractor_dict["dist"]
-    df = get_source_events_df(
+    main_events = generate_source_events_query(
         events_extractor_dict["net"],
         events_extractor_dict["dp_source"],
         meta_data_filters,
@@ -386,8 +358,9 @@ def get_events_df(
         extra_columns=events_extractor_dict["extra_columns"],
     )
 
+    ref_events = None
     if events_extractor_dict["is_unique_on"]:
-        df_ref = get_source_events_df(
+        ref_events = generate_source_events_query(
             events_extractor_dict["ref_net"],
             events_extractor_dict["ref_dp_source"],
             meta_data_filters,
@@ -403,14 +376,18 @@ def get_events_df(
             exclude_none=events_extractor_dict["exclude_none"],
             extra_columns=events_extractor_dict["extra_columns"],
         )
-        df = subtract_events(df, df_ref, metric)
-
-    if events_extractor_dict["clips_unique_on"]:
-        df = df.drop_duplicates("clip_name", keep="first")
 
-    df = df.head(events_extractor_dict["num_events"])
+    query = generate_extract_events_query(
+        main_events,
+        ref_events,
+        metric=metric,
+        bookmarks_columns=BOOKMARKS_COLUMNS,
+        num_events=events_extractor_dict["num_events"],
+        clips_unique=events_extractor_dict["clips_unique_on"],
+    )
+    df, s3_path = run_query_with_nets_names_processing(query)
     df = df.round(3)
-    return df
+    return df, s3_path
 
 
 @callback(
@@ -673,13 +650,14 @@ def build_events_df(
     if not input_valid:
         return no_update, no_update, no_update, no_update, create_alert_message(input_error_message, color="warning")
 
-    df = get_events_df(events_extractor_dict, meta_data_cols, meta_data_filters)
+    df, events_result_path = get_events_df(events_extractor_dict, meta_data_cols, meta_data_filters)
     df_sane, sanity_error_message = check_events_df_sanity(events_df=df)
     if not df_sane:
         return no_update, no_update, no_update, no_update, create_alert_message(sanity_error_message, color="warning")
 
     bookmarks_json = converts_events_df_to_bookmarks_json(events_df=df)
     data_for_explorer = create_data_dict_for_explorer(events_extractor_dict, dp_sources)
+    data_for_explorer["events_result_path"] = events_result_path
 
     data_table = df.to_dict("records")
     final_cols = [{"name": col, "id": col, "deletable": False, "selectable": True} for col in df.columns]
@@ -748,10 +726,9 @@ def dump_events_to_jump(n_clicks, data_table, explorer_data):
 
     s3_full_path = os.path.join(s3_dir_path, f"{bookmarks_file_name}.jump")
     try:
-        df = pd.DataFrame(data_table)
-        cols_with_dot = [col for col in df.columns if "." in col]
-        df_renamed = df.rename(columns={col: col.replace(".", "_") for col in cols_with_dot}, inplace=False)
-        generate_jump_file(df_renamed, s3_full_path, df_renamed.columns.to_list(), df.size)
+        # the bookmarks json is written by the bookmarks button only
+        chunks = iter_events_chunks(explorer_data.get("events_result_path"), records=data_table)
+        export_events(chunks, s3_full_path)
         success_message = f"Jump dumped to:\n{s3_full_path}\n"
         return create_alert_message(success_message, color="success")
 
@@ -759,27 +736,3 @@ def dump_events_to_jump(n_clicks, data_table, explorer_data):
         error_message = f"Error genereting jump into:\n'{s3_full_path}' failed.\nTraceback: {traceback.format_exc()}"
 
     return create_alert_message(error_message, color="warning")
-
-
-def generate_jump_file(df, out_jump_file_path, more_fields, max_lines=300, clipname_to_itrk_location_fn=lambda x: x):
-    clip_field, gi_field = "clip_name", "grabindex"
-    jump_fields = [gi_field] + list(set(more_fields) - set([clip_field, gi_field]))  # ordered
-    all_clips = []
-    with open_file(out_jump_file_path, "w") as f:
-        for row in df.head(max_lines).itertuples():
-            clipname = getattr(row, clip_field)
-            if clipname is None:
-                continue
-            all_clips.append(clipname)
-            line = "{}".format(clipname_to_itrk_location_fn(clipname))
-            for field in jump_fields:
-                val = getattr(row, field)
-                if type(val) == float:
-                    val = "{:.2f}".format(val)
-                line += f" {val}"
-            f.write(line + "\n")
-        format_line = "\n#format: trackfile startframe " + " ".join(jump_fields[1:])
-        f.write(format_line + "\n")
-    # also dump a list of all clips
-    with open_file(out_jump_file_path + ".list", "w") as f:
-        f.write("\n".join(list(set(all_clips))))
@@ -0,0 +1,126 @@
+import json
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from cloud_storage_utils.file_abstraction import open_file
+
+CLIP_FIELD = "clip_name"
+GI_FIELD = "grabindex"
+BOOKMARKS_FIELDS = [CLIP_FIELD, GI_FIELD]
+EXPORT_CHUNK_ROWS = 10_000
+WRITE_BUFFER_BYTES = 8 * 1024 * 1024
+
+
+class BufferedWriter:
+    """
+    Collects written text and forwards it to the underlying file in blocks of at least buffer_bytes,
+    so a remote file gets a few large (multipart) writes instead of one write per line.
+    """
+
+    def __init__(self, f, buffer_bytes=WRITE_BUFFER_BYTES):
+        self.f = f
+        self.buffer_bytes = buffer_bytes
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.f.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+def iter_events_chunks(events_result_path=None, records=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    The extracted events in chunks of chunk_rows, read straight from the query result csv when its path is known,
+    otherwise from the records of the events table. Columns are renamed and rounded as in the events table.
+    """
+    if events_result_path:
+        with open_file(events_result_path, "r") as f:
+            for chunk in pd.read_csv(f, chunksize=chunk_rows):
+                yield prepare_events_chunk(chunk)
+    else:
+        events_df = pd.DataFrame(records or [])
+        for start in range(0, len(events_df), chunk_rows):
+            yield prepare_events_chunk(events_df.iloc[start : start + chunk_rows])
+
+
+def prepare_events_chunk(chunk):
+    chunk = chunk.rename(columns={col: col.replace(".", "_") for col in chunk.columns if "." in col})
+    return chunk.round(3)
+
+
+def format_values(values):
+    if pd.api.types.is_float_dtype(values):
+        return pd.Series(np.char.mod("%.2f", values.to_numpy()), index=values.index)
+    return values.astype(str)
+
+
+def format_jump_lines(chunk, jump_fields, clipname_to_itrk_location_fn=None):
+    clips = chunk[CLIP_FIELD].astype(str)
+    if clipname_to_itrk_location_fn is not None:
+        clips = clips.map(clipname_to_itrk_location_fn)
+    return clips.str.cat([format_values(chunk[field]) for field in jump_fields], sep=" ")
+
+
+def format_bookmarks(chunk):
+    comment_fields = [col for col in chunk.columns if col not in BOOKMARKS_FIELDS]
+    if comment_fields:
+        comments = [f"{col}=" + chunk[col].astype(str) for col in comment_fields]
+        comments = comments[0].str.cat(comments[1:], sep="; ")
+    else:
+        comments = pd.Series("", index=chunk.index)
+    return [list(bookmark) for bookmark in zip(chunk[CLIP_FIELD].tolist(), chunk[GI_FIELD].tolist(), comments)]
+
+
+def export_events(chunks, jump_file_path, bookmarks_file_path=None, max_lines=None, clipname_to_itrk_location_fn=None):
+    """
+    Writes the jump file, its .list of clips and (if bookmarks_file_path is given) the bookmarks json
+    in a single pass over the events chunks.
+    Returns the number of exported events.
+    """
+    num_events = 0
+    clips = {}
+    jump_fields = None
+    with (
+        open_file(jump_file_path, "w") as jump_f,
+        open_file(bookmarks_file_path, "w") if bookmarks_file_path else nullcontext() as bookmarks_f,
+    ):
+        jump_writer = BufferedWriter(jump_f)
+        bookmarks_writer = BufferedWriter(bookmarks_f) if bookmarks_f is not None else None
+        if bookmarks_writer is not None:
+            bookmarks_writer.write("[")
+        for chunk in chunks:
+            chunk = chunk[chunk[CLIP_FIELD].notna()]
+            if max_lines is not None:
+                chunk = chunk.head(max_lines - num_events)
+            if chunk.empty:
+                continue
+            if jump_fields is None:
+                jump_fields = [GI_FIELD] + [col for col in chunk.columns if col not in BOOKMARKS_FIELDS]
+
+            jump_writer.write("\n".join(format_jump_lines(chunk, jump_fields, clipname_to_itrk_location_fn)) + "\n")
+            if bookmarks_writer is not None:
+                bookmarks = json.dumps(format_bookmarks(chunk))[1:-1]
+                bookmarks_writer.write(("," if num_events else "") + bookmarks)
+            clips.update(dict.fromkeys(chunk[CLIP_FIELD].astype(str)))
+            num_events += len(chunk)
+            if max_lines is not None and num_events >= max_lines:
+                break
+
+        jump_writer.write("\n#format: trackfile startframe " + " ".join((jump_fields or [GI_FIELD])[1:]) + "\n")
+        jump_writer.flush()
+        if bookmarks_writer is not None:
+            bookmarks_writer.write("]")
+            bookmarks_writer.flush()
+
+    with open_file(jump_file_path + ".list", "w") as f:
+        f.write("\n".join(clips))
+    return num_events
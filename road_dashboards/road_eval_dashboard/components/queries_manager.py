@@ -1,16 +1,35 @@
 import enum
+import hashlib
 import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
+from urllib.parse import urlparse
 
+import boto3
 import numpy as np
 import pandas as pd
-from road_database_toolkit.athena.athena_utils import athena_run_multiple_queries, query_athena
-
+from loguru import logger
+from road_database_toolkit.athena.athena_utils import athena_run_multiple_queries
+
+from road_dashboards.common.query_cache import (
+    cached_athena_run_multiple_queries,
+    cached_query_athena,
+    get_query_result,
+    submit_query_athena,
+)
 from road_dashboards.road_eval_dashboard.utils.distances import SECONDS
 from road_dashboards.road_eval_dashboard.utils.quality.quality_config import (
     DPQualityQueryConfig,
     compute_fixed_thresholds,
 )
 from road_dashboards.road_eval_dashboard.utils.quality.quality_functions import get_counts_expressions_for_sec
+from road_dashboards.road_eval_dashboard.utils.threshold_curves import (
+    build_fb_curves,
+    build_roc_curves,
+    get_histogram_bins,
+)
 
 PATHNET_IGNORE = 990
 PATHNET_BASE_DIST = 0.5
@@ -25,6 +44,11 @@ BASE_QUERY = """
     WHERE TRUE {meta_data_filters}
     """
 
+FRAME_SET_QUERY = """
+    CREATE TABLE IF NOT EXISTS {table_name} AS
+    {intersect_select}
+    """
+
 COLS_QUERY = """
     SELECT TABLE_NAME, COLUMN_NAME
     FROM INFORMATION_SCHEMA.COLUMNS
@@ -52,6 +76,30 @@ CONF_MAT_QUERY = """
     GROUP BY net_id, {group_by_label}, {group_by_pred}
     """
 
+LR_CONF_MAT_CUBE_QUERY = """
+    SELECT net_id, side, sec, label, pred, COUNT(*) AS "res_count"
+    FROM ({base_query})
+    CROSS JOIN UNNEST(ARRAY[{sides}], ARRAY[{secs}], ARRAY[{labels}], ARRAY[{preds}]) AS t(side, sec, label, pred)
+    WHERE label != {ignore_val}
+    GROUP BY net_id, side, sec, label, pred
+    """
+
+SEGMENT_COUNTS_QUERY = """
+    SELECT net_id, role, segment,
+    COUNT(CASE WHEN {positive_filter} THEN 1 ELSE NULL END) AS "positive",
+    COUNT(*) AS "total"
+    FROM ({base_query})
+    CROSS JOIN UNNEST(FILTER(ARRAY[{segments}], segment -> segment IS NOT NULL)) AS t(segment)
+    WHERE {total_filter}
+    GROUP BY net_id, role, segment
+    """
+
+THRESHOLD_HISTOGRAM_QUERY = """
+    SELECT net_id, {label_sign} AS label_sign, width_bucket(CAST({pred_col} AS DOUBLE), {bins}) AS bucket, COUNT(*) AS "count"
+    FROM ({base_query})
+    GROUP BY 1, 2, 3
+    """
+
 COLUMN_OPTION_QUERY = """
     SELECT DISTINCT {column_name}
     FROM ({base_query})
@@ -200,9 +248,45 @@ EXTRACT_EVENT_ROLE = """
 
 
 EXTRACT_EVENT_QUERY = """
-    SELECT {final_columns}
-    FROM ({base_query})
-    {order_cmd}
+    SELECT {event_columns} FROM (
+        SELECT {event_columns}, ROW_NUMBER() OVER (PARTITION BY {unique_columns} ORDER BY {order_cmd}) AS "event_rank"
+        FROM ({base_query})
+    )
+    WHERE "event_rank" = 1
+"""
+
+EXTRACT_EVENTS_QUERY = """
+    WITH main AS ({main_query}){ref_cte}
+    SELECT {columns} FROM ({events_query})
+    ORDER BY {order_cmd}
+    LIMIT {num_events}
+"""
+
+EXTRACT_EVENTS_CLIPS_UNIQUE_QUERY = """
+    SELECT * FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY clip_name ORDER BY {order_cmd}) AS "clip_rank"
+        FROM ({events_query})
+    )
+    WHERE "clip_rank" = 1
+"""
+
+SUBTRACT_MISS_EVENTS_QUERY = """
+    SELECT * FROM main
+    WHERE NOT EXISTS (SELECT 1 FROM ref WHERE {match_cond})
+"""
+
+SUBTRACT_FALSE_EVENTS_QUERY = """
+    SELECT {main_columns} FROM
+    (SELECT *, COUNT(*) OVER (PARTITION BY {bookmarks_columns}) AS "count_main" FROM main) main_counts
+    LEFT JOIN
+    (SELECT {bookmarks_columns}, COUNT(*) AS "count_ref" FROM ref GROUP BY {bookmarks_columns}) ref_counts
+    USING ({bookmarks_columns})
+    WHERE "count_main" > COALESCE("count_ref", 0)
+"""
+
+SUBTRACT_MATCHED_EVENTS_QUERY = """
+    SELECT {main_columns}, {ref_columns}
+    FROM main INNER JOIN ref ON {match_cond}
 """
 
 SUM_SUCCESS_RATE_METRIC = """
@@ -249,6 +333,20 @@ class Roles(str, enum.Enum):
 IGNORE_VALUE = 999
 INTERSTING_FILTERS_DIST_TO_CHECK = 1.3
 
+FRAME_SET_TABLE_PREFIX = "frame_set_"
+FRAME_SET_TTL_SECONDS = 60 * 60 * 24
+# frame set tables are named by their creation day and used for at most FRAME_SET_TTL_SECONDS,
+# so tables at least this many days old are no longer used by any process and are dropped
+FRAME_SET_RETENTION_DAYS = 2
+FRAME_SET_CLEANUP_INTERVAL_SECONDS = 60 * 60
+BASE_QUERIES_CACHE_SIZE = 1024
+_FRAME_SET_TABLE = re.compile(rf"{FRAME_SET_TABLE_PREFIX}[0-9a-f]{{16}}_(\d{{8}})")
+_frame_sets: dict[tuple[str, ...], tuple[str, float]] = {}
+_frame_sets_pending: set[tuple[str, ...]] = set()
+_frame_sets_lock = Lock()
+_frame_sets_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frame_sets")
+_last_frame_sets_cleanup = 0.0
+
 
 def generate_grab_index_hist_query(
     data_tables,
@@ -785,11 +883,15 @@ def generate_extract_acc_events_query(
         extra_filters=acc_cmd,
     )
     final_columns = bookmarks_columns + acc_columns
-    order_cmd = f"ORDER BY {dist_column} {order_by}"
+    event_columns = final_columns + [dist_column]
+    order_cmd = f"{dist_column} {order_by}"
     query = EXTRACT_EVENT_QUERY.format(
-        final_columns=", ".join(final_columns + [dist_column]), base_query=base_query, order_cmd=order_cmd
+        event_columns=", ".join(event_columns),
+        unique_columns=", ".join(final_columns),
+        base_query=base_query,
+        order_cmd=order_cmd,
     )
-    return query, final_columns
+    return query, event_columns, order_cmd
 
 
 def generate_extract_ool_events_query(
@@ -833,11 +935,15 @@ def generate_extract_ool_events_query(
         extra_filters=ool_cmd,
     )
     final_columns = bookmarks_columns + dp_id_columns
-    order_cmd = f'ORDER BY "{re_dist_column if re_only else boundary_dist_column}" {order_by}'
+    event_columns = final_columns + ool_columns
+    order_cmd = f'"{re_dist_column if re_only else boundary_dist_column}" {order_by}'
     query = EXTRACT_EVENT_QUERY.format(
-        final_columns=", ".join(final_columns + ool_columns), base_query=base_query, order_cmd=order_cmd
+        event_columns=", ".join(event_columns),
+        unique_columns=", ".join(final_columns),
+        base_query=base_query,
+        order_cmd=order_cmd,
     )
-    return query, final_columns
+    return query, event_columns, order_cmd
 
 
 def generate_extract_miss_false_events_query(
@@ -853,11 +959,14 @@ def generate_extract_miss_false_events_query(
         extra_filters=f"bin_population = '{chosen_source}'",
     )
     final_columns = bookmarks_columns + metric_columns
-    order_cmd = "ORDER BY clip_name, grabindex ASC"
+    order_cmd = "clip_name, grabindex ASC"
     query = EXTRACT_EVENT_QUERY.format(
-        final_columns=", ".join(final_columns), base_query=base_query, order_cmd=order_cmd
+        event_columns=", ".join(final_columns),
+        unique_columns=", ".join(final_columns),
+        base_query=base_query,
+        order_cmd=order_cmd,
     )
-    return query, final_columns
+    return query, final_columns, order_cmd
 
 
 def generate_extract_roles_events_query(
@@ -895,12 +1004,74 @@ def generate_extract_roles_events_query(
     )
 
     final_columns = bookmarks_columns + role_columns
+    order_cmd = "clip_name, grabindex ASC"
     query = EXTRACT_EVENT_QUERY.format(
-        final_columns=", ".join(final_columns),
+        event_columns=", ".join(final_columns),
+        unique_columns=", ".join(final_columns),
         base_query=base_query,
-        order_cmd="ORDER BY clip_name, grabindex ASC",
+        order_cmd=order_cmd,
     )
-    return query, final_columns
+    return query, final_columns, order_cmd
+
+
+def generate_extract_events_query(
+    main_events,
+    ref_events=None,
+    metric="",
+    bookmarks_columns=["clip_name", "grabindex"],
+    num_events=60,
+    clips_unique=False,
+):
+    """
+    Top num_events events of main_events, each a (query, event_columns, order_cmd) of the generate_extract_*
+    functions. If ref_events are given, the events found by the ref are subtracted in the same query:
+    miss - main events not in ref, false - frames with more false dps in main than in ref,
+    inaccurate / out-of-lane - main dps that are also events of the ref (joined with the ref columns).
+    """
+    main_query, event_columns, order_cmd = main_events
+    main_columns = [f'"{get_column_name(col)}"' for col in event_columns]
+    ref_cte = ""
+    events_query = "SELECT * FROM main"
+    if ref_events is not None and metric in ["miss", "false", "inaccurate", "out-of-lane"]:
+        ref_query, ref_event_columns, _ = ref_events
+        ref_cte = f", ref AS ({ref_query})"
+        if metric == "miss":
+            match_cond = " AND ".join(f"main.{col} IS NOT DISTINCT FROM ref.{col}" for col in main_columns)
+            events_query = SUBTRACT_MISS_EVENTS_QUERY.format(match_cond=match_cond)
+        elif metric == "false":
+            events_query = SUBTRACT_FALSE_EVENTS_QUERY.format(
+                main_columns=", ".join(main_columns), bookmarks_columns=", ".join(bookmarks_columns)
+            )
+        else:
+            join_columns = bookmarks_columns + ["matched_dp_id" if metric == "inaccurate" else "dp_id"]
+            ref_columns = [get_column_name(col) for col in ref_event_columns]
+            ref_columns = [col for col in ref_columns if col not in join_columns]
+            if metric == "out-of-lane":
+                main_columns = [col for col in main_columns if "closer" not in col]
+                ref_columns = [col for col in ref_columns if "closer" not in col]
+            events_query = SUBTRACT_MATCHED_EVENTS_QUERY.format(
+                main_columns=", ".join(f"main.{col}" for col in main_columns),
+                ref_columns=", ".join(f'ref."{col}" AS "{col}_ref"' for col in ref_columns),
+                match_cond=" AND ".join(f"main.{col} = ref.{col}" for col in join_columns),
+            )
+            main_columns += [f'"{col}_ref"' for col in ref_columns]
+
+    if clips_unique:
+        events_query = EXTRACT_EVENTS_CLIPS_UNIQUE_QUERY.format(events_query=events_query, order_cmd=order_cmd)
+
+    query = EXTRACT_EVENTS_QUERY.format(
+        main_query=main_query,
+        ref_cte=ref_cte,
+        columns=", ".join(main_columns),
+        events_query=events_query,
+        order_cmd=order_cmd,
+        num_events=num_events,
+    )
+    return query
+
+
+def get_column_name(column):
+    return column.strip('"')
 
 
 def generate_view_range_success_rate_query(
@@ -1310,6 +1481,16 @@ def get_fb_group_by(input_thresh={}):
     return group_by
 
 
+def get_fb_thresh_filter(input_thresh={}):
+    if not input_thresh:
+        return "TRUE"
+
+    conditions = " OR ".join(
+        f"(net_id = '{net_id}' AND confidence >= {thresh})" for net_id, thresh in input_thresh.items()
+    )
+    return f"({conditions})"
+
+
 def generate_conf_mat_query(
     data_tables,
     meta_data,
@@ -1344,6 +1525,45 @@ def generate_conf_mat_query(
     return conf_query
 
 
+def generate_lr_conf_mat_cube_query(
+    data_tables,
+    meta_data,
+    label_col_template,
+    pred_col_template,
+    seconds,
+    ignore_val,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    """
+    One conf mat query for all sides and time horizons: the {template}_{side}_{sec} columns are unpivoted with
+    UNNEST, so the counts are grouped by (net_id, side, sec, label, pred) in a single scan.
+    """
+    columns = [
+        (side, f"{sec:.1f}", f"{label_col_template}_{side}_{sec:.1f}", f"{pred_col_template}_{side}_{sec:.1f}")
+        for side in ["left", "right"]
+        for sec in seconds
+    ]
+    base_query = generate_base_query(
+        data_tables,
+        meta_data,
+        extra_columns=[f'"{col}"' for _, _, label_col, pred_col in columns for col in [label_col, pred_col]],
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    query = LR_CONF_MAT_CUBE_QUERY.format(
+        base_query=base_query,
+        sides=", ".join(f"'{side}'" for side, _, _, _ in columns),
+        secs=", ".join(sec for _, sec, _, _ in columns),
+        labels=", ".join(f'CAST("{label_col}" AS DOUBLE)' for _, _, label_col, _ in columns),
+        preds=", ".join(f'CAST("{pred_col}" AS DOUBLE)' for _, _, _, pred_col in columns),
+        ignore_val=ignore_val,
+    )
+    return query
+
+
 def generate_count_query(
     data_tables,
     meta_data,
@@ -1467,6 +1687,152 @@ def generate_roc_query(
     return final_query
 
 
+def generate_threshold_histogram_query(
+    data_tables,
+    meta_data,
+    pred_col,
+    label_sign="1",
+    thresholds=ROC_THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    extra_columns=None,
+    role="",
+):
+    base_query = generate_base_query(
+        data_tables,
+        meta_data,
+        meta_data_filters=meta_data_filters,
+        extra_columns=extra_columns,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    bins = "CAST(ARRAY[" + ", ".join(f"{thresh}" for thresh in get_histogram_bins(thresholds)) + "] AS ARRAY(DOUBLE))"
+    query = THRESHOLD_HISTOGRAM_QUERY.format(label_sign=label_sign, pred_col=pred_col, bins=bins, base_query=base_query)
+    return query
+
+
+def generate_fb_histogram_queries(
+    gt_data_tables,
+    pred_data_tables,
+    meta_data,
+    thresholds=THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    recall_query = generate_threshold_histogram_query(
+        gt_data_tables,
+        meta_data,
+        pred_col="confidence",
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    precision_filter = "match_score >= 0"
+    precision_query = generate_threshold_histogram_query(
+        pred_data_tables,
+        meta_data,
+        pred_col="confidence",
+        label_sign="(CASE WHEN match_score < 1 THEN 1 ELSE -1 END)",
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=precision_filter if not extra_filters else f"{extra_filters} AND {precision_filter}",
+        role=role,
+    )
+    return [recall_query, precision_query]
+
+
+def generate_segment_counts_query(
+    data_tables,
+    meta_data,
+    segments_filters,
+    positive_filter="TRUE",
+    total_filter="TRUE",
+    meta_data_filters="",
+    extra_filters="",
+):
+    """
+    Counts per (net_id, role, segment) the rows matching total_filter and positive_filter among them, in one scan.
+    Every row is tagged with all the segments it belongs to (segments_filters maps a segment name to its filter),
+    a row matching several segments is counted once in each of them.
+    """
+    base_query = generate_base_query(
+        data_tables,
+        meta_data,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+    )
+    segments = ", ".join(
+        f"CASE WHEN ({segment_filter}) THEN '{segment}' END" for segment, segment_filter in segments_filters.items()
+    )
+    query = SEGMENT_COUNTS_QUERY.format(
+        base_query=base_query,
+        segments=segments,
+        positive_filter=positive_filter,
+        total_filter=total_filter,
+    )
+    return query
+
+
+def generate_segments_fb_queries(
+    gt_data_tables,
+    pred_data_tables,
+    meta_data,
+    segments_filters,
+    input_thresh={},
+    meta_data_filters="",
+    extra_filters="",
+):
+    """
+    Per segment recall and precision counts of all roles, the building blocks of generate_fb_query
+    for every interesting filter at once: detected / all gts, and true positives / all preds above input_thresh
+    """
+    thresh_filter = get_fb_thresh_filter(input_thresh)
+    recall_query = generate_segment_counts_query(
+        gt_data_tables,
+        meta_data,
+        segments_filters,
+        positive_filter=thresh_filter,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+    )
+    precision_filter = "match_score >= 0"
+    precision_query = generate_segment_counts_query(
+        pred_data_tables,
+        meta_data,
+        segments_filters,
+        positive_filter="match_score < 1",
+        total_filter=thresh_filter,
+        meta_data_filters=meta_data_filters,
+        extra_filters=precision_filter if not extra_filters else f"{extra_filters} AND {precision_filter}",
+    )
+    return [recall_query, precision_query]
+
+
+def generate_roc_histogram_query(
+    data_tables,
+    meta_data,
+    label_col,
+    pred_col,
+    thresholds=ROC_THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    return generate_threshold_histogram_query(
+        data_tables,
+        meta_data,
+        pred_col=pred_col,
+        label_sign=f"(CASE WHEN {label_col} > 0 THEN 1 WHEN {label_col} < 0 THEN -1 END)",
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        extra_columns=[label_col, pred_col],
+        role=role,
+    )
+
+
 def get_roc_stats_per_filter_metrics(label_col, pred_col, interesting_filters, metric, threshold=0):
     metrics = ", ".join(
         metric.format(
@@ -1516,9 +1882,43 @@ def generate_base_query(
 ):
     if extra_columns is None:
         extra_columns = []
-    base_data = generate_base_data(data_tables["paths"], data_tables["required_columns"], extra_columns)
-    intersect_filter = generate_intersect_filter(data_tables["paths"])
     ignore_str = data_tables["ca_ignore_filter"] if ca_oriented else data_tables["ignore_filter"]
+    return _generate_base_query(
+        tuple(data_tables["paths"]),
+        tuple(data_tables["required_columns"]),
+        tuple(extra_columns),
+        get_frame_set(data_tables["paths"]),
+        ignore_str,
+        meta_data,
+        meta_data_filters,
+        include_all,
+        ca_oriented,
+        tuple(role) if type(role) == list else role,
+        extra_filters,
+    )
+
+
+@lru_cache(maxsize=BASE_QUERIES_CACHE_SIZE)
+def _generate_base_query(
+    data_paths,
+    base_columns,
+    extra_columns,
+    frame_set,
+    ignore_str,
+    meta_data,
+    meta_data_filters,
+    include_all,
+    ca_oriented,
+    role,
+    extra_filters,
+):
+    """
+    Memoized by all of its inputs (including the materialized frame set), so callbacks that only change
+    thresholds or distances reuse the base query instead of rebuilding it
+    """
+    base_data = generate_base_data(list(data_paths), list(base_columns), list(extra_columns))
+    intersect_filter = generate_intersect_filter(list(data_paths), frame_set=frame_set)
+    role = list(role) if type(role) == tuple else role
     stats_filters = generate_stats_filters(ignore_str, include_all, ca_oriented, role, extra_filters)
     meta_data_filters = "AND " + meta_data_filters if meta_data_filters else ""
     base_query = BASE_QUERY.format(
@@ -1555,25 +1955,234 @@ def generate_stats_filters(
     return f"AND {stats_filter}" if stats_filter else ""
 
 
-def generate_intersect_filter(data_paths):
-    intersect_select = "SELECT clip_name, grabIndex FROM " + " INTERSECT SELECT clip_name, grabIndex FROM ".join(
-        data_paths
+def generate_intersect_filter(data_paths, frame_set=None):
+    frame_set = frame_set or get_frame_set(data_paths)
+    intersect_select = (
+        f"SELECT clip_name, grabIndex FROM {frame_set}" if frame_set else generate_intersect_select(data_paths)
     )
     return f"WHERE (clip_name, grabIndex) IN ({intersect_select})"
 
 
+def generate_intersect_select(data_paths):
+    return "SELECT clip_name, grabIndex FROM " + " INTERSECT SELECT clip_name, grabIndex FROM ".join(data_paths)
+
+
+def get_frame_set_key(data_paths):
+    return tuple(sorted(data_paths))
+
+
+def get_frame_set(data_paths):
+    """
+    Name of the materialized table holding the frames common to all data_paths,
+    or None if it wasn't materialized (or expired) in this process.
+    """
+    with _frame_sets_lock:
+        frame_set = _frame_sets.get(get_frame_set_key(data_paths))
+    if frame_set is None or time.time() - frame_set[1] > FRAME_SET_TTL_SECONDS:
+        return None
+    return frame_set[0]
+
+
+def generate_frame_set_query(data_paths, table_name):
+    return FRAME_SET_QUERY.format(table_name=table_name, intersect_select=generate_intersect_select(data_paths))
+
+
+def materialize_frame_sets(nets, database="run_eval_db") -> Future | None:
+    """
+    Materializes (CTAS) in the background the intersection of frames of every multi-net table group in nets,
+    so generate_base_query filters against a small table instead of recomputing the INTERSECT in every query.
+    Until a frame set is ready (or if materializing it fails) queries keep the inline INTERSECT.
+    Table names are derived from the data paths and the creation day, so selections of the same runs share them,
+    expired tables are dropped periodically by drop_expired_frame_sets.
+    """
+    global _last_frame_sets_cleanup
+    data_paths_groups = {
+        get_frame_set_key(tables["paths"])
+        for tables in nets.values()
+        if isinstance(tables, dict) and tables.get("paths") and len(tables["paths"]) > 1
+    }
+    data_paths_groups = [data_paths for data_paths in data_paths_groups if get_frame_set(data_paths) is None]
+    with _frame_sets_lock:
+        data_paths_groups = [data_paths for data_paths in data_paths_groups if data_paths not in _frame_sets_pending]
+        _frame_sets_pending.update(data_paths_groups)
+        cleanup = time.time() - _last_frame_sets_cleanup > FRAME_SET_CLEANUP_INTERVAL_SECONDS
+        if cleanup:
+            _last_frame_sets_cleanup = time.time()
+
+    future = (
+        _frame_sets_executor.submit(_materialize_frame_sets, data_paths_groups, database) if data_paths_groups else None
+    )
+    if cleanup:
+        _frame_sets_executor.submit(drop_expired_frame_sets, database)
+    return future
+
+
+def _materialize_frame_sets(data_paths_groups, database):
+    now = time.time()
+    day = time.strftime("%Y%m%d", time.gmtime(now))
+    tables_names = [
+        f"{FRAME_SET_TABLE_PREFIX}{hashlib.sha1(','.join(data_paths).encode('utf-8')).hexdigest()[:16]}_{day}"
+        for data_paths in data_paths_groups
+    ]
+    queries = [
+        generate_frame_set_query(data_paths, table_name)
+        for data_paths, table_name in zip(data_paths_groups, tables_names)
+    ]
+    try:
+        athena_run_multiple_queries(database=database, query_list=queries)
+        materialized = True
+    except Exception as e:
+        logger.warning(f"Failed to materialize frames intersection, falling back to inline INTERSECT: {e}")
+        materialized = False
+
+    with _frame_sets_lock:
+        _frame_sets_pending.difference_update(data_paths_groups)
+        if materialized:
+            for data_paths, table_name in zip(data_paths_groups, tables_names):
+                _frame_sets[data_paths] = (table_name, now)
+
+
+def drop_expired_frame_sets(database="run_eval_db"):
+    """
+    Deletes the frame set tables created FRAME_SET_RETENTION_DAYS days ago or earlier, with their data.
+    DROP TABLE would leave the CTAS output in S3, so the data under the table location is deleted first
+    and then the table is deleted from the Glue catalog.
+    """
+    expiration_day = time.strftime("%Y%m%d", time.gmtime(time.time() - FRAME_SET_RETENTION_DAYS * 60 * 60 * 24))
+    try:
+        session = boto3.session.Session()
+        glue, s3 = session.client("glue"), session.client("s3")
+        pages = glue.get_paginator("get_tables").paginate(
+            DatabaseName=database, Expression=f"{FRAME_SET_TABLE_PREFIX}.*"
+        )
+        for table in (table for page in pages for table in page["TableList"]):
+            match = _FRAME_SET_TABLE.fullmatch(table["Name"])
+            if match is None or match.group(1) > expiration_day:
+                continue
+            delete_s3_prefix(s3, table["StorageDescriptor"]["Location"])
+            glue.delete_table(DatabaseName=database, Name=table["Name"])
+    except Exception as e:
+        logger.warning(f"Failed to drop expired frame sets: {e}")
+
+
+def delete_s3_prefix(s3, location):
+    url = urlparse(location)
+    prefix = url.path.strip("/")
+    if url.scheme != "s3" or not prefix:
+        return
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=url.netloc, Prefix=f"{prefix}/"):
+        objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+        if objects:
+            s3.delete_objects(Bucket=url.netloc, Delete={"Objects": objects})
+
+
 def run_multiple_queries_with_nets_names_processing(query_list, database="run_eval_db"):
-    dfs, s3_paths = athena_run_multiple_queries(database=database, query_list=query_list)
+    dfs, s3_paths = cached_athena_run_multiple_queries(database=database, query_list=query_list)
     dfs = [process_df_net_names(df) for df in dfs]
     return dfs, s3_paths
 
 
 def run_query_with_nets_names_processing(query, database="run_eval_db"):
-    df, s3_path = query_athena(database=database, query=query)
+    df, s3_path = cached_query_athena(database=database, query=query)
     df = process_df_net_names(df)
     return df, s3_path
 
 
+def run_fb_curve_query(
+    gt_data_tables,
+    pred_data_tables,
+    meta_data,
+    thresholds=THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    queries = generate_fb_histogram_queries(
+        gt_data_tables,
+        pred_data_tables,
+        meta_data,
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    (recall_hist, precision_hist), _ = run_multiple_queries_with_nets_names_processing(queries)
+    return build_fb_curves(recall_hist, precision_hist, thresholds)
+
+
+def run_segments_fb_query(
+    gt_data_tables,
+    pred_data_tables,
+    meta_data,
+    segments_filters,
+    input_thresh={},
+    meta_data_filters="",
+    extra_filters="",
+):
+    queries = generate_segments_fb_queries(
+        gt_data_tables,
+        pred_data_tables,
+        meta_data,
+        segments_filters,
+        input_thresh=input_thresh,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+    )
+    (recall_counts, precision_counts), _ = run_multiple_queries_with_nets_names_processing(queries)
+    return recall_counts, precision_counts
+
+
+def submit_roc_curve_query(
+    data_tables,
+    meta_data,
+    label_col,
+    pred_col,
+    thresholds=ROC_THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    query = generate_roc_histogram_query(
+        data_tables,
+        meta_data,
+        label_col,
+        pred_col,
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    return submit_query_athena(query)
+
+
+def get_roc_curve_result(future, thresholds=ROC_THRESHOLDS):
+    hist, _ = get_query_result(future)
+    return build_roc_curves(process_df_net_names(hist), thresholds)
+
+
+def run_roc_curve_query(
+    data_tables,
+    meta_data,
+    label_col,
+    pred_col,
+    thresholds=ROC_THRESHOLDS,
+    meta_data_filters="",
+    extra_filters="",
+    role="",
+):
+    future = submit_roc_curve_query(
+        data_tables,
+        meta_data,
+        label_col,
+        pred_col,
+        thresholds=thresholds,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    return get_roc_curve_result(future, thresholds)
+
+
 def process_df_net_names(df, nets_names_col="net_id"):
     if nets_names_col in df.columns:
         df[nets_names_col] = df[nets_names_col].apply(process_net_name)
@@ -0,0 +1,110 @@
+"""
+Store of the precomputed state of runs selections, see precompute_runs.py.
+
+RUN_STATE_STORE_DIR must be a persistent location shared by the dashboard and precompute-runs: a directory on
+S3 (s3://bucket/prefix) when they run on different hosts, otherwise a local directory, by default next to the
+dashboard. Each selection of runs is stored in its own JSON file, which also records when the selection was last
+used, so precompute-runs can refresh the selections that are actually compared.
+"""
+
+import hashlib
+import json
+import os
+import time
+from threading import Lock
+
+import fsspec
+from fsspec.implementations.local import LocalFileSystem
+from loguru import logger
+
+RUN_STATE_STORE_DIR = os.environ.get(
+    "RUN_STATE_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "run_state_store")
+)
+RUN_STATE_MAX_AGE_SECONDS = float(os.environ.get("RUN_STATE_MAX_AGE_HOURS", 24 * 7)) * 60 * 60
+# a hit records the use of the selection at most once per this interval, to keep reads cheap on S3
+RUN_STATE_USE_INTERVAL_SECONDS = 60 * 60 * 24
+
+_store_lock = Lock()
+
+
+def get_run_state_key(run_names):
+    return "+".join(sorted(set(run_names)))
+
+
+def get_run_state_path(run_names):
+    key_hash = hashlib.sha1(get_run_state_key(run_names).encode("utf-8")).hexdigest()
+    return f"{RUN_STATE_STORE_DIR.rstrip('/')}/{key_hash}.json"
+
+
+def load_run_state_file(path):
+    try:
+        with fsspec.open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_run_state_file(path, run_state):
+    fs, fs_path = fsspec.core.url_to_fs(path)
+    try:
+        data = json.dumps(run_state, default=to_json_value).encode("utf-8")
+        if isinstance(fs, LocalFileSystem):
+            # written aside and renamed, objects on S3 are replaced atomically as is
+            os.makedirs(os.path.dirname(fs_path), exist_ok=True)
+            tmp_path = f"{fs_path}.{os.getpid()}.tmp"
+            fs.pipe_file(tmp_path, data)
+            os.replace(tmp_path, fs_path)
+        else:
+            fs.pipe_file(fs_path, data)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Failed to save the state of runs {run_state['run_names']}: {e}")
+
+
+def get_run_state(run_names):
+    """
+    The precomputed state (meta data dicts, effective samples, best fb thresholds) of a selection of runs,
+    or None if it wasn't computed or is older than RUN_STATE_MAX_AGE_HOURS
+    """
+    path = get_run_state_path(run_names)
+    with _store_lock:
+        run_state = load_run_state_file(path)
+    if run_state is None or run_state.get("run_names") != get_run_state_key(run_names):
+        return None
+    if time.time() - run_state["computed_at"] > RUN_STATE_MAX_AGE_SECONDS:
+        return None
+
+    if time.time() - run_state.get("used_at", 0) > RUN_STATE_USE_INTERVAL_SECONDS:
+        run_state["used_at"] = time.time()
+        with _store_lock:
+            write_run_state_file(path, run_state)
+    return run_state["state"]
+
+
+def save_run_state(run_names, state):
+    now = time.time()
+    run_state = {"run_names": get_run_state_key(run_names), "computed_at": now, "used_at": now, "state": state}
+    with _store_lock:
+        write_run_state_file(get_run_state_path(run_names), run_state)
+
+
+def get_used_selections(used_within_seconds):
+    """The run names of every stored selection used in the last used_within_seconds"""
+    fs, fs_path = fsspec.core.url_to_fs(RUN_STATE_STORE_DIR)
+    try:
+        paths = fs.glob(f"{fs_path.rstrip('/')}/*.json")
+    except OSError:
+        return []
+
+    selections = []
+    for path in paths:
+        run_state = load_run_state_file(fs.unstrip_protocol(path))
+        if run_state is not None and time.time() - run_state.get("used_at", 0) <= used_within_seconds:
+            selections.append(run_state["run_names"].split("+"))
+    return selections
+
+
+def to_json_value(value):
+    # numpy scalars of query results
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
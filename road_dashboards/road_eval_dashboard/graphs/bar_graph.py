@@ -1,6 +1,9 @@
 import plotly.express as px
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 
+
+@measure_stage(FIGURE_STAGE)
 def basic_bar_graph(data, x, y, title="", color=None, bar_width=0.4):
     fig = px.bar(data, x=x, y=y, title=f"<b>{title}<b>", color=color, text=y)
     fig.update_layout(
@@ -18,6 +21,7 @@ def basic_bar_graph(data, x, y, title="", color=None, bar_width=0.4):
     return fig
 
 
+@measure_stage(FIGURE_STAGE)
 def comparison_bar_graph(data, x, y, facet_col, title="", text=None):
     text = y if text is None else text
     fig = px.bar(data, x=x, y=y, title=f"<b>{title}<b>", color=x, text=text, facet_col=facet_col, facet_col_spacing=0.2)
@@ -1,6 +1,7 @@
 import numpy as np
 import plotly.express as px
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.road_eval_dashboard.utils.calculations import divide_consider_zero
 
 
@@ -16,6 +17,7 @@ def compute_confusion_matrix(data, labels_col, preds_col, num_classes):
     return conf_matrix, normalize_mat
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_confusion_matrix(conf_matrix, normalize_mat, class_names, role="", mat_name=""):
     num_classes = len(class_names)
     title = f"{(mat_name or role or 'overall').title()} Confusion Matrix"
@@ -41,6 +43,7 @@ def draw_confusion_matrix(conf_matrix, normalize_mat, class_names, role="", mat_
     return fig
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_multiple_nets_confusion_matrix(conf_mats, normalize_mats, net_names, class_names, role="", mat_name=""):
     figs = []
     for ind, net_name in enumerate(net_names):
@@ -6,6 +6,8 @@ import numpy as np
 import plotly.express as px
 import pycountry
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
+
 main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 with open(f"{main_dir}/assets/custom.geo.json") as f:
     geojson = json.load(f)
@@ -23,6 +25,7 @@ COUNTRIES_NORMALIZATION = {
 }
 
 
+@measure_stage(FIGURE_STAGE)
 def generate_world_map(countries_data, locations, color, hover_data=[]):
     fig = px.choropleth_mapbox(
         countries_data,
@@ -1,6 +1,9 @@
 import plotly.express as px
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 
+
+@measure_stage(FIGURE_STAGE)
 def basic_histogram_plot(data, x, y, title="", color=None):
     fig = px.bar(data, x=x, y=y, title=f"<b>{title}<b>", color=color)
     fig.update_layout(
@@ -4,6 +4,7 @@ import textwrap
 import numpy as np
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.road_eval_dashboard.graphs.precision_recall_curve import calc_fb
 
 
@@ -44,6 +45,7 @@ def get_greens_reds(data, interesting_columns, effective_samples, score_func):
     return greens, reds
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_meta_data_filters(
     data,
     interesting_columns,
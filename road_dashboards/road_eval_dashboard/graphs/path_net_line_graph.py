@@ -1,8 +1,10 @@
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.road_eval_dashboard.graphs.meta_data_filters_graph import choose_symbol, get_greens_reds
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_path_net_graph(
     data,
     cols,
@@ -1,6 +1,9 @@
 import plotly.express as px
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 
+
+@measure_stage(FIGURE_STAGE)
 def basic_pie_chart(data, names, values, title="", color=None):
     fig = px.pie(data, names=names, values=values, color=color, title=title)
     return fig
@@ -1,12 +1,14 @@
 import numpy as np
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.road_eval_dashboard.components.queries_manager import THRESHOLDS, process_net_name
 
 f_beta = 1
 B2 = f_beta**2
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_precision_recall_curve(data, prefix="", thresholds=THRESHOLDS):
     fig = go.Figure()
     fig.add_shape(type="line", line=dict(dash="dash"), x0=0, x1=1, y0=1, y1=0)
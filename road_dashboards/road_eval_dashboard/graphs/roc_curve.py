@@ -1,11 +1,13 @@
 import numpy as np
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.road_eval_dashboard.components.queries_manager import ROC_THRESHOLDS, process_net_name
 from road_dashboards.road_eval_dashboard.graphs.precision_recall_curve import calc_fb
 from road_dashboards.road_eval_dashboard.utils.calculations import divide_consider_zero
 
 
+@measure_stage(FIGURE_STAGE)
 def draw_roc_curve(data, prefix="", thresholds=ROC_THRESHOLDS):
     fig = go.Figure()
     fig.add_shape(type="line", line=dict(dash="dash"), x0=0, y0=0, x1=1, y1=1)
@@ -1,6 +1,9 @@
 import plotly.graph_objects as go
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 
+
+@measure_stage(FIGURE_STAGE)
 def draw_conf_diagonal_compare(normalize_mats, names, class_names, role="", mat_name=""):
     fig = go.Figure()
     for normalize_mat, name in zip(normalize_mats, names):
@@ -15,10 +15,7 @@ from road_dashboards.road_eval_dashboard.components.components_ids import (
 from road_dashboards.road_eval_dashboard.components.graph_wrapper import graph_wrapper
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import card_wrapper
 from road_dashboards.road_eval_dashboard.components.page_properties import PageProperties
-from road_dashboards.road_eval_dashboard.components.queries_manager import (
-    generate_fb_query,
-    run_query_with_nets_names_processing,
-)
+from road_dashboards.road_eval_dashboard.components.queries_manager import run_fb_curve_query
 from road_dashboards.road_eval_dashboard.graphs.precision_recall_curve import draw_precision_recall_curve
 
 extra_properties = PageProperties("line-chart")
@@ -56,10 +53,9 @@ def get_fb_host(meta_data_filters, nets):
     if not nets:
         return no_update
 
-    query = generate_fb_query(
+    data = run_fb_curve_query(
         nets["gt_tables"], nets["pred_tables"], nets["meta_data"], meta_data_filters=meta_data_filters, role="host"
     )
-    data, _ = run_query_with_nets_names_processing(query)
     data = data.fillna(1)
     return draw_precision_recall_curve(data, "host")
 
@@ -73,9 +69,8 @@ def get_fb_overall(meta_data_filters, nets):
     if not nets:
         return no_update
 
-    query = generate_fb_query(
+    data = run_fb_curve_query(
         nets["gt_tables"], nets["pred_tables"], nets["meta_data"], meta_data_filters=meta_data_filters
     )
-    data, _ = run_query_with_nets_names_processing(query)
     data = data.fillna(1)
     return draw_precision_recall_curve(data, "overall")
@@ -1,8 +1,8 @@
 import dash_bootstrap_components as dbc
 import pandas as pd
 from dash import Input, Output, State, callback, dcc, html, no_update, register_page
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components import base_dataset_statistics, meta_data_filter
 from road_dashboards.road_eval_dashboard.components.common_filters import LANE_MARK_COLOR_FILTERS, ROAD_TYPE_FILTERS
 from road_dashboards.road_eval_dashboard.components.components_ids import (
@@ -123,7 +123,7 @@ def get_countries_heat_map(meta_data_filters, nets):
     query = generate_count_query(
         nets["frame_tables"], nets["meta_data"], meta_data_filters=meta_data_filters, group_by_column=group_by_column
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data["overall"] = data["overall"] / len(nets["names"])
     data["normalized"] = normalize_countries_count_to_percentiles(data["overall"].to_numpy())
     data[group_by_column] = data[group_by_column].apply(normalize_countries_names)
@@ -147,7 +147,7 @@ def get_tvgt_pie_chart(meta_data_filters, nets):
     query = generate_count_query(
         nets["frame_tables"], nets["meta_data"], meta_data_filters=meta_data_filters, group_by_column=group_by_column
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data["overall"] = data["overall"] / len(nets["names"])
     title = "Distribution of TVGTs"
     fig = basic_pie_chart(data, group_by_column, "overall", title=title)
@@ -167,7 +167,7 @@ def get_gtem_pie_chart(meta_data_filters, nets):
     query = generate_count_query(
         nets["frame_tables"], nets["meta_data"], meta_data_filters=meta_data_filters, group_by_column=group_by_column
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data["overall"] = data["overall"] / len(nets["names"])
     title = "Distribution of GTEMs"
     fig = basic_pie_chart(data, group_by_column, "overall", title=title)
@@ -209,7 +209,7 @@ def get_dynamic_pie_chart(group_by_column, slider_value, meta_data_filters, nets
         group_by_column=group_by_column,
         bins_factor=bins_factor,
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data["overall"] = data["overall"] / len(nets["names"])
     title = f"Distribution of {group_by_column.replace('mdbi_', '').replace('_', ' ').title()}"
 
@@ -236,7 +236,7 @@ def get_road_type_pie_chart(meta_data_filters, nets):
         meta_data_filters=meta_data_filters,
         interesting_filters=interesting_filters,
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data = data.drop("net_id", axis=1).iloc[0]
     data = pd.DataFrame({"filters": data.index.map(lambda x: x.replace("overall_", "")), "overall": data})
     title = "Distribution of Road Type"
@@ -260,7 +260,7 @@ def get_lane_mark_color_pie_chart(meta_data_filters, nets):
         meta_data_filters=meta_data_filters,
         interesting_filters=interesting_filters,
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data = data.drop("net_id", axis=1).iloc[0]
     data = pd.DataFrame({"filters": data.index.map(lambda x: x.replace("overall_", "")), "overall": data})
     title = "Distribution of Lane Mark Color"
@@ -1,9 +1,9 @@
-import json
-
 import dash_bootstrap_components as dbc
 import numpy as np
 from dash import ALL, MATCH, Input, Output, State, callback, dcc, html, no_update
 
+from road_dashboards.common.lru_cache import LRUCache
+from road_dashboards.common.object_registry import object_registry
 from road_dashboards.road_eval_dashboard.components.components_ids import (
     BOUNDARIES_ALL_CONF_MATS,
     BOUNDARIES_ALL_DIAG_COMPARE,
@@ -22,13 +22,15 @@ from road_dashboards.road_eval_dashboard.components.components_ids import (
     RE_DROP_DOWN,
 )
 from road_dashboards.road_eval_dashboard.components.confusion_matrices_layout import (
+    build_lr_conf_mat_cube,
     draw_conf_diagonal_compare,
     draw_multiple_nets_confusion_matrix,
-    generate_matrices_graphs_lr,
+    slice_lr_conf_mats,
 )
 from road_dashboards.road_eval_dashboard.components.graph_wrapper import graph_wrapper
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import card_wrapper, loading_wrapper
 from road_dashboards.road_eval_dashboard.components.queries_manager import (
+    generate_lr_conf_mat_cube_query,
     generate_path_net_double_boundaries_query,
     generate_path_net_query,
     process_net_name,
@@ -39,6 +41,8 @@ from road_dashboards.road_eval_dashboard.utils.consts import BOUNDARY_IGNORE_VAL
 from road_dashboards.road_eval_dashboard.utils.distances import SECONDS
 from road_dashboards.road_eval_dashboard.utils.url_state_utils import create_dropdown_options_list
 
+CONF_MAT_CUBES_CACHE_ENTRIES = 64
+
 CATEGORICAL_CLASSES = [
     ("boundaries", "type"),
     ("boundaries", "is_re"),
@@ -129,41 +133,43 @@ boundaries_layout = html.Div(
 )
 
 
-def serialize_lr_data(lr_all_data):
-    """Serializes the nested dictionary containing numpy arrays from generate_matrices_graphs_lr."""
-    serializable = {}
-    for side, net_data in lr_all_data.items():
-        serializable[side] = {}
-        for net_id, matrix_data in net_data.items():
-            serializable[side][net_id] = {
-                "conf_matrix": matrix_data["conf_matrix"].tolist()
-                if isinstance(matrix_data.get("conf_matrix"), np.ndarray)
-                else matrix_data.get("conf_matrix"),
-                "normalize_mat": matrix_data["normalize_mat"].tolist()
-                if isinstance(matrix_data.get("normalize_mat"), np.ndarray)
-                else matrix_data.get("normalize_mat"),
-            }
-    return json.dumps(serializable)
-
-
-def deserialize_lr_data(json_data):
-    """Deserializes the L/R/All data back into dicts with numpy arrays."""
-    if not json_data:
+_conf_mat_cubes = LRUCache(maxsize=CONF_MAT_CUBES_CACHE_ENTRIES)
+
+
+def get_conf_mat_cube(cube_handle, num_classes):
+    """
+    The conf mat cube of a registered generate_lr_conf_mat_cube_query query.
+    Cubes are kept server-side, so moving the time slider only re-slices the cube of the current filters.
+    """
+    cube_data = _conf_mat_cubes.get(cube_handle)
+    if cube_data is None:
+        cube_data = build_lr_conf_mat_cube(object_registry.get(cube_handle), SECONDS, num_classes)
+        _conf_mat_cubes.set(cube_handle, cube_data)
+    return cube_data
+
+
+def get_lr_conf_mats(cube_handle, num_classes, time_value):
+    if not cube_handle:
         return {"left": {}, "right": {}, "all": {}}
-    loaded_data = json.loads(json_data)
-    deserialized = {}
-    for side, net_data in loaded_data.items():
-        deserialized[side] = {}
-        for net_id, matrix_data in net_data.items():
-            deserialized[side][net_id] = {
-                "conf_matrix": np.array(matrix_data["conf_matrix"])
-                if matrix_data.get("conf_matrix") is not None
-                else None,
-                "normalize_mat": np.array(matrix_data["normalize_mat"])
-                if matrix_data.get("normalize_mat") is not None
-                else None,
-            }
-    return deserialized
+    return slice_lr_conf_mats(get_conf_mat_cube(cube_handle, num_classes), time_value)
+
+
+def register_lr_conf_mat_cube(nets, meta_data_filters, extra_filters, role, bound_name):
+    ontology, class_attribute = parse_bound_name(bound_name)
+    query = generate_lr_conf_mat_cube_query(
+        nets[PATHNET_BOUNDARIES],
+        nets["meta_data"],
+        label_col_template=get_bound_column_templates(ontology, class_attribute, "gt"),
+        pred_col_template=get_bound_column_templates(ontology, class_attribute, "pred"),
+        seconds=SECONDS,
+        ignore_val=BOUNDARY_IGNORE_VAL,
+        meta_data_filters=meta_data_filters,
+        extra_filters=extra_filters,
+        role=role,
+    )
+    cube_handle = object_registry.register(query)
+    get_conf_mat_cube(cube_handle, len(CLASS_NAMES_MAP[bound_name]))
+    return cube_handle
 
 
 @callback(
@@ -171,30 +177,13 @@ def deserialize_lr_data(json_data):
     Input(NETS, "data"),
     Input(MD_FILTERS, "data"),
     Input(PATHNET_FILTERS, "data"),
-    Input("boundaries-time-slider", "value"),
     State({"type": BOUNDARIES_ALL_MATRICES_LR_STORE, "bound": MATCH}, "id"),
 )
-def update_all_lr_store(nets, meta_data_filters, pathnet_filters, time_value, store_id):
+def update_all_lr_store(nets, meta_data_filters, pathnet_filters, store_id):
     if not nets:
-        return json.dumps({"left": {}, "right": {}, "all": {}})
-
-    bound_name = store_id["bound"]  # e.g., "boundaries|type"
-    ontology, class_attribute = parse_bound_name(bound_name)
-    class_names = CLASS_NAMES_MAP[bound_name]
+        return None
 
-    lr_all_data = generate_matrices_graphs_lr(
-        label_col_template=get_bound_column_templates(ontology, class_attribute, "gt"),
-        pred_col_template=get_bound_column_templates(ontology, class_attribute, "pred"),
-        nets_tables=nets[PATHNET_BOUNDARIES],
-        meta_data_table=nets["meta_data"],
-        time_value=f"{time_value:.1f}",
-        ignore_val=BOUNDARY_IGNORE_VAL,
-        meta_data_filters=meta_data_filters,
-        role="",
-        class_names=class_names,
-        extra_filters=pathnet_filters,
-    )
-    return serialize_lr_data(lr_all_data)
+    return register_lr_conf_mat_cube(nets, meta_data_filters, pathnet_filters, "", store_id["bound"])
 
 
 @callback(
@@ -202,30 +191,13 @@ def update_all_lr_store(nets, meta_data_filters, pathnet_filters, time_value, st
     Input(NETS, "data"),
     Input(MD_FILTERS, "data"),
     Input(PATHNET_FILTERS, "data"),
-    Input("boundaries-time-slider", "value"),
     State({"type": BOUNDARIES_HOST_MATRICES_LR_STORE, "bound": MATCH}, "id"),
 )
-def update_host_lr_store(nets, meta_data_filters, pathnet_filters, time_value, store_id):
+def update_host_lr_store(nets, meta_data_filters, pathnet_filters, store_id):
     if not nets:
-        return json.dumps({"left": {}, "right": {}, "all": {}})
-
-    bound_name = store_id["bound"]  # e.g., "boundaries|type"
-    ontology, class_attribute = parse_bound_name(bound_name)
-    class_names = CLASS_NAMES_MAP[bound_name]
+        return None
 
-    lr_all_data = generate_matrices_graphs_lr(
-        label_col_template=get_bound_column_templates(ontology, class_attribute, "gt"),
-        pred_col_template=get_bound_column_templates(ontology, class_attribute, "pred"),
-        nets_tables=nets[PATHNET_BOUNDARIES],
-        meta_data_table=nets["meta_data"],
-        time_value=f"{time_value:.1f}",
-        ignore_val=BOUNDARY_IGNORE_VAL,
-        meta_data_filters=meta_data_filters,
-        role="host",
-        class_names=class_names,
-        extra_filters="",
-    )
-    return serialize_lr_data(lr_all_data)
+    return register_lr_conf_mat_cube(nets, meta_data_filters, "", "host", store_id["bound"])
 
 
 @callback(
@@ -244,7 +216,7 @@ def generate_all_dps_figures(side, time_value, lr_all_store_data, graph_id):
     if not lr_all_store_data:
         return EMPTY_FIGURE
 
-    lr_all_data = deserialize_lr_data(lr_all_store_data)
+    lr_all_data = get_lr_conf_mats(lr_all_store_data, len(class_names), time_value)
     net_names = list(lr_all_data.get("all", {}).keys())
 
     if side not in lr_all_data:
@@ -282,7 +254,7 @@ def generate_host_figures(side, time_value, lr_host_store_data, graph_id):
     if not lr_host_store_data:
         return EMPTY_FIGURE
 
-    lr_all_data = deserialize_lr_data(lr_host_store_data)
+    lr_all_data = get_lr_conf_mats(lr_host_store_data, len(class_names), time_value)
     net_names = list(lr_all_data.get("all", {}).keys())
     if side not in lr_all_data:
         return EMPTY_FIGURE
@@ -330,12 +302,12 @@ def draw_conf_mat(net1_name, net2_name, side, time_value, all_lr_store_data, hos
         if not lr_data_store or not net_name:
             return default_zeros, default_zeros
 
-        deserialized_data = deserialize_lr_data(lr_data_store)
+        lr_data = get_lr_conf_mats(lr_data_store, len(class_names), time_value)
 
-        if selected_side not in deserialized_data:
+        if selected_side not in lr_data:
             return default_zeros, default_zeros
 
-        side_data = deserialized_data[selected_side]
+        side_data = lr_data[selected_side]
         net_matrix_data = side_data.get(process_net_name(net_name), {})
 
         conf_mat = net_matrix_data.get("conf_matrix", default_zeros)
@@ -659,8 +631,8 @@ def update_net_options(all_lr_store_data, dropdown_ids):
     if not all_lr_store_data or not dropdown_ids:
         return empty_options, empty_values
 
-    deserialized_data = deserialize_lr_data(all_lr_store_data)
-    nets_names = list(deserialized_data.get("all", {}).keys())
+    bound_name = dropdown_ids[0]["bound"]
+    nets_names = get_conf_mat_cube(all_lr_store_data, len(CLASS_NAMES_MAP[bound_name]))["net_names"]
 
     if not nets_names:
         return empty_options, empty_values
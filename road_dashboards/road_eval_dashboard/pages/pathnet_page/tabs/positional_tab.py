@@ -2,8 +2,8 @@ import dash_bootstrap_components as dbc
 import dash_daq as daq
 import plotly.express as px
 from dash import MATCH, Input, Output, State, callback, dcc, html, no_update
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components.common_filters import (
     PATHNET_BATCH_BY_SEC_FILTERS,
     PATHNET_MISS_FALSE_FILTERS,
@@ -706,7 +706,7 @@ def get_column_histogram(meta_data_filters, pathnet_filters, nets, role, column,
         group_by_net_id=True,
         extra_columns=["bias", "view_range"],
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     data[column] = data[column].clip(min_val, max_val)
     data = data.sort_values(by=column)
 
@@ -1,7 +1,4 @@
-import json
-
 import dash_bootstrap_components as dbc
-import numpy as np
 from dash import ALL, MATCH, Input, Output, State, callback, dcc, html, no_update
 
 from road_dashboards.road_eval_dashboard.components.components_ids import (
@@ -21,6 +18,7 @@ from road_dashboards.road_eval_dashboard.components.graph_wrapper import graph_w
 from road_dashboards.road_eval_dashboard.components.layout_wrapper import card_wrapper, loading_wrapper
 from road_dashboards.road_eval_dashboard.graphs.confusion_matrix import draw_multiple_nets_confusion_matrix
 from road_dashboards.road_eval_dashboard.graphs.tp_rate_graph import draw_conf_diagonal_compare
+from road_dashboards.road_eval_dashboard.utils.array_codec import decode_arrays, encode_arrays
 from road_dashboards.road_eval_dashboard.utils.consts import ROLE_IGNORE_VAL
 from road_dashboards.road_eval_dashboard.utils.url_state_utils import create_dropdown_options_list
 
@@ -34,6 +32,10 @@ ROLE_CLASSES_NAMES = {
 role_layout = html.Div([html.Div(id={"out": "graph", "role": role}) for role in ROLE_CLASSES_NAMES.keys()])
 
 
+def get_mat_name(role, is_host):
+    return f"{role} TPR for Host dps" if is_host else f"{role} TPR for all dps"
+
+
 def generate_matrices_graphs(
     nets,
     role,
@@ -54,28 +56,10 @@ def generate_matrices_graphs(
         extra_filters=pathnet_filters,
         extra_columns=extra_columns,
     )
-    conf_mats = [mat["conf_matrix"] for mat in mats.values()]
     normalize_mats = [mat["normalize_mat"] for mat in mats.values()]
     net_names = list(mats.keys())
     diagonal_compare = draw_conf_diagonal_compare(normalize_mats, net_names, class_names, role=role, mat_name=mat_name)
-    mats_figs = draw_multiple_nets_confusion_matrix(
-        conf_mats, normalize_mats, net_names, class_names, role=role, mat_name=mat_name
-    )
-    serialized_mats_figs = {
-        net_name: fix_plotly_json(fig.to_plotly_json()) for net_name, fig in zip(net_names, mats_figs)
-    }
-    return diagonal_compare, serialized_mats_figs
-
-
-def fix_plotly_json(obj):
-    if isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {k: fix_plotly_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [fix_plotly_json(i) for i in obj]
-    else:
-        return obj
+    return diagonal_compare, encode_arrays(mats)
 
 
 @callback(
@@ -93,18 +77,18 @@ def generate_all_dps_data(nets, meta_data_filters, pathnet_filters, graph_id):
         return no_update, no_update, no_update, no_update
 
     role = graph_id["role"]
-    diagonal_compare, serialized_mats_figs = generate_matrices_graphs(
+    diagonal_compare, encoded_mats = generate_matrices_graphs(
         nets,
         role,
         meta_data_filters,
         pathnet_filters,
-        mat_name=f"{role} TPR for all dps",
+        mat_name=get_mat_name(role, is_host=False),
     )
-    nets_name_include_suffix = list(serialized_mats_figs.keys())
+    nets_name_include_suffix = list(encoded_mats.keys())
     net_options = create_dropdown_options_list(nets_name_include_suffix)
     default_value = nets_name_include_suffix[0]
 
-    return diagonal_compare, json.dumps(serialized_mats_figs), net_options, default_value
+    return diagonal_compare, encoded_mats, net_options, default_value
 
 
 @callback(
@@ -121,14 +105,14 @@ def generate_host_data(nets, meta_data_filters, pathnet_filters, graph_id):
 
     role = graph_id["role"]
     pathnet_filters = f"{pathnet_filters} AND lane_role = 1" if pathnet_filters else "lane_role = 1"
-    diagonal_compare, serialized_mats_figs = generate_matrices_graphs(
+    diagonal_compare, encoded_mats = generate_matrices_graphs(
         nets,
         role,
         meta_data_filters,
         pathnet_filters,
-        mat_name=f"{role} TPR for Host dps",
+        mat_name=get_mat_name(role, is_host=True),
     )
-    return diagonal_compare, json.dumps(serialized_mats_figs)
+    return diagonal_compare, encoded_mats
 
 
 @callback(
@@ -137,19 +121,29 @@ def generate_host_data(nets, meta_data_filters, pathnet_filters, graph_id):
     Input({"type": "net_options", "role": MATCH}, "value"),
     State({"type": PATH_NET_ALL_CONF_MATS_STORE, "role": MATCH}, "data"),
     State({"type": PATH_NET_HOST_CONF_MATS_STORE, "role": MATCH}, "data"),
+    State({"type": "net_options", "role": MATCH}, "id"),
 )
-def draw_conf_mat(chosen_net, all_dps_conf_mats_store, host_conf_mats_store):
-    def load_conf_mat(conf_mats_store):
-        if conf_mats_store is None:
+def draw_conf_mat(chosen_net, all_dps_conf_mats_store, host_conf_mats_store, dropdown_id):
+    role = dropdown_id["role"]
+
+    def load_conf_mat(conf_mats_store, is_host):
+        if not conf_mats_store:
             return []
-        conf_mats_dict = json.loads(conf_mats_store)
-        return [conf_mats_dict[chosen_net]]
+        net_mats = decode_arrays(conf_mats_store[chosen_net])
+        return draw_multiple_nets_confusion_matrix(
+            [net_mats["conf_matrix"]],
+            [net_mats["normalize_mat"]],
+            [chosen_net],
+            ROLE_CLASSES_NAMES[role],
+            role=role,
+            mat_name=get_mat_name(role, is_host),
+        )
 
     if not chosen_net:
         return no_update, no_update
 
-    all_dps_conf_mat = load_conf_mat(all_dps_conf_mats_store)
-    host_conf_mat = load_conf_mat(host_conf_mats_store)
+    all_dps_conf_mat = load_conf_mat(all_dps_conf_mats_store, is_host=False)
+    host_conf_mat = load_conf_mat(host_conf_mats_store, is_host=True)
     return all_dps_conf_mat, host_conf_mat
 
 
@@ -0,0 +1,10 @@
+from dash import register_page
+
+from road_dashboards.common.perf_monitor import PERF_PAGE_PATH
+from road_dashboards.common.perf_page import perf_layout
+from road_dashboards.road_eval_dashboard.components.page_properties import PageProperties
+
+extra_properties = PageProperties("tachometer-alt")
+register_page(__name__, path=PERF_PAGE_PATH, name="Performance", order=100, **extra_properties.__dict__)
+
+layout = perf_layout()
@@ -1,7 +1,7 @@
 import dash_bootstrap_components as dbc
 from dash import Input, Output, callback, html, no_update
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components.components_ids import (
     MD_FILTERS,
     NETS,
@@ -73,7 +73,7 @@ def get_frame_count(meta_data_filters, nets, role, Z_source, threshold):
         meta_data_filters=meta_data_filters,
         base_extra_filters=f"{label} != {IGNORE_VAL}",
     )
-    data, _ = query_athena(database="run_eval_db", query=query)
+    data, _ = cached_query_athena(database="run_eval_db", query=query)
     return draw_meta_data_filters(
         data,
         ["accurate", "inaccurate", "unavailable"],
@@ -1,9 +1,8 @@
 import dash_bootstrap_components as dbc
-import numpy as np
 import pandas as pd
 from dash import ALL, MATCH, Input, Output, State, callback, dcc, html, no_update, register_page
-from road_database_toolkit.athena.athena_utils import query_athena
 
+from road_dashboards.common.query_cache import cached_query_athena
 from road_dashboards.road_eval_dashboard.components import base_dataset_statistics, meta_data_filter
 from road_dashboards.road_eval_dashboard.components.components_ids import (
     ALL_SCENE_CONF_DIAGONALS,
@@ -27,13 +26,14 @@ from road_dashboards.road_eval_dashboard.components.page_properties import PageP
 from road_dashboards.road_eval_dashboard.components.queries_manager import (
     ROC_THRESHOLDS,
     generate_cols_query,
-    generate_roc_query,
+    get_roc_curve_result,
     process_net_names_list,
-    run_query_with_nets_names_processing,
+    submit_roc_curve_query,
 )
 from road_dashboards.road_eval_dashboard.graphs.confusion_matrix import draw_confusion_matrix
 from road_dashboards.road_eval_dashboard.graphs.roc_curve import draw_roc_curve
 from road_dashboards.road_eval_dashboard.graphs.tp_rate_graph import draw_conf_diagonal_compare
+from road_dashboards.road_eval_dashboard.utils.array_codec import decode_array, decode_arrays, encode_arrays
 
 binary_scene_class_names = ["False", "True"]
 extra_properties = PageProperties("line-chart")
@@ -141,7 +141,7 @@ def get_scene_signal_list(nets):
         return no_update
 
     cols_query = generate_cols_query(nets["frame_tables"], search_string="scene_signals_")
-    cols_data, _ = query_athena(database="run_eval_db", query=cols_query)
+    cols_data, _ = cached_query_athena(database="run_eval_db", query=cols_query)
     if cols_data.empty:
         return None
     cols_mest_names = set.intersection(
@@ -186,7 +186,7 @@ def _generate_matrices(meta_data_filters, nets, signals):
         signal_name = f"{signal}_mest"
         conf_mats[signal_name] = _generate_matrices_per_signal(nets, meta_data_filters, signal_name)
     notification = dbc.Alert("Confusion matrices data is ready.", color="success", dismissable=True, duration=2000)
-    return conf_mats, notification
+    return encode_arrays(conf_mats), notification
 
 
 @callback(
@@ -211,27 +211,23 @@ def get_scene_roc_curve(id, meta_data_filters, nets):
         return no_update
 
     signal = id["signal"]
-    query = generate_roc_query(
-        nets["frame_tables"],
-        nets["meta_data"],
-        meta_data_filters=meta_data_filters,
-        label_col=f"scene_signals_{signal}_label",
-        pred_col=f"scene_signals_{signal}_pred",
-        thresholds=ROC_THRESHOLDS,
-    )
-    data, _ = run_query_with_nets_names_processing(query)
-    data = data.fillna(1)
-
-    try:  # mest query
-        query_mest = generate_roc_query(
+    # both queries are submitted before waiting, so they run concurrently on the query scheduler
+    data_future, data_mest_future = (
+        submit_roc_curve_query(
             nets["frame_tables"],
             nets["meta_data"],
             meta_data_filters=meta_data_filters,
             label_col=f"scene_signals_{signal}_label",
-            pred_col=f"scene_signals_{signal}_mest_pred",
+            pred_col=pred_col,
             thresholds=ROC_THRESHOLDS,
         )
-        data_mest, _ = run_query_with_nets_names_processing(query_mest)
+        for pred_col in [f"scene_signals_{signal}_pred", f"scene_signals_{signal}_mest_pred"]
+    )
+    data = get_roc_curve_result(data_future, ROC_THRESHOLDS)
+    data = data.fillna(1)
+
+    try:  # mest query
+        data_mest = get_roc_curve_result(data_mest_future, ROC_THRESHOLDS)
         data_mest = data_mest.loc[[0]]
         data_mest.loc[0, "net_id"] = "Mest"
         data = pd.concat([data, data_mest], axis=0)
@@ -274,9 +270,10 @@ def _generate_scene_conf_mat_chart(id, conf_mats):
     except KeyError:
         net = next(iter(conf_mats[signal].keys()))
     mat_name = _name2title(signal)
+    net_mats = decode_arrays(conf_mats[signal][net])
     return draw_confusion_matrix(
-        np.array(conf_mats[signal][net]["conf_matrix"]),
-        np.array(conf_mats[signal][net]["normalize_mat"]),
+        net_mats["conf_matrix"],
+        net_mats["normalize_mat"],
         binary_scene_class_names,
         mat_name=mat_name,
     )
@@ -309,10 +306,10 @@ def _generate_scene_conf_diagonals_chart(id, conf_mats):
     signal = id["signal"]
     if signal.endswith("_mest"):
         return
-    normalize_mats = [np.array(mat["normalize_mat"]) for mat in conf_mats[signal].values()]
+    normalize_mats = [decode_array(mat["normalize_mat"]) for mat in conf_mats[signal].values()]
     net_names = list(conf_mats[signal].keys())
     if f"{signal}_mest" in conf_mats.keys():
-        normalize_mats.append(np.array(list(conf_mats[f"{signal}_mest"].values())[0]["normalize_mat"]))
+        normalize_mats.append(decode_array(list(conf_mats[f"{signal}_mest"].values())[0]["normalize_mat"]))
         net_names.append("MEST")
     mat_name = _name2title(signal)
     return draw_conf_diagonal_compare(normalize_mats, net_names, binary_scene_class_names, mat_name=mat_name)
@@ -0,0 +1,36 @@
+import fire
+import pandas as pd
+
+from road_dashboards.road_eval_dashboard.components.catalog_table import (
+    init_nets,
+    run_eval_db_manager,
+    update_state_by_nets,
+)
+from road_dashboards.road_eval_dashboard.components.run_state_store import get_used_selections
+
+
+def precompute_runs(*run_names, together=False, used_within_days=None):
+    """
+    Computes the meta data dicts, effective samples and best fb thresholds of runs into the run state store,
+    so choosing them in the catalog doesn't wait for the bootstrap queries. The state covers the frames common to
+    all the selected runs, so it is stored per selection of runs.
+    Each run is precomputed on its own, or with together=True as one selection of all the given runs.
+    With used_within_days, the stored selections chosen in the dashboard in the last used_within_days are
+    recomputed as well, e.g. from a daily job, so the runs usually compared together stay precomputed.
+    """
+    selections = [list(run_names)] if together else [[run_name] for run_name in run_names]
+    if used_within_days is not None:
+        selections += get_used_selections(used_within_days * 24 * 60 * 60)
+    for selection in selections:
+        rows = [run_eval_db_manager.get_item(run_name) for run_name in selection]
+        nets = init_nets(pd.DataFrame(rows))
+        update_state_by_nets(nets, use_stored=False)
+        print(f"Precomputed the state of runs {', '.join(selection)}")
+
+
+def main():
+    fire.Fire(precompute_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import base64
+import json
+import time
+import zlib
+
+import numpy as np
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+ARRAY_MARKER = "__ndarray__"
+COMPRESSION_MIN_BYTES = 1024
+DEFAULT_COMPRESSION = "lz4" if lz4_frame is not None else "zlib"
+
+_COMPRESSORS = {
+    None: (lambda data: data, lambda data: data),
+    "zlib": (zlib.compress, zlib.decompress),
+}
+if lz4_frame is not None:
+    _COMPRESSORS["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+
+
+def encode_array(arr, compression="auto"):
+    """
+    JSON-able form of a numpy array for dcc.Store: dtype, shape and the base64 of its raw bytes.
+    With compression="auto" only arrays of at least COMPRESSION_MIN_BYTES are compressed.
+    """
+    arr = np.require(arr, requirements="C")
+    if compression == "auto":
+        compression = DEFAULT_COMPRESSION if arr.nbytes >= COMPRESSION_MIN_BYTES else None
+    compress, _ = _COMPRESSORS[compression]
+    return {
+        ARRAY_MARKER: True,
+        "dtype": arr.dtype.str,
+        "shape": list(arr.shape),
+        "compression": compression,
+        "data": base64.b64encode(compress(arr.tobytes())).decode("ascii"),
+    }
+
+
+def decode_array(encoded):
+    """
+    Inverse of encode_array. The decoded array is a read only view of the decoded bytes (no copy is made),
+    callers that modify it in place have to copy it first.
+    """
+    _, decompress = _COMPRESSORS[encoded["compression"]]
+    data = decompress(base64.b64decode(encoded["data"]))
+    return np.frombuffer(data, dtype=np.dtype(encoded["dtype"])).reshape(encoded["shape"])
+
+
+def is_encoded_array(obj):
+    return isinstance(obj, dict) and obj.get(ARRAY_MARKER) is True
+
+
+def encode_arrays(obj, compression="auto"):
+    """Encodes every numpy array nested in dicts / lists / tuples of obj"""
+    if isinstance(obj, np.ndarray):
+        return encode_array(obj, compression)
+    elif isinstance(obj, dict):
+        return {k: encode_arrays(v, compression) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [encode_arrays(v, compression) for v in obj]
+    return obj
+
+
+def decode_arrays(obj):
+    """Inverse of encode_arrays, the decoded arrays are read only views of the store payload"""
+    if is_encoded_array(obj):
+        return decode_array(obj)
+    elif isinstance(obj, dict):
+        return {k: decode_arrays(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [decode_arrays(v) for v in obj]
+    return obj
+
+
+def _to_lists(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {k: _to_lists(v) for k, v in obj.items()}
+    return obj
+
+
+def _from_lists(obj):
+    if isinstance(obj, dict):
+        return {k: _from_lists(v) for k, v in obj.items()}
+    return np.array(obj)
+
+
+def benchmark_round_trip(num_nets=8, num_classes=8, num_mats=50, repeats=20):
+    """
+    Compares the store payload size and the encode + json + decode time of the array codec
+    against the nested lists JSON path, on conf mat dicts shaped like the eval dashboard stores.
+    """
+    rng = np.random.default_rng(0)
+    mats = {
+        f"mat_{mat_ind}": {
+            f"net_{net_ind}": {
+                "conf_matrix": rng.integers(0, 100_000, size=(num_classes, num_classes)),
+                "normalize_mat": rng.random((num_classes, num_classes)),
+            }
+            for net_ind in range(num_nets)
+        }
+        for mat_ind in range(num_mats)
+    }
+    paths = {
+        "json lists": (lambda obj: json.dumps(_to_lists(obj)), lambda payload: _from_lists(json.loads(payload))),
+        "array codec": (lambda obj: json.dumps(encode_arrays(obj)), lambda payload: decode_arrays(json.loads(payload))),
+        "array codec (no compression)": (
+            lambda obj: json.dumps(encode_arrays(obj, compression=None)),
+            lambda payload: decode_arrays(json.loads(payload)),
+        ),
+    }
+    results = {}
+    for name, (encode, decode) in paths.items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            payload = encode(mats)
+        encode_time = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        for _ in range(repeats):
+            decode(payload)
+        decode_time = (time.perf_counter() - start) / repeats
+        results[name] = {"bytes": len(payload), "encode_ms": encode_time * 1000, "decode_ms": decode_time * 1000}
+    return results
+
+
+if __name__ == "__main__":
+    for path_name, result in benchmark_round_trip().items():
+        print(
+            f"{path_name:30} {result['bytes']:>10} bytes  "
+            f"encode {result['encode_ms']:8.2f} ms  decode {result['decode_ms']:8.2f} ms"
+        )
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+SEGMENT_SEPARATOR = "/"
+METRICS = ["count", "overall", "recall", "precision"]
+
+
+def get_segment_name(group, filter_name):
+    return f"{group}{SEGMENT_SEPARATOR}{filter_name}"
+
+
+def get_segments_filters(segments_groups):
+    """Flattens {group: {filter_name: filter}} to {segment: filter}, so equally named filters of groups don't collide"""
+    return {
+        get_segment_name(group, filter_name): segment_filter
+        for group, filters in segments_groups.items()
+        for filter_name, segment_filter in filters.items()
+    }
+
+
+def sum_segment_counts(counts, role=""):
+    """Sums the (net_id, role, segment) counts of generate_segment_counts_query over the roles, or takes one role"""
+    if role:
+        counts = counts[counts["role"] == role]
+    return counts.groupby(["net_id", "segment"])[["positive", "total"]].sum()
+
+
+def build_segments_fb(recall_counts, precision_counts, group, filters_names, role=""):
+    """Same output as the count_f / overall_f / recall_f / precision_f columns of generate_fb_query for one group"""
+    recall_counts = sum_segment_counts(recall_counts, role)
+    precision_counts = sum_segment_counts(precision_counts, role)
+    net_ids = sorted(
+        set(recall_counts.index.get_level_values("net_id")) & set(precision_counts.index.get_level_values("net_id"))
+    )
+
+    rows = []
+    for net_id in net_ids:
+        row = {"net_id": net_id}
+        for filter_name in filters_names:
+            segment = get_segment_name(group, filter_name)
+            detected, total = get_counts(recall_counts, net_id, segment)
+            tp, preds = get_counts(precision_counts, net_id, segment)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                row[f"count_{filter_name}"] = detected
+                row[f"overall_{filter_name}"] = total
+                row[f"recall_{filter_name}"] = np.float64(detected) / total
+                row[f"precision_{filter_name}"] = np.float64(tp) / preds
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=["net_id"] + [f"{metric}_{f}" for f in filters_names for metric in METRICS])
+
+
+def get_counts(counts, net_id, segment):
+    if (net_id, segment) not in counts.index:
+        return 0, 0
+    positive, total = counts.loc[(net_id, segment)]
+    return positive, total
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+def get_histogram_bins(thresholds):
+    return np.unique(thresholds)
+
+
+def cumulative_counts_per_net(hist, thresholds):
+    """
+    hist holds per (net_id, label_sign) the counts of each width_bucket over get_histogram_bins(thresholds),
+    bucket b counts the rows with bins[b - 1] <= pred < bins[b] and a NULL bucket counts NULL preds.
+    Returns per (net_id, label_sign): counts of rows with pred >= threshold, counts of non NULL rows
+    with pred < threshold (one value per threshold), and the total number of rows (including NULL preds).
+    """
+    bins = get_histogram_bins(thresholds)
+    threshold_buckets = np.searchsorted(bins, thresholds) + 1
+    counts = {}
+    for (net_id, label_sign), sign_hist in hist.groupby(["net_id", "label_sign"]):
+        valid_hist = sign_hist[sign_hist["bucket"].notna()]
+        bucket_counts = np.zeros(bins.size + 1)
+        np.add.at(bucket_counts, valid_hist["bucket"].astype(int).to_numpy(), valid_hist["count"].to_numpy())
+        above = np.cumsum(bucket_counts[::-1])[::-1]
+        above_threshold = above[threshold_buckets]
+        below_threshold = above[0] - above_threshold
+        counts[(net_id, label_sign)] = (above_threshold, below_threshold, sign_hist["count"].sum())
+
+    return counts
+
+
+def build_fb_curves(recall_hist, precision_hist, thresholds):
+    """Same output as the per threshold recall_i / precision_i columns of generate_fb_query"""
+    recall_counts = cumulative_counts_per_net(recall_hist, thresholds)
+    precision_counts = cumulative_counts_per_net(precision_hist, thresholds)
+    zeros = (np.zeros(len(thresholds)), np.zeros(len(thresholds)), 0)
+    net_ids = sorted({net_id for net_id, _ in recall_counts} & {net_id for net_id, _ in precision_counts})
+
+    rows = []
+    for net_id in net_ids:
+        detected, _, total = recall_counts.get((net_id, 1), zeros)
+        tp, _, _ = precision_counts.get((net_id, 1), zeros)
+        fp, _, _ = precision_counts.get((net_id, -1), zeros)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            recall = detected / total if total else np.full(len(thresholds), np.nan)
+            precision = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+        rows.append(
+            {
+                "net_id": net_id,
+                **{f"recall_{ind}": value for ind, value in enumerate(recall)},
+                **{f"precision_{ind}": value for ind, value in enumerate(precision)},
+            }
+        )
+
+    return pd.DataFrame(rows)
+
+
+def build_roc_curves(hist, thresholds):
+    """Same output as the per threshold tp_i / fp_i / tn_i / fn_i columns of generate_roc_query"""
+    counts = cumulative_counts_per_net(hist, thresholds)
+    zeros = (np.zeros(len(thresholds)), np.zeros(len(thresholds)), 0)
+    net_ids = sorted({net_id for net_id, _ in counts})
+
+    rows = []
+    for net_id in net_ids:
+        tp, fn, _ = counts.get((net_id, 1), zeros)
+        fp, tn, _ = counts.get((net_id, -1), zeros)
+        row = {"net_id": net_id}
+        for ind in range(len(thresholds)):
+            row.update({f"tp_{ind}": tp[ind], f"fp_{ind}": fp[ind], f"tn_{ind}": tn[ind], f"fn_{ind}": fn[ind]})
+        rows.append(row)
+
+    return pd.DataFrame(rows)
@@ -1,7 +1,8 @@
+import time
+from concurrent.futures import wait
 from datetime import datetime, timedelta, timezone
-from enum import Enum
-from threading import Lock
-from typing import Any, Iterable
+from threading import Thread
+from typing import Any, Iterable, Iterator
 
 import pandas as pd
 from loguru import logger
@@ -15,12 +16,17 @@ from road_database_toolkit.databases.workflows.workflow_enums import (
 )
 from road_database_toolkit.postgresql.config import PostgresConfig
 from road_database_toolkit.postgresql.db_manager import get_session
-from road_database_toolkit.utils.cache import hashable_lru_cache
-from sqlalchemy import DateTime, desc, distinct, func, select
+from sqlalchemy import DateTime, cast, desc, distinct, func, literal, null, or_, select, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+
+from road_dashboards.common.swr_cache import swr_cache
+from road_dashboards.workflows_dashboard.workflow_rollups import WorkflowRollups, enum_value
 
 MAX_CACHE_SIZE = 100
 EXPIRATION_TIME = timedelta(minutes=30)
+REFRESH_TIMEOUT = timedelta(minutes=5)
 MAX_ERROR_MSG_LENGTH = 50
+EXPORT_CHUNK_SIZE = 10_000
 
 
 WORKFLOW_SPECIFIC_COLUMNS_MAP = {
@@ -39,10 +45,10 @@ class AnalyticsManager:
     """
 
     def __init__(self) -> None:
-        """Initialize the AnalyticsManager with cache management."""
-        self._cache_lock = Lock()
-        self._last_refresh: datetime | None = None
+        """Initialize the AnalyticsManager with cache management, the rollups are refreshed in the background."""
         self.db_config = PostgresConfig()
+        self.rollups = WorkflowRollups(self.db_config)
+        Thread(target=self._refresh_rollups_periodically, name="workflow_rollups_refresh", daemon=True).start()
 
     def _build_base_select(self, select_columns: list[Any], join_clip_table: bool = False) -> Any:
         """Constructs a base SQLAlchemy 2.0 select statement.
@@ -91,36 +97,46 @@ class AnalyticsManager:
             stmt = stmt.where(*conditions)
         return stmt
 
-    def _should_refresh_cache(self) -> bool:
-        if self._last_refresh is None:
-            return True
-        now = datetime.now(timezone.utc if self._last_refresh.tzinfo else None)
-        return (now - self._last_refresh) > EXPIRATION_TIME
+    def _cached_methods(self) -> list[Any]:
+        return [
+            self.get_status_distribution,
+            self.get_error_distribution,
+            self.get_weekly_success_data,
+            self.get_workflow_success_count_data,
+            self.get_unique_values_per_column,
+            self.get_unique_status_values,
+        ]
 
     def refresh_data(self) -> None:
-        with self._cache_lock:
-            methods = [
-                self.get_status_distribution,
-                self.get_error_distribution,
-                self.get_weekly_success_data,
-                self.get_workflow_success_count_data,
-                self.get_unique_column_values,
-                self.get_unique_status_values,
-            ]
-
-            for method in methods:
-                try:
-                    method.cache_clear()
-                except Exception as e:
-                    logger.warning(f"Failed to clear cache for {method.__name__}: {e}")
-            self._last_refresh = datetime.now(timezone.utc)
-
-    def _ensure_fresh_cache(self) -> None:
-        """Ensure cache is fresh, refreshing if needed."""
-        if self._should_refresh_cache():
-            self.refresh_data()
-
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
+        """Refresh the rollups and recompute every cached result concurrently.
+
+        The cached results keep being served to other requests until their recomputed values replace them.
+        """
+        self.rollups.refresh()
+        futures = []
+        for method in self._cached_methods():
+            futures.extend(method.cache.refresh_all())
+        wait(futures, timeout=REFRESH_TIMEOUT.total_seconds())
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                logger.warning(f"Failed to refresh a cached result: {future.exception()}")
+        logger.info(f"Analytics cache stats: {self.get_cache_stats()}")
+
+    def get_cache_stats(self) -> dict[str, dict[str, int | float]]:
+        """Hit rate, refresh latency and age of the served results of each cached method."""
+        return {method.__name__: method.cache_stats() for method in self._cached_methods()}
+
+    def _refresh_rollups_periodically(self) -> None:
+        """Refreshes the rollups every EXPIRATION_TIME, starting with the initial build.
+
+        Requests never wait for a refresh: they read the rollups once is_ready(), and query the runs directly before.
+        The cached results themselves expire per entry and are recomputed in the background (see swr_cache).
+        """
+        while True:
+            self.rollups.refresh()
+            time.sleep(EXPIRATION_TIME.total_seconds())
+
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
     def get_status_distribution(
         self,
         workflow_type: WorkflowType,
@@ -128,27 +144,31 @@ class AnalyticsManager:
         start_date: str | None = None,
         end_date: str | None = None,
     ) -> pd.DataFrame:
-        self._ensure_fresh_cache()
-        join_clip = brain_types is not None
-
-        with get_session(self.db_config) as session:
-            stmt = self._build_base_select(
-                select_columns=[WorkflowRun.status, func.count(WorkflowRun.id).label("count")],
-                join_clip_table=join_clip,
-            )
-            stmt = self._apply_common_filters(
-                stmt, workflow_type=workflow_type, brain_types=brain_types, start_date=start_date, end_date=end_date
+        if self.rollups.is_ready():
+            results = self.rollups.get_counts(
+                ["status"],
+                workflow_type=workflow_type,
+                brain_types=brain_types,
+                start_date=start_date,
+                end_date=end_date,
             )
-            stmt = stmt.group_by(WorkflowRun.status)
-            results = session.execute(stmt).all()
+        else:
+            with get_session(self.db_config) as session:
+                stmt = self._build_base_select(
+                    select_columns=[WorkflowRun.status, func.count(WorkflowRun.id).label("count")],
+                    join_clip_table=brain_types is not None,
+                )
+                stmt = self._apply_common_filters(
+                    stmt, workflow_type=workflow_type, brain_types=brain_types, start_date=start_date, end_date=end_date
+                )
+                stmt = stmt.group_by(WorkflowRun.status)
+                results = session.execute(stmt).all()
 
-            if not results:
-                return pd.DataFrame(columns=["message", "count"])
+        if not results:
+            return pd.DataFrame(columns=["message", "count"])
 
-            data = [
-                {"message": result.status.value if result.status else None, "count": result.count} for result in results
-            ]
-            return pd.DataFrame(data)
+        data = [{"message": enum_value(result.status) or None, "count": result.count} for result in results]
+        return pd.DataFrame(data)
 
     def get_specific_workflow_columns(self, workflow_type: WorkflowType) -> tuple[WorkflowRunSpecificColumns, ...]:
         """
@@ -159,7 +179,7 @@ class AnalyticsManager:
         )
         return WORKFLOW_SPECIFIC_COLUMNS_MAP[workflow_type]
 
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
     def get_error_distribution(
         self,
         workflow_type: WorkflowType,
@@ -168,61 +188,67 @@ class AnalyticsManager:
         end_date: str | None = None,
         top_n: int = 10,
     ) -> pd.DataFrame:
-        self._ensure_fresh_cache()
-        join_clip = brain_types is not None
-
-        with get_session(self.db_config) as session:
-            stmt = self._build_base_select(
-                select_columns=[WorkflowRun.message, func.count(WorkflowRun.id).label("count")],
-                join_clip_table=join_clip,
-            )
-            stmt = self._apply_common_filters(
-                stmt,
+        if self.rollups.is_ready():
+            results = self.rollups.get_counts(
+                ["message_hash"],
                 workflow_type=workflow_type,
                 brain_types=brain_types,
                 start_date=start_date,
                 end_date=end_date,
                 statuses=(Status.FAILED,),
+                with_message=True,
             )
-            stmt = stmt.where(WorkflowRun.message.isnot(None))
-            stmt = stmt.group_by(WorkflowRun.message).order_by(desc("count"))
-
-            results = session.execute(stmt).all()
-
-            if not results:
-                return pd.DataFrame(columns=["message", "count", "full_message"])
-
-            messages, full_messages, counts = [], [], []
-            other_count = 0
-            for i, result in enumerate(results):
-                if i < top_n:
-                    clean_message = result.message.replace("Error: ", "")
-                    full_messages.append(clean_message)
-                    truncated = (
-                        clean_message[:MAX_ERROR_MSG_LENGTH] + "..."
-                        if len(clean_message) > MAX_ERROR_MSG_LENGTH
-                        else clean_message
-                    )
-                    messages.append(truncated)
-                    counts.append(result.count)
-                else:
-                    other_count += result.count
+        else:
+            with get_session(self.db_config) as session:
+                stmt = self._build_base_select(
+                    select_columns=[WorkflowRun.message, func.count(WorkflowRun.id).label("count")],
+                    join_clip_table=brain_types is not None,
+                )
+                stmt = self._apply_common_filters(
+                    stmt,
+                    workflow_type=workflow_type,
+                    brain_types=brain_types,
+                    start_date=start_date,
+                    end_date=end_date,
+                    statuses=(Status.FAILED,),
+                )
+                stmt = stmt.where(WorkflowRun.message.isnot(None))
+                stmt = stmt.group_by(WorkflowRun.message).order_by(desc("count"))
+                results = session.execute(stmt).all()
+
+        if not results:
+            return pd.DataFrame(columns=["message", "count", "full_message"])
+
+        messages, full_messages, counts = [], [], []
+        other_count = 0
+        for i, result in enumerate(results):
+            if i < top_n:
+                clean_message = result.message.replace("Error: ", "")
+                full_messages.append(clean_message)
+                truncated = (
+                    clean_message[:MAX_ERROR_MSG_LENGTH] + "..."
+                    if len(clean_message) > MAX_ERROR_MSG_LENGTH
+                    else clean_message
+                )
+                messages.append(truncated)
+                counts.append(result.count)
+            else:
+                other_count += result.count
 
-            if other_count > 0:
-                messages.append("Other")
-                full_messages.append("Aggregated count of less frequent errors")
-                counts.append(other_count)
+        if other_count > 0:
+            messages.append("Other")
+            full_messages.append("Aggregated count of less frequent errors")
+            counts.append(other_count)
 
-            return pd.DataFrame({"message": messages, "count": counts, "full_message": full_messages})
+        return pd.DataFrame({"message": messages, "count": counts, "full_message": full_messages})
 
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
     def get_weekly_success_data(
         self,
         brain_types: tuple[BrainType, ...] | None = None,
         start_date: str | None = None,
         end_date: str | None = None,
     ) -> pd.DataFrame:
-        self._ensure_fresh_cache()
         if not end_date:
             end_dt = datetime.now(timezone.utc)
             end_date = end_dt.isoformat()
@@ -235,64 +261,74 @@ class AnalyticsManager:
         else:
             start_dt = pd.to_datetime(start_date, utc=True).to_pydatetime(warn=False)
 
-        with get_session(self.db_config) as session:
-            week_start_col = func.date_trunc("week", WorkflowRun.updated_at, type_=DateTime(timezone=True)).label(
-                "week_start"
-            )
-            join_clip = brain_types is not None
-
-            stmt = select(
-                week_start_col, WorkflowRun.workflow_type, WorkflowRun.status, func.count(WorkflowRun.id).label("count")
-            )
-            if join_clip:
-                stmt = stmt.join(Clip, WorkflowRun.clip_name == Clip.clip_name)
-
-            stmt = self._apply_common_filters(
-                stmt,
+        statuses = (Status.SUCCESS, Status.FAILED)
+        if self.rollups.is_ready():
+            results = self.rollups.get_counts(
+                ["day", "workflow_type", "status"],
                 brain_types=brain_types,
                 start_date=start_date,
                 end_date=end_date,
-                statuses=(Status.SUCCESS, Status.FAILED),
+                statuses=statuses,
             )
-            stmt = stmt.group_by(week_start_col, WorkflowRun.workflow_type, WorkflowRun.status)
-            stmt = stmt.order_by(week_start_col, WorkflowRun.workflow_type)
+            df = pd.DataFrame(results, columns=["day", "workflow", "status", "count"])
+            # weeks start on monday, as with date_trunc("week")
+            days = pd.to_datetime(df.pop("day"), utc=True)
+            df.insert(0, "week_start", days - pd.to_timedelta(days.dt.weekday, unit="D"))
+        else:
+            with get_session(self.db_config) as session:
+                week_start_col = func.date_trunc("week", WorkflowRun.updated_at, type_=DateTime(timezone=True)).label(
+                    "week_start"
+                )
+                stmt = select(
+                    week_start_col,
+                    WorkflowRun.workflow_type,
+                    WorkflowRun.status,
+                    func.count(WorkflowRun.id).label("count"),
+                )
+                if brain_types is not None:
+                    stmt = stmt.join(Clip, WorkflowRun.clip_name == Clip.clip_name)
 
-            results = session.execute(stmt).all()
+                stmt = self._apply_common_filters(
+                    stmt, brain_types=brain_types, start_date=start_date, end_date=end_date, statuses=statuses
+                )
+                stmt = stmt.group_by(week_start_col, WorkflowRun.workflow_type, WorkflowRun.status)
+                results = session.execute(stmt).all()
+            df = pd.DataFrame(results, columns=["week_start", "workflow", "status", "count"])
 
-            if not results:
-                return pd.DataFrame(columns=["week_start", "workflow", "success_count", "failed_count", "success_rate"])
+        if df.empty:
+            return pd.DataFrame(columns=["week_start", "workflow", "success_count", "failed_count", "success_rate"])
 
-            df = pd.DataFrame(results, columns=["week_start", "workflow", "status", "count"])
-            pivot_df = df.pivot_table(
-                index=["week_start", "workflow"], columns="status", values="count", fill_value=0
-            ).reset_index()
+        df["workflow"] = df["workflow"].apply(enum_value)
+        df["status"] = df["status"].apply(enum_value)
+        pivot_df = df.pivot_table(
+            index=["week_start", "workflow"], columns="status", values="count", aggfunc="sum", fill_value=0
+        ).reset_index()
 
-            if Status.SUCCESS not in pivot_df.columns:
-                pivot_df[Status.SUCCESS] = 0
-            if Status.FAILED not in pivot_df.columns:
-                pivot_df[Status.FAILED] = 0
+        for status in statuses:
+            if status.value not in pivot_df.columns:
+                pivot_df[status.value] = 0
 
-            pivot_df.rename(columns={Status.SUCCESS: "success_count", Status.FAILED: "failed_count"}, inplace=True)
+        pivot_df.rename(
+            columns={Status.SUCCESS.value: "success_count", Status.FAILED.value: "failed_count"}, inplace=True
+        )
 
-            total = pivot_df["success_count"] + pivot_df["failed_count"]
-            pivot_df["success_rate"] = (pivot_df["success_count"] / total * 100).fillna(0)
-            pivot_df["workflow"] = pivot_df["workflow"].apply(lambda x: x.value if isinstance(x, Enum) else x)
+        total = pivot_df["success_count"] + pivot_df["failed_count"]
+        pivot_df["success_rate"] = (pivot_df["success_count"] / total * 100).fillna(0)
+        pivot_df = pivot_df.sort_values(["week_start", "workflow"], ignore_index=True)
 
-            return pivot_df[["week_start", "workflow", "success_count", "failed_count", "success_rate"]]
+        return pivot_df[["week_start", "workflow", "success_count", "failed_count", "success_rate"]]
 
-    def _build_export_select(
+    def _apply_export_filters(
         self,
+        stmt: Any,  # select() statement
         workflow_type: WorkflowType,
         brain_types: Iterable[BrainType] | None = None,
         start_date: str | None = None,
         end_date: str | None = None,
         statuses: Iterable[Status] | None = None,
         allowed_values_per_column: dict[str, Iterable[str]] | None = None,
-        limit: int = 1000,
     ) -> Any:
-        """Builds the select statement for exporting workflow data."""
-        stmt = select(Clip, WorkflowRun).join(WorkflowRun, Clip.clip_name == WorkflowRun.clip_name)
-
+        """Applies the export filters on a select statement of WorkflowRun joined with Clip."""
         stmt = self._apply_common_filters(
             stmt,
             workflow_type=workflow_type,
@@ -311,28 +347,91 @@ class AnalyticsManager:
                     stmt = stmt.where(column_attr.in_(values))
                 else:
                     raise ValueError(f"Invalid column name for filtering: {column}")
-
-        stmt = stmt.order_by(desc(WorkflowRun.updated_at)).limit(limit)
         return stmt
 
-    def _process_export_row(self, clip: Clip, workflow_run: WorkflowRun, workflow_type: WorkflowType) -> dict[str, Any]:
-        """Processes a (Clip, Workflow) row for export."""
-        workflow_specific_columns = self.get_specific_workflow_columns(workflow_type)
-        row = {
-            WorkflowRunFields.clip_name: clip.clip_name,
-            WorkflowRunFields.brain_type: clip.brain_type.value if clip.brain_type else None,
-            WorkflowRunFields.status: workflow_run.status.value if workflow_run.status else None,
-            WorkflowRunFields.message: workflow_run.message,
-            WorkflowRunFields.updated_at: workflow_run.updated_at.isoformat() if workflow_run.updated_at else None,
-            WorkflowRunFields.created_at: workflow_run.created_at.isoformat() if workflow_run.created_at else None,
-            **{col: getattr(workflow_run, col, None) for col in workflow_specific_columns},
+    def _get_metadata_keys(self, session: Any, workflow_type: WorkflowType, **filters: Any) -> list[str]:
+        """Gets the keys of the workflow metadata of the exported runs, each key is exported as a meta_ column."""
+        metadata = cast(WorkflowRun.workflow_metadata, JSONB)
+        stmt = select(distinct(func.jsonb_object_keys(metadata))).join(Clip, WorkflowRun.clip_name == Clip.clip_name)
+        stmt = self._apply_export_filters(stmt, workflow_type, **filters)
+        stmt = stmt.where(func.jsonb_typeof(metadata) == "object")
+        return sorted(session.scalars(stmt).all())
+
+    def _build_export_runs_subquery(
+        self,
+        workflow_type: WorkflowType,
+        metadata_keys: list[str],
+        limit: int | None = None,
+        **filters: Any,
+    ) -> Any:
+        """Builds the subquery of the exported runs of a workflow type, the latest runs first."""
+        metadata = cast(WorkflowRun.workflow_metadata, JSONB)
+        columns = [
+            WorkflowRun.clip_name.label(enum_value(WorkflowRunFields.clip_name)),
+            WorkflowRun.status.label(enum_value(WorkflowRunFields.status)),
+            WorkflowRun.message.label(enum_value(WorkflowRunFields.message)),
+            WorkflowRun.updated_at.label(enum_value(WorkflowRunFields.updated_at)),
+            WorkflowRun.created_at.label(enum_value(WorkflowRunFields.created_at)),
+            *[
+                getattr(WorkflowRun, col).label(enum_value(col))
+                for col in self.get_specific_workflow_columns(workflow_type)
+            ],
+            *[metadata[key].astext.label(f"meta_{key}") for key in metadata_keys],
+        ]
+        stmt = select(*columns).join(Clip, WorkflowRun.clip_name == Clip.clip_name)
+        stmt = self._apply_export_filters(stmt, workflow_type, **filters)
+        stmt = stmt.order_by(desc(WorkflowRun.updated_at))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt.subquery(f"{enum_value(workflow_type)}_runs")
+
+    def _build_export_select(self, session: Any, workflows: tuple[str, ...], limit: int | None, **filters: Any) -> Any:
+        """Builds the export statement: the runs of each workflow type joined by clip in SQL.
+
+        With several workflow types the clips of any of them are exported (an outer join on the clip),
+        and the columns of each workflow type are prefixed by it.
+        """
+        clip_name = enum_value(WorkflowRunFields.clip_name)
+        updated_at = enum_value(WorkflowRunFields.updated_at)
+        subqueries = {
+            workflow_type: self._build_export_runs_subquery(
+                workflow_type, self._get_metadata_keys(session, workflow_type, **filters), limit, **filters
+            )
+            for workflow_type in workflows
         }
-        if isinstance(workflow_run.workflow_metadata, dict):
-            meta_flat = {f"meta_{k}": v for k, v in workflow_run.workflow_metadata.items()}
-            row.update(meta_flat)
-        return row
 
-    def get_workflow_export_data(
+        columns = [
+            Clip.clip_name.label(clip_name),
+            Clip.brain_type.label(enum_value(WorkflowRunFields.brain_type)),
+        ]
+        for workflow_type, subquery in subqueries.items():
+            for column in subquery.c:
+                if column.name == clip_name:
+                    continue
+                name = f"{enum_value(workflow_type)}_{column.name}" if len(workflows) > 1 else column.name
+                columns.append(column.label(name))
+
+        stmt = select(*columns).select_from(Clip)
+        for subquery in subqueries.values():
+            stmt = stmt.outerjoin(subquery, subquery.c[clip_name] == Clip.clip_name)
+        stmt = stmt.where(or_(*[subquery.c[clip_name].isnot(None) for subquery in subqueries.values()]))
+        first_subquery = next(iter(subqueries.values()))
+        return stmt.order_by(first_subquery.c[updated_at].desc().nulls_last())
+
+    @staticmethod
+    def _build_export_chunk(rows: list[Any], columns: list[str]) -> pd.DataFrame:
+        """Builds a DataFrame of exported rows column-wise, with enum values and ISO formatted timestamps."""
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        timestamp_columns = (enum_value(WorkflowRunFields.updated_at), enum_value(WorkflowRunFields.created_at))
+        enum_columns = (enum_value(WorkflowRunFields.brain_type), enum_value(WorkflowRunFields.status))
+        for column in columns:
+            if column.endswith(timestamp_columns):
+                df[column] = df[column].map(lambda value: value.isoformat() if isinstance(value, datetime) else value)
+            elif column.endswith(enum_columns):
+                df[column] = df[column].map(enum_value)
+        return df
+
+    def iter_workflow_export_chunks(
         self,
         workflows: tuple[str, ...],
         brain_types: tuple[BrainType, ...] | None = None,
@@ -340,81 +439,104 @@ class AnalyticsManager:
         end_date: str | None = None,
         statuses: tuple[Status, ...] | None = None,
         allowed_values_per_column: dict[str, tuple[str, ...]] | None = None,
-        limit: int = 1000,
-    ) -> pd.DataFrame:
-        if not workflows:
-            return pd.DataFrame()
+        limit: int | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Streams the export data in DataFrames of up to chunk_size rows, read with a server side cursor,
+        so the memory of an export is bounded by the chunk size rather than the number of runs.
 
-        result_dfs = []
-        with get_session(self.db_config) as session:
-            for workflow_type in workflows:
-                stmt = self._build_export_select(
-                    workflow_type, brain_types, start_date, end_date, statuses, allowed_values_per_column, limit
-                )
-                results = session.execute(stmt).all()
-                if not results:
-                    continue
+        Args:
+            workflows: The workflow types to export.
+            brain_types: The brain types to filter by.
+            start_date: The start date to filter by.
+            end_date: The end date to filter by.
+            statuses: The statuses to filter by.
+            allowed_values_per_column: Values to filter by per WorkflowRun column.
+            limit: Maximal number of (latest) runs exported per workflow type, None for all of them.
+            chunk_size: Number of rows per chunk.
 
-                data = [self._process_export_row(clip, wf, workflow_type) for clip, wf in results]
-                df = pd.DataFrame(data)
+        Yields:
+            DataFrames with the same columns.
+        """
+        if not workflows:
+            return
 
-                if len(workflows) > 1:
-                    df = self._add_workflow_prefix(workflow_type, df)
-                result_dfs.append(df)
+        filters = dict(
+            brain_types=brain_types,
+            start_date=start_date,
+            end_date=end_date,
+            statuses=statuses,
+            allowed_values_per_column=allowed_values_per_column,
+        )
+        with get_session(self.db_config) as session:
+            stmt = self._build_export_select(session, workflows, limit, **filters)
+            result = session.execute(stmt.execution_options(yield_per=chunk_size))
+            columns = list(result.keys())
+            for rows in result.partitions():
+                yield self._build_export_chunk(rows, columns)
 
-        if not result_dfs:
+    def get_workflow_export_data(
+        self,
+        workflows: tuple[str, ...],
+        brain_types: tuple[BrainType, ...] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        statuses: tuple[Status, ...] | None = None,
+        allowed_values_per_column: dict[str, tuple[str, ...]] | None = None,
+        limit: int = 1000,
+    ) -> pd.DataFrame:
+        chunks = list(
+            self.iter_workflow_export_chunks(
+                workflows, brain_types, start_date, end_date, statuses, allowed_values_per_column, limit
+            )
+        )
+        if not chunks:
             return pd.DataFrame()
-        if len(result_dfs) == 1:
-            return result_dfs[0]
-
-        merged_df = result_dfs[0]
-        merge_keys = [WorkflowRunFields.clip_name, WorkflowRunFields.brain_type]
-
-        for df_to_merge in result_dfs[1:]:
-            current_merge_keys = [k for k in merge_keys if k in df_to_merge.columns]
-            merged_df = pd.merge(merged_df, df_to_merge, on=current_merge_keys, how="outer")
+        return pd.concat(chunks, ignore_index=True)
 
-        return merged_df
-
-    def _add_workflow_prefix(self, workflow: str, df: pd.DataFrame) -> pd.DataFrame:
-        """Adds workflow prefix to columns, except common keys."""
-        no_prefix_columns = [WorkflowRunFields.clip_name, WorkflowRunFields.brain_type]
-        rename_dict = {col: f"{workflow}_{col}" for col in df.columns if col not in no_prefix_columns}
-        return df.rename(columns=rename_dict)
-
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
     def get_workflow_success_count_data(
         self,
         brain_types: tuple[BrainType, ...] | None = None,
         start_date: str | None = None,
         end_date: str | None = None,
     ) -> pd.DataFrame:
-        self._ensure_fresh_cache()
-        with get_session(self.db_config) as session:
-            stmt = select(
-                WorkflowRun.workflow_type, Clip.brain_type, func.count(WorkflowRun.id).label("success_count")
-            ).join(Clip, WorkflowRun.clip_name == Clip.clip_name)
-
-            stmt = self._apply_common_filters(
-                stmt, brain_types=brain_types, start_date=start_date, end_date=end_date, statuses=(Status.SUCCESS,)
+        if self.rollups.is_ready():
+            results = self.rollups.get_counts(
+                ["workflow_type", "brain_type"],
+                brain_types=brain_types,
+                start_date=start_date,
+                end_date=end_date,
+                statuses=(Status.SUCCESS,),
+                with_brain_type=True,
             )
-            stmt = stmt.group_by(WorkflowRun.workflow_type, Clip.brain_type)
-            results = session.execute(stmt).all()
-
-            if not results:
-                return pd.DataFrame(columns=["workflow", "brain_type", "success_count"])
-
-            data = [
-                {
-                    "workflow": result.workflow_type.value if result.workflow_type else None,
-                    "brain_type": result.brain_type.value if result.brain_type else None,
-                    "success_count": result.success_count,
-                }
-                for result in results
-            ]
-            return pd.DataFrame(data)
-
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
+        else:
+            with get_session(self.db_config) as session:
+                stmt = select(
+                    WorkflowRun.workflow_type, Clip.brain_type, func.count(WorkflowRun.id).label("count")
+                ).join(Clip, WorkflowRun.clip_name == Clip.clip_name)
+
+                stmt = self._apply_common_filters(
+                    stmt, brain_types=brain_types, start_date=start_date, end_date=end_date, statuses=(Status.SUCCESS,)
+                )
+                stmt = stmt.group_by(WorkflowRun.workflow_type, Clip.brain_type)
+                results = session.execute(stmt).all()
+
+        if not results:
+            return pd.DataFrame(columns=["workflow", "brain_type", "success_count"])
+
+        data = [
+            {
+                "workflow": enum_value(result.workflow_type) or None,
+                "brain_type": enum_value(result.brain_type) or None,
+                "success_count": result.count,
+            }
+            for result in results
+        ]
+        return pd.DataFrame(data)
+
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
     def get_unique_status_values(
         self,
         workflow_type: WorkflowType,
@@ -422,7 +544,6 @@ class AnalyticsManager:
         start_date: str | None = None,
         end_date: str | None = None,
     ) -> list[Status]:
-        self._ensure_fresh_cache()
         join_clip = brain_types is not None
 
         with get_session(self.db_config) as session:
@@ -437,7 +558,6 @@ class AnalyticsManager:
             results = session.scalars(stmt).all()
             return results
 
-    @hashable_lru_cache(maxsize=MAX_CACHE_SIZE)
     def get_unique_column_values(
         self,
         workflow_type: WorkflowType,
@@ -458,22 +578,86 @@ class AnalyticsManager:
             start_date: The start date to filter by.
             end_date: The end date to filter by.
             statuses: The statuses to filter by.
-            filter_column_values: A dictionary of column names and values to filter by.
+            filter_column_values: A dictionary of column names and values to filter by,
+                values of column_name itself are not filtered by.
 
         Returns:
             A list of unique values for the specified column.
         """
-        self._ensure_fresh_cache()
+        # cached by get_unique_values_per_column
+        return self.get_unique_values_per_column(
+            workflow_type,
+            (column_name,),
+            brain_types=brain_types,
+            start_date=start_date,
+            end_date=end_date,
+            statuses=statuses,
+            filter_column_values=filter_column_values,
+        )[column_name]
 
-        target_column_attr = getattr(WorkflowRun, column_name, None)
-        if target_column_attr is None:
-            raise ValueError(f"Invalid column name specified: {column_name}")
+    @swr_cache(ttl_seconds=EXPIRATION_TIME.total_seconds(), maxsize=MAX_CACHE_SIZE)
+    def get_unique_values_per_column(
+        self,
+        workflow_type: WorkflowType,
+        column_names: tuple[str, ...],
+        brain_types: tuple[BrainType, ...] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        statuses: tuple[Status, ...] | None = None,
+        filter_column_values: dict[str, Iterable[str]] | None = None,
+    ) -> dict[str, list[Any]]:
+        """
+        Get the unique values of several WorkflowRun columns (facets) in a single UNION ALL query.
 
-        with get_session(self.db_config) as session:
-            stmt = select(distinct(target_column_attr))
-            if brain_types is not None:
-                stmt = stmt.join(Clip, WorkflowRun.clip_name == Clip.clip_name)
+        Each column is filtered by the selected values of the other columns but not by its own
+        (facet exclusion), so a selector keeps offering the values that can be added to its selection.
 
+        Args:
+            workflow_type: The type of workflow to filter by.
+            column_names: The names of the columns to get unique values for.
+            brain_types: The brain types to filter by.
+            start_date: The start date to filter by.
+            end_date: The end date to filter by.
+            statuses: The statuses to filter by.
+            filter_column_values: A dictionary of column names and values to filter by.
+
+        Returns:
+            The unique values of each of the columns.
+        """
+        if not column_names:
+            return {}
+
+        target_columns = {}
+        for column_name in column_names:
+            target_columns[column_name] = getattr(WorkflowRun, column_name, None)
+            if target_columns[column_name] is None:
+                raise ValueError(f"Invalid column name specified: {column_name}")
+
+        filter_conditions = {}
+        join_clip = brain_types is not None
+        for col, values in (filter_column_values or {}).items():
+            if not values:
+                continue
+            col_attr = getattr(WorkflowRun, col, None)
+            if col_attr is None:
+                col_attr = getattr(Clip, col, None)
+                join_clip = True
+            if col_attr is None:
+                raise ValueError(f"Invalid column name in filter_column_values: {col}")
+            filter_conditions[col] = col_attr.in_(values)
+
+        # every branch selects all the target columns (NULL but for its own) so the union keeps their types
+        facet_selects = []
+        for column_name, target_column_attr in target_columns.items():
+            stmt = select(
+                literal(column_name).label("facet"),
+                *[
+                    (attr if name == column_name else null().cast(attr.type)).label(name)
+                    for name, attr in target_columns.items()
+                ],
+            ).select_from(WorkflowRun)
+            if join_clip:
+                stmt = stmt.join(Clip, WorkflowRun.clip_name == Clip.clip_name)
             stmt = self._apply_common_filters(
                 stmt,
                 workflow_type=workflow_type,
@@ -482,22 +666,14 @@ class AnalyticsManager:
                 end_date=end_date,
                 statuses=statuses,
             )
+            other_conditions = [condition for col, condition in filter_conditions.items() if col != column_name]
+            stmt = stmt.where(target_column_attr.isnot(None), *other_conditions).group_by(target_column_attr)
+            facet_selects.append(stmt)
 
-            if filter_column_values:
-                for col, values in filter_column_values.items():
-                    if not values:
-                        continue
-                    col_attr = getattr(WorkflowRun, col, None)
-                    if col_attr is None:
-                        col_attr = getattr(Clip, col, None)
-
-                    if col_attr is not None:
-                        stmt = stmt.where(col_attr.in_(values))
-                    else:
-                        raise ValueError(f"Invalid column name in filter_column_values: {col}")
+        with get_session(self.db_config) as session:
+            results = session.execute(union_all(*facet_selects)).all()
 
-            stmt = stmt.where(target_column_attr.isnot(None))
-            results = session.scalars(stmt).all()
-            if isinstance(target_column_attr.type, Enum):
-                return [r.value for r in results]
-            return results
+        unique_values = {column_name: [] for column_name in column_names}
+        for result in results:
+            unique_values[result.facet].append(enum_value(getattr(result, result.facet)))
+        return unique_values
@@ -5,6 +5,9 @@ import dash
 import dash_bootstrap_components as dbc
 from dash import Dash, dcc, html
 
+from road_dashboards.common.perf_monitor import perf_monitor
+from road_dashboards.workflows_dashboard.components.selectors.export.export_files import export_files_blueprint
+
 debug = False if os.environ.get("DEBUG") == "false" else True
 if not debug:
     sys.stdout = open(os.devnull, "w")
@@ -16,6 +19,8 @@ app = Dash(
     external_stylesheets=[dbc.themes.BOOTSTRAP],
     suppress_callback_exceptions=True,
 )
+app.server.register_blueprint(export_files_blueprint)
+perf_monitor.init_app(app, instrument_sqlalchemy=True)
 
 app.layout = html.Div(
     [dcc.Location(id="url"), dbc.Container(dash.page_container, fluid=True, className="px-4 vh-100")],
@@ -33,7 +33,8 @@ class ExportComponentsIds:
     EXPORT_COLUMNS_SELECTOR = "export-columns-selector"
     EXPORT_COLUMN_VALUES_CONTAINER = "export-column-values-container"
     EXPORT_COLUMN_VALUES_SELECTOR = "export-column-values-selector"
-    DOWNLOAD_DATAFRAME = "download-dataframe-csv"
+    EXPORT_FORMAT_SELECTOR = "export-format-selector"
+    EXPORT_FILE_URL = "export-file-url"
     ADDITIONAL_COLUMNS_CONTAINER = "additional-columns-container"
 
 
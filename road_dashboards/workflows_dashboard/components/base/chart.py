@@ -6,6 +6,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from dash import Input, Output, callback, dcc, html
 
+from road_dashboards.common.perf_monitor import FIGURE_STAGE, measure_stage
 from road_dashboards.workflows_dashboard.common.consts import ComponentIds
 from road_dashboards.workflows_dashboard.components.layout_wrapper import card_wrapper
 
@@ -69,10 +70,11 @@ class Chart(ABC):
                 selected_workflow=selected_workflow,
             )
 
-            if data.empty:
-                return self.create_empty_chart()
+            with measure_stage(FIGURE_STAGE):
+                if data.empty:
+                    return self.create_empty_chart()
 
-            return self.create_chart(data=data)
+                return self.create_chart(data=data)
 
     @abstractmethod
     def get_chart_data(
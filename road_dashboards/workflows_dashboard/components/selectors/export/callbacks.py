@@ -1,11 +1,17 @@
 from datetime import datetime
 
-from dash import Input, Output, State, callback, callback_context, dcc, html
+from dash import Input, Output, State, callback, callback_context, clientside_callback, dcc, html
 from dash.dependencies import ALL
+from loguru import logger
 from road_database_toolkit.databases.workflows.workflow_enums import WorkflowRunSpecificColumns, WorkflowType
 
 from road_dashboards.workflows_dashboard.common.analytics import analytics_manager
 from road_dashboards.workflows_dashboard.common.consts import VALUE_SELECTOR_STYLE, ComponentIds, ExportComponentsIds
+from road_dashboards.workflows_dashboard.components.selectors.export.export_files import (
+    CSV_FORMAT,
+    get_export_file_url,
+    write_export_file,
+)
 
 
 @callback(
@@ -56,13 +62,66 @@ def create_value_selector(
 
 
 @callback(
+    Output(ExportComponentsIds.EXPORT_STATUS_SELECTOR, "options"),
     [
-        Output(ExportComponentsIds.EXPORT_COLUMN_VALUES_CONTAINER, "children"),
-        Output(ExportComponentsIds.EXPORT_STATUS_SELECTOR, "options"),
+        Input(ExportComponentsIds.EXPORT_WORKFLOW_SELECTOR, "value"),
+        Input(ComponentIds.BRAIN_SELECTOR, "value"),
+        Input(ComponentIds.DATE_RANGE_PICKER, "start_date"),
+        Input(ComponentIds.DATE_RANGE_PICKER, "end_date"),
     ],
+)
+def update_status_selector_options(
+    selected_workflows: list[str] | None,
+    brain_types: list[str] | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> list[dict]:
+    """Update status options based on the selected workflow."""
+    if not selected_workflows or len(selected_workflows) != 1:
+        return []
+
+    unique_statuses_enums = analytics_manager.get_unique_status_values(
+        workflow_type=WorkflowType(selected_workflows[0]),
+        brain_types=brain_types,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    return [{"label": status.value, "value": status.value} for status in unique_statuses_enums]
+
+
+@callback(
+    Output(ExportComponentsIds.EXPORT_COLUMN_VALUES_CONTAINER, "children"),
     [
         Input(ExportComponentsIds.EXPORT_WORKFLOW_SELECTOR, "value"),
         Input(ExportComponentsIds.EXPORT_COLUMNS_SELECTOR, "value"),
+    ],
+    [
+        State({"type": "column-values", "column": ALL}, "value"),
+        State({"type": "column-values", "column": ALL}, "id"),
+    ],
+)
+def update_workflow_specific_column_values_selectors(
+    selected_workflows: list[str] | None,
+    selected_columns: list[str] | None,
+    column_values: list[list[str] | None],
+    column_ids: list[dict],
+) -> html.Div | list:
+    """Create a value selector per selected column, keeping the selected values of existing selectors.
+
+    The options of the selectors are filled by update_column_values_options.
+    """
+    if not selected_workflows or len(selected_workflows) != 1 or not selected_columns:
+        return []
+
+    allowed_values = _build_allowed_values_per_column(selected_columns, column_values, column_ids)
+    value_selectors = [create_value_selector(col, [], allowed_values.get(col)) for col in selected_columns]
+    return html.Div(value_selectors, style=VALUE_SELECTOR_STYLE)
+
+
+@callback(
+    Output({"type": "column-values", "column": ALL}, "options"),
+    [
+        Input(ExportComponentsIds.EXPORT_WORKFLOW_SELECTOR, "value"),
         Input(ComponentIds.BRAIN_SELECTOR, "value"),
         Input(ComponentIds.DATE_RANGE_PICKER, "start_date"),
         Input(ComponentIds.DATE_RANGE_PICKER, "end_date"),
@@ -71,56 +130,36 @@ def create_value_selector(
     ],
     State({"type": "column-values", "column": ALL}, "id"),
 )
-def update_workflow_specific_column_values_selectors(
+def update_column_values_options(
     selected_workflows: list[str] | None,
-    selected_columns: list[str] | None,
     brain_types: list[str] | None,
     start_date: str | None,
     end_date: str | None,
     selected_statuses: list[str] | None,
     column_values: list[list[str] | None],
     column_ids: list[dict],
-) -> tuple[html.Div | list[dict], list[dict]]:
-    """Update value selectors for columns and status options based on current selections."""
-    if not selected_workflows or len(selected_workflows) != 1:
-        return [], []
+) -> list[list[dict]]:
+    """Update the options of all the value selectors with one faceted distinct values query.
 
-    workflow_enum = WorkflowType(selected_workflows[0])
+    Each column is cross-filtered by the values selected in the other columns.
+    """
+    if not column_ids:
+        return []
+    if not selected_workflows or len(selected_workflows) != 1:
+        return [[] for _ in column_ids]
 
-    unique_statuses_enums = analytics_manager.get_unique_status_values(
-        workflow_type=workflow_enum, brain_types=brain_types, start_date=start_date, end_date=end_date
+    columns = [col_id["column"] for col_id in column_ids]
+    allowed_values = _build_allowed_values_per_column(columns, column_values, column_ids)
+    unique_values_per_column = analytics_manager.get_unique_values_per_column(
+        workflow_type=WorkflowType(selected_workflows[0]),
+        column_names=tuple(columns),
+        brain_types=brain_types,
+        start_date=start_date,
+        end_date=end_date,
+        statuses=selected_statuses,
+        filter_column_values=allowed_values,
     )
-    status_options = [{"label": status.value, "value": status.value} for status in unique_statuses_enums]
-
-    if not selected_columns:
-        return [], status_options
-
-    allowed_values = _build_allowed_values_per_column(selected_columns, column_values, column_ids)
-
-    value_selectors = []
-    for col in selected_columns:  # Iterate original list
-        current_filters = allowed_values.copy() if allowed_values else {}
-        if col in current_filters:
-            del current_filters[col]
-
-        unique_values = analytics_manager.get_unique_column_values(
-            workflow_type=workflow_enum,
-            column_name=col,
-            brain_types=brain_types,
-            start_date=start_date,
-            end_date=end_date,
-            statuses=selected_statuses,
-            filter_column_values=current_filters,
-        )
-
-        if unique_values:
-            current_col_value = allowed_values.get(col)
-            value_selectors.append(create_value_selector(col, unique_values, current_col_value))
-
-    if not value_selectors:
-        return [], status_options
-
-    return html.Div(value_selectors, style=VALUE_SELECTOR_STYLE), status_options
+    return [[{"label": val, "value": val} for val in unique_values_per_column.get(col, [])] for col in columns]
 
 
 def _build_allowed_values_per_column(
@@ -137,9 +176,10 @@ def _build_allowed_values_per_column(
 
 
 @callback(
-    Output(ExportComponentsIds.DOWNLOAD_DATAFRAME, "data"),
+    Output(ExportComponentsIds.EXPORT_FILE_URL, "data"),
     Input(ExportComponentsIds.EXPORT_BUTTON, "n_clicks"),
     [
+        State(ExportComponentsIds.EXPORT_FORMAT_SELECTOR, "value"),
         State(ComponentIds.BRAIN_SELECTOR, "value"),
         State(ComponentIds.DATE_RANGE_PICKER, "start_date"),
         State(ComponentIds.DATE_RANGE_PICKER, "end_date"),
@@ -153,6 +193,7 @@ def _build_allowed_values_per_column(
 )
 def export_data(
     n_clicks: int,
+    file_format: str | None,
     brain_types: list[str] | None,
     start_date: str | None,
     end_date: str | None,
@@ -162,7 +203,7 @@ def export_data(
     column_values: list[list[str] | None],
     column_ids: list[dict],
 ) -> dict | None:
-    """Export filtered workflow data to CSV."""
+    """Export filtered workflow data to a CSV / Parquet file, streamed from the database, and return its URL."""
     if not n_clicks or not selected_workflows:
         return None
 
@@ -172,21 +213,42 @@ def export_data(
     final_statuses = selected_statuses if is_single_workflow else None
     final_allowed_values = allowed_values_list_dict if is_single_workflow else None
 
-    df = analytics_manager.get_workflow_export_data(
+    file_format = file_format or CSV_FORMAT
+    chunks = analytics_manager.iter_workflow_export_chunks(
         workflows=selected_workflows,
         brain_types=brain_types,
         start_date=start_date,
         end_date=end_date,
         statuses=final_statuses,
         allowed_values_per_column=final_allowed_values,
-        limit=100000,
     )
+    try:
+        file_name, _ = write_export_file(chunks, file_format)
+    except PermissionError as e:
+        logger.error(f"Failed to export the workflows data: {e}")
+        return None
 
-    if df.empty:
+    if file_name is None:
         return None
 
-    filename = f"{'_'.join(selected_workflows)}_data_{datetime.now().strftime('%d-%m-%Y')}.csv"
-    return dcc.send_data_frame(df.to_csv, filename, index=False)
+    download_name = f"{'_'.join(selected_workflows)}_data_{datetime.now().strftime('%d-%m-%Y')}.{file_format}"
+    return get_export_file_url(file_name, download_name)
+
+
+clientside_callback(
+    """
+    function(url) {
+        if (!url) {
+            return window.dash_clientside.no_update;
+        }
+        window.location.assign(url);
+        return true;
+    }
+    """,
+    Output(ExportComponentsIds.EXPORT_FILE_URL, "clear_data"),
+    Input(ExportComponentsIds.EXPORT_FILE_URL, "data"),
+    prevent_initial_call=True,
+)
 
 
 @callback(
@@ -0,0 +1,128 @@
+import os
+import re
+import tempfile
+import time
+import uuid
+from typing import Iterable
+
+import flask
+import pandas as pd
+from loguru import logger
+
+from road_dashboards.common.private_dir import make_private_dir
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_FILES_DIR = os.environ.get(
+    "WORKFLOWS_EXPORT_FILES_DIR", os.path.join(tempfile.gettempdir(), "workflows_dashboard_exports")
+)
+EXPORT_FILES_MAX_AGE_SECONDS = float(os.environ.get("WORKFLOWS_EXPORT_FILES_MAX_AGE_HOURS", 6)) * 60 * 60
+EXPORT_FILES_ROUTE = "/export-files"
+CSV_FORMAT = "csv"
+PARQUET_FORMAT = "parquet"
+EXPORT_FORMATS = [CSV_FORMAT, PARQUET_FORMAT] if pq is not None else [CSV_FORMAT]
+
+_EXPORT_FILE_NAME = re.compile(r"[0-9a-f]{32}\.(csv|parquet)")
+
+export_files_blueprint = flask.Blueprint("workflows_export_files", __name__)
+
+
+def write_export_file(chunks: Iterable[pd.DataFrame], file_format: str = CSV_FORMAT) -> tuple[str | None, int]:
+    """Streams export chunks to a new file in EXPORT_FILES_DIR, one chunk in memory at a time.
+
+    Args:
+        chunks: DataFrames with the same columns.
+        file_format: CSV_FORMAT, or PARQUET_FORMAT when pyarrow is installed (all columns are written as strings,
+            since a column can be empty in the first chunks).
+
+    Returns:
+        The name of the file (None if there were no rows) and the number of rows written.
+
+    Raises:
+        PermissionError: EXPORT_FILES_DIR is not private to the current user (see make_private_dir), other users
+            could read the exported data or replace the files before they are served.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    if not make_private_dir(EXPORT_FILES_DIR):
+        raise PermissionError(f"{EXPORT_FILES_DIR} is not a private directory, not writing export files to it")
+
+    remove_expired_export_files()
+    file_name = f"{uuid.uuid4().hex}.{file_format}"
+    path = os.path.join(EXPORT_FILES_DIR, file_name)
+    num_rows = 0
+    try:
+        if file_format == PARQUET_FORMAT:
+            num_rows = _write_parquet(chunks, path)
+        else:
+            num_rows = _write_csv(chunks, path)
+    except Exception:
+        _remove_file(path)
+        raise
+
+    if not num_rows:
+        _remove_file(path)
+        return None, 0
+    return file_name, num_rows
+
+
+def _write_csv(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    num_rows = 0
+    with open(path, "w", newline="") as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=num_rows == 0, index=False)
+            num_rows += len(chunk)
+    return num_rows
+
+
+def _write_parquet(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    num_rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk.astype("string"), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            num_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return num_rows
+
+
+def get_export_file_url(file_name: str, download_name: str) -> str:
+    return f"{EXPORT_FILES_ROUTE}/{file_name}?name={download_name}"
+
+
+def remove_expired_export_files() -> None:
+    if not os.path.isdir(EXPORT_FILES_DIR):
+        return
+    now = time.time()
+    for file_name in os.listdir(EXPORT_FILES_DIR):
+        path = os.path.join(EXPORT_FILES_DIR, file_name)
+        try:
+            if now - os.path.getmtime(path) > EXPORT_FILES_MAX_AGE_SECONDS:
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove expired export file {path}: {e}")
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@export_files_blueprint.route(f"{EXPORT_FILES_ROUTE}/<file_name>")
+def download_export_file(file_name: str) -> flask.Response:
+    """Serves an export file as an attachment, read from disk in blocks."""
+    if not _EXPORT_FILE_NAME.fullmatch(file_name) or not make_private_dir(EXPORT_FILES_DIR):
+        flask.abort(404)
+    download_name = flask.request.args.get("name") or file_name
+    return flask.send_from_directory(EXPORT_FILES_DIR, file_name, as_attachment=True, download_name=download_name)
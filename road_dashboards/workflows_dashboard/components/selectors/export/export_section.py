@@ -4,6 +4,7 @@ from road_database_toolkit.databases.workflows.workflow_enums import Status, Wor
 
 from road_dashboards.workflows_dashboard.common.consts import ExportComponentsIds
 from road_dashboards.workflows_dashboard.common.utils import format_workflow_type
+from road_dashboards.workflows_dashboard.components.selectors.export.export_files import CSV_FORMAT, EXPORT_FORMATS
 
 from . import callbacks  # noqa: F401
 
@@ -94,7 +95,16 @@ class ExportButton:
                             size="lg",
                             style={"width": "10rem", "margin": "0 auto", "display": "inline-block"},
                         ),
-                        dcc.Download(id=ExportComponentsIds.DOWNLOAD_DATAFRAME),
+                        dbc.RadioItems(
+                            id=ExportComponentsIds.EXPORT_FORMAT_SELECTOR,
+                            options=[
+                                {"label": file_format.upper(), "value": file_format} for file_format in EXPORT_FORMATS
+                            ],
+                            value=CSV_FORMAT,
+                            inline=True,
+                            className="mb-2",
+                        ),
+                        dcc.Store(id=ExportComponentsIds.EXPORT_FILE_URL),
                         dbc.Modal(
                             [
                                 dbc.ModalHeader(dbc.ModalTitle("Export Data Preview")),
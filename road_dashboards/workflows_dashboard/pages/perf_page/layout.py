@@ -0,0 +1,8 @@
+from dash import register_page
+
+from road_dashboards.common.perf_monitor import PERF_PAGE_PATH
+from road_dashboards.common.perf_page import perf_layout
+
+register_page(__name__, path=PERF_PAGE_PATH, name="Performance", order=100)
+
+layout = perf_layout()
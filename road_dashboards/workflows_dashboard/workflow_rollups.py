@@ -0,0 +1,305 @@
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from threading import Lock
+from typing import Any, Iterable
+
+import pandas as pd
+from loguru import logger
+from road_database_toolkit.databases.workflows.models import Clip, WorkflowRun
+from road_database_toolkit.databases.workflows.workflow_enums import BrainType, Status, WorkflowType
+from road_database_toolkit.postgresql.config import PostgresConfig
+from road_database_toolkit.postgresql.db_manager import get_session
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, Text, create_engine, desc, func, select, update
+from sqlalchemy.engine import Engine
+
+ROLLUPS_ENABLED = os.environ.get("WORKFLOWS_ROLLUPS_ENABLED", "true").lower() != "false"
+ROLLUPS_DB_URL = os.environ.get(
+    "WORKFLOWS_ROLLUPS_DB_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'workflows_dashboard_rollups.db')}"
+)
+REFRESH_BATCH_SIZE = 5000
+# runs committed after the watermark passed their updated_at are read by the next refresh within the lookback
+ROLLUPS_LOOKBACK = timedelta(minutes=float(os.environ.get("WORKFLOWS_ROLLUPS_LOOKBACK_MINUTES", 10)))
+WATERMARK_NAME = "workflow_runs_updated_at"
+# rollup key columns can't be NULL, missing brain types and messages are stored as empty strings
+MISSING_VALUE = ""
+
+rollups_metadata = MetaData()
+
+daily_rollups_table = Table(
+    "workflow_daily_rollups",
+    rollups_metadata,
+    Column("day", Date, primary_key=True),
+    Column("workflow_type", String(64), primary_key=True),
+    Column("brain_type", String(64), primary_key=True),
+    Column("status", String(64), primary_key=True),
+    Column("message_hash", String(40), primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+messages_table = Table(
+    "workflow_rollup_messages",
+    rollups_metadata,
+    Column("message_hash", String(40), primary_key=True),
+    Column("message", Text, nullable=False),
+)
+
+# the rollup key each run is currently counted under, so a run that was updated moves between keys
+runs_table = Table(
+    "workflow_rollup_runs",
+    rollups_metadata,
+    Column("run_id", String(64), primary_key=True),
+    Column("day", Date, nullable=False),
+    Column("workflow_type", String(64), nullable=False),
+    Column("brain_type", String(64), nullable=False),
+    Column("status", String(64), nullable=False),
+    Column("message_hash", String(40), nullable=False),
+)
+
+watermarks_table = Table(
+    "workflow_rollup_watermarks",
+    rollups_metadata,
+    Column("name", String(64), primary_key=True),
+    Column("watermark", String(64), nullable=False),
+)
+
+ROLLUP_KEY_COLUMNS = ("day", "workflow_type", "brain_type", "status", "message_hash")
+
+
+def enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def hash_message(message: str | None) -> str:
+    if message is None:
+        return MISSING_VALUE
+    return hashlib.sha1(message.encode("utf-8")).hexdigest()
+
+
+def to_utc_day(timestamp: datetime) -> date:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def to_day_range(start_date: str | None, end_date: str | None) -> tuple[date | None, date | None]:
+    """Converts the updated_at bounds of the charts to the (inclusive) range of rollup days they cover.
+
+    Args:
+        start_date: Start of the updated_at range.
+        end_date: End of the updated_at range, a date without a time ends at the beginning of that day.
+
+    Returns:
+        The first and last days of the range, None for an open bound.
+    """
+    start_day, end_day = None, None
+    if start_date:
+        start_datetime = pd.to_datetime(start_date, utc=True)
+        start_day = start_datetime.date() + timedelta(days=int(start_datetime != start_datetime.normalize()))
+    if end_date:
+        end_datetime = pd.to_datetime(end_date, utc=True)
+        end_day = end_datetime.date() - timedelta(days=int(end_datetime == end_datetime.normalize()))
+    return start_day, end_day
+
+
+class WorkflowRollups:
+    """
+    Per day counts of workflow runs by (workflow_type, brain_type, status, message hash), maintained in a summary
+    table so the analytics charts cost O(days) instead of a scan of the runs.
+    The rollup is updated incrementally: only runs updated since the last refresh (the updated_at watermark, minus
+    ROLLUPS_LOOKBACK for late commits) are read, and each run is moved from the key it was counted under to its
+    current key.
+    """
+
+    def __init__(
+        self,
+        db_config: PostgresConfig,
+        rollups_db_url: str = ROLLUPS_DB_URL,
+        enabled: bool = ROLLUPS_ENABLED,
+    ) -> None:
+        """Initialize the rollups, the summary tables are created on the first refresh.
+
+        Args:
+            db_config: Config of the workflows database the runs are read from.
+            rollups_db_url: SQLAlchemy URL of the database holding the summary tables (PostgreSQL or SQLite).
+            enabled: Whether the rollups are used at all.
+        """
+        self.db_config = db_config
+        self.rollups_db_url = rollups_db_url
+        self.enabled = enabled
+        self._engine: Engine | None = None
+        self._refresh_lock = Lock()
+        self._ready = False
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = create_engine(self.rollups_db_url)
+        return self._engine
+
+    def is_ready(self) -> bool:
+        """Whether the rollup was refreshed successfully and can serve the charts."""
+        return self.enabled and self._ready
+
+    def refresh(self) -> None:
+        """Applies the runs updated since the watermark to the rollup, falls back to direct queries on failure."""
+        if not self.enabled:
+            return
+        with self._refresh_lock:
+            try:
+                rollups_metadata.create_all(self.engine)
+                num_runs = self._apply_updated_runs()
+                self._ready = True
+                logger.info(f"Workflow rollups refreshed with {num_runs} updated runs")
+            except Exception as e:
+                self._ready = False
+                logger.warning(f"Failed to refresh workflow rollups, querying the runs directly: {e}")
+
+    def _apply_updated_runs(self) -> int:
+        with self.engine.connect() as conn:
+            watermark = conn.execute(
+                select(watermarks_table.c.watermark).where(watermarks_table.c.name == WATERMARK_NAME)
+            ).scalar()
+
+        stmt = select(
+            WorkflowRun.id,
+            WorkflowRun.workflow_type,
+            WorkflowRun.status,
+            WorkflowRun.message,
+            WorkflowRun.updated_at,
+            Clip.brain_type,
+        ).outerjoin(Clip, WorkflowRun.clip_name == Clip.clip_name)
+        stmt = stmt.where(WorkflowRun.updated_at.isnot(None))
+        if watermark:
+            # runs updated within the lookback are read again, applying a run twice doesn't change the rollup
+            stmt = stmt.where(WorkflowRun.updated_at >= datetime.fromisoformat(watermark) - ROLLUPS_LOOKBACK)
+        stmt = stmt.order_by(WorkflowRun.updated_at).execution_options(yield_per=REFRESH_BATCH_SIZE)
+
+        num_runs = 0
+        with get_session(self.db_config) as session:
+            for batch in session.execute(stmt).partitions():
+                self._apply_batch(batch)
+                num_runs += len(batch)
+        return num_runs
+
+    def _apply_batch(self, batch: list[Any]) -> None:
+        runs, messages = {}, {}
+        for run in batch:
+            is_failed = enum_value(run.status) == enum_value(Status.FAILED)
+            message_hash = hash_message(run.message) if is_failed else MISSING_VALUE
+            if message_hash:
+                messages[message_hash] = run.message
+            runs[str(run.id)] = {
+                "day": to_utc_day(run.updated_at),
+                "workflow_type": enum_value(run.workflow_type) or MISSING_VALUE,
+                "brain_type": enum_value(run.brain_type) or MISSING_VALUE,
+                "status": enum_value(run.status) or MISSING_VALUE,
+                "message_hash": message_hash,
+            }
+        watermark = max(run.updated_at for run in batch).isoformat()
+
+        with self.engine.begin() as conn:
+            previous_keys = conn.execute(select(runs_table).where(runs_table.c.run_id.in_(list(runs)))).all()
+            deltas = Counter()
+            for previous in previous_keys:
+                deltas[tuple(getattr(previous, col) for col in ROLLUP_KEY_COLUMNS)] -= 1
+            for run_key in runs.values():
+                deltas[tuple(run_key[col] for col in ROLLUP_KEY_COLUMNS)] += 1
+
+            for key, delta in deltas.items():
+                if delta:
+                    self._add_count(conn, dict(zip(ROLLUP_KEY_COLUMNS, key)), delta)
+
+            conn.execute(runs_table.delete().where(runs_table.c.run_id.in_(list(runs))))
+            conn.execute(runs_table.insert(), [{"run_id": run_id, **run_key} for run_id, run_key in runs.items()])
+
+            known_hashes = set(
+                conn.execute(
+                    select(messages_table.c.message_hash).where(messages_table.c.message_hash.in_(list(messages)))
+                ).scalars()
+            )
+            new_messages = [
+                {"message_hash": message_hash, "message": message}
+                for message_hash, message in messages.items()
+                if message_hash not in known_hashes
+            ]
+            if new_messages:
+                conn.execute(messages_table.insert(), new_messages)
+
+            self._set_watermark(conn, watermark)
+
+    @staticmethod
+    def _add_count(conn: Any, key: dict[str, Any], delta: int) -> None:
+        conditions = [daily_rollups_table.c[col] == value for col, value in key.items()]
+        result = conn.execute(
+            update(daily_rollups_table).where(*conditions).values(count=daily_rollups_table.c.count + delta)
+        )
+        if result.rowcount == 0:
+            conn.execute(daily_rollups_table.insert().values(**key, count=delta))
+
+    @staticmethod
+    def _set_watermark(conn: Any, watermark: str) -> None:
+        result = conn.execute(
+            update(watermarks_table).where(watermarks_table.c.name == WATERMARK_NAME).values(watermark=watermark)
+        )
+        if result.rowcount == 0:
+            conn.execute(watermarks_table.insert().values(name=WATERMARK_NAME, watermark=watermark))
+
+    def get_counts(
+        self,
+        group_by: Iterable[str],
+        workflow_type: WorkflowType | None = None,
+        brain_types: Iterable[BrainType] | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        statuses: Iterable[Status] | None = None,
+        with_brain_type: bool = False,
+        with_message: bool = False,
+    ) -> list[Any]:
+        """Sums the rollup counts over the days of the date range.
+
+        Args:
+            group_by: Rollup key columns to group the counts by.
+            workflow_type: The workflow type to filter by.
+            brain_types: The brain types to filter by.
+            start_date: The start date to filter by.
+            end_date: The end date to filter by.
+            statuses: The statuses to filter by.
+            with_brain_type: Whether to count only runs of clips with a brain type.
+            with_message: Whether to count only runs with a message, the message is added to the results.
+
+        Returns:
+            Rows of the group by columns (enum values as strings) and their "count", ordered by descending count.
+        """
+        group_by_columns = [daily_rollups_table.c[col] for col in group_by]
+        count = func.sum(daily_rollups_table.c.count).label("count")
+        stmt = select(*group_by_columns, count)
+
+        conditions = []
+        if workflow_type:
+            conditions.append(daily_rollups_table.c.workflow_type == enum_value(workflow_type))
+        if brain_types:
+            conditions.append(daily_rollups_table.c.brain_type.in_([enum_value(b) for b in brain_types]))
+        if statuses:
+            conditions.append(daily_rollups_table.c.status.in_([enum_value(status) for status in statuses]))
+        start_day, end_day = to_day_range(start_date, end_date)
+        if start_day:
+            conditions.append(daily_rollups_table.c.day >= start_day)
+        if end_day:
+            conditions.append(daily_rollups_table.c.day <= end_day)
+        if with_brain_type:
+            conditions.append(daily_rollups_table.c.brain_type != MISSING_VALUE)
+        if with_message:
+            stmt = stmt.add_columns(messages_table.c.message).join(
+                messages_table, daily_rollups_table.c.message_hash == messages_table.c.message_hash
+            )
+            group_by_columns.append(messages_table.c.message)
+        if conditions:
+            stmt = stmt.where(*conditions)
+        stmt = stmt.group_by(*group_by_columns).having(count > 0).order_by(desc("count"))
+
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).all()
@@ -0,0 +1,108 @@
+"""Round trips of the array codec of the eval dashboard stores"""
+
+import builtins
+import importlib
+import json
+
+import numpy as np
+import pytest
+
+from road_dashboards.road_eval_dashboard.utils import array_codec
+from road_dashboards.road_eval_dashboard.utils.array_codec import (
+    COMPRESSION_MIN_BYTES,
+    decode_array,
+    decode_arrays,
+    encode_array,
+    encode_arrays,
+)
+
+rng = np.random.default_rng(0)
+ARRAYS = {
+    "bool": rng.random((7, 5)) > 0.5,
+    "int32": rng.integers(-1000, 1000, (6, 6), dtype=np.int32),
+    "int64": rng.integers(0, 100_000, (8, 8)),
+    "uint8": rng.integers(0, 255, 300, dtype=np.uint8),
+    "big_endian_int32": rng.integers(-5, 5, 10).astype(">i4"),
+    "float32": rng.random((3, 4, 5), dtype=np.float32),
+    "float64": rng.random((16, 16)),
+    "float64_nan": np.array([np.nan, np.inf, -np.inf, 0.0, -0.0]),
+    "large": rng.integers(0, 10, (100, 100)),
+    "0d": np.array(3.5),
+    "empty": np.empty((0, 3), dtype=np.float32),
+    "non_contiguous": rng.random((10, 10))[::2, 1::3],
+    "transposed": rng.integers(0, 10, (4, 9)).T,
+}
+COMPRESSIONS = [
+    "auto",
+    None,
+    "zlib",
+    pytest.param("lz4", marks=pytest.mark.skipif(array_codec.lz4_frame is None, reason="no lz4")),
+]
+
+
+def round_trip(encoded):
+    # as the stores: through JSON on the way to the browser and back
+    return json.loads(json.dumps(encoded))
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("name", ARRAYS)
+def test_round_trip(name, compression):
+    arr = ARRAYS[name]
+    decoded = decode_array(round_trip(encode_array(arr, compression)))
+
+    assert decoded.dtype == arr.dtype
+    assert decoded.shape == arr.shape
+    np.testing.assert_array_equal(decoded, arr)
+
+
+def test_auto_compresses_only_large_arrays():
+    small = np.zeros(COMPRESSION_MIN_BYTES // 8 - 1)
+    large = np.zeros(COMPRESSION_MIN_BYTES // 8)
+
+    assert encode_array(small)["compression"] is None
+    assert encode_array(large)["compression"] == array_codec.DEFAULT_COMPRESSION
+    assert len(encode_array(large)["data"]) < len(encode_array(large, compression=None)["data"])
+
+
+def test_decoded_arrays_are_read_only():
+    decoded = decode_array(round_trip(encode_array(ARRAYS["int64"])))
+
+    assert not decoded.flags.writeable
+    with pytest.raises(ValueError):
+        decoded[0, 0] = 1
+    copied = decoded.copy()
+    copied[0, 0] = 1
+
+
+def test_nested_round_trip():
+    mats = {"net_a": {"conf_matrix": ARRAYS["int64"], "normalize_mat": ARRAYS["float64"]}, "names": ("a", "b")}
+    decoded = decode_arrays(round_trip(encode_arrays(mats)))
+
+    np.testing.assert_array_equal(decoded["net_a"]["conf_matrix"], ARRAYS["int64"])
+    np.testing.assert_array_equal(decoded["net_a"]["normalize_mat"], ARRAYS["float64"])
+    assert decoded["names"] == ["a", "b"]
+
+
+def test_zlib_fallback_without_lz4(monkeypatch):
+    import_module = builtins.__import__
+
+    def import_without_lz4(name, *args, **kwargs):
+        if name.startswith("lz4"):
+            raise ImportError(name)
+        return import_module(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", import_without_lz4)
+    try:
+        codec = importlib.reload(array_codec)
+        assert codec.lz4_frame is None
+        assert codec.DEFAULT_COMPRESSION == "zlib"
+
+        encoded = codec.encode_array(ARRAYS["large"])
+        assert encoded["compression"] == "zlib"
+        np.testing.assert_array_equal(codec.decode_array(round_trip(encoded)), ARRAYS["large"])
+        with pytest.raises(KeyError):
+            codec.encode_array(ARRAYS["large"], compression="lz4")
+    finally:
+        monkeypatch.undo()
+        importlib.reload(array_codec)
@@ -0,0 +1,216 @@
+"""The dumps catalog access layer, against an in-memory fake of the DynamoDB resource"""
+
+import copy
+from decimal import Decimal
+from threading import Lock
+
+import pytest
+
+pytest.importorskip("boto3")
+
+from road_dashboards.road_dump_dashboard.logical_components import dump_catalog as dump_catalog_module
+from road_dashboards.road_dump_dashboard.logical_components.dump_catalog import BATCH_GET_MAX_KEYS, DumpCatalog
+
+TABLE_NAME = "dump_catalog"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeTable:
+    def __init__(self, dynamodb):
+        self.dynamodb = dynamodb
+
+    def scan(self, Segment, TotalSegments, ExclusiveStartKey=None, FilterExpression=None, page_size=2):
+        with self.dynamodb.lock:
+            self.dynamodb.scan_requests.append(Segment)
+            keys = sorted(key for i, key in enumerate(sorted(self.dynamodb.items)) if i % TotalSegments == Segment)
+            start = 0 if ExclusiveStartKey is None else keys.index(ExclusiveStartKey["dump_name"]) + 1
+            page = [copy.deepcopy(self.dynamodb.items[key]) for key in keys[start : start + page_size]]
+        response = {"Items": [item for item in page if FilterExpression is None or item["stage"] == "done"]}
+        if start + page_size < len(keys):
+            response["LastEvaluatedKey"] = {"dump_name": keys[start + page_size - 1]}
+        return response
+
+
+class FakeDynamoDB:
+    """Items of a single table, BatchGetItem leaves the keys of unprocessed_keys unprocessed on their first request"""
+
+    def __init__(self, items, unprocessed_keys=()):
+        self.items = {item["dump_name"]: item for item in items}
+        self.unprocessed_keys = set(unprocessed_keys)
+        self.batch_get_requests = []
+        self.scan_requests = []
+        self.lock = Lock()
+
+    def batch_get_item(self, RequestItems):
+        keys = [key["dump_name"] for key in RequestItems[TABLE_NAME]["Keys"]]
+        assert len(keys) <= BATCH_GET_MAX_KEYS
+        self.batch_get_requests.append(keys)
+        processed = [key for key in keys if key not in self.unprocessed_keys]
+        self.unprocessed_keys -= set(keys)
+        response = {
+            "Responses": {TABLE_NAME: [copy.deepcopy(self.items[key]) for key in processed if key in self.items]}
+        }
+        if len(processed) < len(keys):
+            unprocessed = [{"dump_name": key} for key in keys if key not in processed]
+            response["UnprocessedKeys"] = {TABLE_NAME: {"Keys": unprocessed}}
+        return response
+
+    def Table(self, table_name):
+        assert table_name == TABLE_NAME
+        return FakeTable(self)
+
+
+def make_item(i, stage="done"):
+    return {"dump_name": f"dump_{i:03d}", "stage": stage, "last_change": Decimal(i), "ratio": Decimal("0.5")}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(dump_catalog_module, "time", clock)
+    return clock
+
+
+def make_catalog(dynamodb, **kwargs):
+    return DumpCatalog(table_name=TABLE_NAME, dynamodb_factory=lambda: dynamodb, **kwargs)
+
+
+def test_get_items_are_chunked_by_batch_get_max_keys(clock):
+    dynamodb = FakeDynamoDB([make_item(i) for i in range(250)])
+    catalog = make_catalog(dynamodb)
+    keys = [f"dump_{i:03d}" for i in reversed(range(250))]
+
+    items = catalog.get_items(keys)
+
+    assert [item["dump_name"] for item in items] == keys
+    assert [len(request) for request in dynamodb.batch_get_requests] == [100, 100, 50]
+    assert items[0]["last_change"] == 249 and isinstance(items[0]["last_change"], int)
+    assert items[0]["ratio"] == 0.5
+
+
+def test_get_items_are_cached(clock):
+    dynamodb = FakeDynamoDB([make_item(i) for i in range(3)])
+    catalog = make_catalog(dynamodb, items_ttl_seconds=300)
+
+    catalog.get_items(["dump_000", "dump_001"])
+    catalog.get_items(["dump_001", "dump_002", "dump_002"])
+    assert dynamodb.batch_get_requests == [["dump_000", "dump_001"], ["dump_002"]]
+
+    clock.now += 301
+    catalog.get_item("dump_000")
+    assert dynamodb.batch_get_requests[-1] == ["dump_000"]
+
+
+def test_cached_items_are_copies(clock):
+    catalog = make_catalog(FakeDynamoDB([make_item(0)]))
+    catalog.get_item("dump_000")["stage"] = "modified"
+    assert catalog.get_item("dump_000")["stage"] == "done"
+
+
+def test_unprocessed_keys_are_retried(clock):
+    dynamodb = FakeDynamoDB([make_item(i) for i in range(5)], unprocessed_keys={"dump_001", "dump_003"})
+    catalog = make_catalog(dynamodb)
+
+    items = catalog.get_items([f"dump_{i:03d}" for i in range(5)])
+
+    assert [item["dump_name"] for item in items] == [f"dump_{i:03d}" for i in range(5)]
+    assert dynamodb.batch_get_requests[1] == ["dump_001", "dump_003"]
+
+
+def test_unprocessed_keys_after_all_retries_raise(clock, monkeypatch):
+    dynamodb = FakeDynamoDB([make_item(0)])
+    monkeypatch.setattr(
+        dynamodb, "batch_get_item", lambda RequestItems: {"Responses": {}, "UnprocessedKeys": RequestItems}
+    )
+    catalog = make_catalog(dynamodb)
+
+    with pytest.raises(RuntimeError):
+        catalog.get_item("dump_000")
+
+
+def test_missing_key_raises(clock):
+    catalog = make_catalog(FakeDynamoDB([make_item(0)]))
+    with pytest.raises(KeyError, match="dump_999"):
+        catalog.get_items(["dump_000", "dump_999"])
+
+
+@pytest.mark.parametrize("scan_segments", [1, 3])
+def test_scan_reads_all_segments_and_pages(clock, scan_segments):
+    dynamodb = FakeDynamoDB([make_item(i, stage="done" if i % 2 else "running") for i in range(11)])
+    catalog = make_catalog(dynamodb, scan_segments=scan_segments)
+
+    assert sorted(item["dump_name"] for item in catalog.scan()) == [f"dump_{i:03d}" for i in range(11)]
+    assert sorted(item["dump_name"] for item in catalog.scan(only_done=True)) == [
+        f"dump_{i:03d}" for i in range(1, 11, 2)
+    ]
+
+
+def test_scan_is_cached(clock):
+    dynamodb = FakeDynamoDB([make_item(i) for i in range(4)])
+    catalog = make_catalog(dynamodb, scan_segments=2, scan_ttl_seconds=60)
+
+    catalog.scan()
+    num_requests = len(dynamodb.scan_requests)
+    catalog.scan()
+    assert len(dynamodb.scan_requests) == num_requests
+
+    catalog.scan(only_done=True)
+    assert len(dynamodb.scan_requests) == 2 * num_requests
+
+    clock.now += 61
+    catalog.scan()
+    assert len(dynamodb.scan_requests) == 3 * num_requests
+
+
+def test_scan_refreshes_changed_items(clock):
+    dynamodb = FakeDynamoDB([make_item(0, stage="running"), make_item(1)])
+    catalog = make_catalog(dynamodb, items_ttl_seconds=300)
+    catalog.get_items(["dump_000", "dump_001"])
+
+    dynamodb.items["dump_000"].update(stage="done", last_change=Decimal(100), total_frames={"a": Decimal(7)})
+    assert catalog.get_item("dump_000")["stage"] == "running"
+
+    catalog.scan()
+    item = catalog.get_item("dump_000")
+    assert item["stage"] == "done" and item["last_change"] == 100 and item["total_frames"] == {"a": 7}
+    assert len(dynamodb.batch_get_requests) == 1
+
+
+def test_scan_does_not_extend_ttl_of_unchanged_items(clock):
+    dynamodb = FakeDynamoDB([make_item(0)])
+    catalog = make_catalog(dynamodb, items_ttl_seconds=300)
+    catalog.get_item("dump_000")
+
+    clock.now += 200
+    catalog.scan()
+    clock.now += 200
+    catalog.get_item("dump_000")
+    assert len(dynamodb.batch_get_requests) == 2
+
+
+def test_invalidate(clock):
+    dynamodb = FakeDynamoDB([make_item(0), make_item(1)])
+    catalog = make_catalog(dynamodb)
+    catalog.get_items(["dump_000", "dump_001"])
+    catalog.scan()
+    num_scan_requests = len(dynamodb.scan_requests)
+
+    catalog.invalidate(["dump_000"])
+    catalog.get_items(["dump_000", "dump_001"])
+    assert dynamodb.batch_get_requests[-1] == ["dump_000"]
+    catalog.scan()
+    assert len(dynamodb.scan_requests) == 2 * num_scan_requests
+
+    catalog.invalidate()
+    catalog.get_items(["dump_000", "dump_001"])
+    assert dynamodb.batch_get_requests[-1] == ["dump_000", "dump_001"]
@@ -0,0 +1,103 @@
+"""segment_events, against hand computed events and against generate_events_query run on SQLite"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from road_dashboards.common.event_segmentation import EVENT_COLUMNS, generate_events_query, segment_events
+
+
+def events_list(events):
+    return [tuple(row) for row in events.itertuples(index=False)]
+
+
+def test_events_break_at_clip_boundaries():
+    clip_names = ["a", "a", "a", "b", "b", "c"]
+    frames = [1, 2, 3, 4, 5, 5]
+
+    # the frames of b and c continue the previous clip's frames, but start new events
+    events = segment_events(clip_names, frames, diff_tolerance=1)
+
+    assert list(events.columns) == ["clip_name"] + EVENT_COLUMNS
+    assert events_list(events) == [("a", 1, 3, 3), ("b", 4, 5, 2), ("c", 5, 5, 1)]
+
+
+@pytest.mark.parametrize(
+    "diff_tolerance, expected",
+    [
+        (0, [("a", 1, 1, 1), ("a", 2, 2, 1), ("a", 3, 3, 1), ("a", 5, 5, 1), ("a", 8, 8, 1)]),
+        (1, [("a", 1, 3, 3), ("a", 5, 5, 1), ("a", 8, 8, 1)]),
+        (2, [("a", 1, 5, 5), ("a", 8, 8, 1)]),
+        (3, [("a", 1, 8, 8)]),
+    ],
+)
+def test_diff_tolerance(diff_tolerance, expected):
+    events = segment_events(["a"] * 5, [1, 2, 3, 5, 8], diff_tolerance=diff_tolerance)
+    assert events_list(events) == expected
+
+
+@pytest.mark.parametrize(
+    "min_event_length, max_event_length, expected_lengths",
+    [
+        (None, None, [3, 1, 4]),
+        (2, None, [3, 4]),
+        (None, 3, [3, 1]),
+        (2, 3, [3]),
+        (5, None, []),
+    ],
+)
+def test_event_length_filters(min_event_length, max_event_length, expected_lengths):
+    events = segment_events(
+        ["a", "a", "a", "a", "b", "b", "b", "b"],
+        [1, 2, 3, 7, 1, 2, 3, 4],
+        diff_tolerance=1,
+        min_event_length=min_event_length,
+        max_event_length=max_event_length,
+    )
+    assert events["event_length"].tolist() == expected_lengths
+    assert events.index.tolist() == list(range(len(expected_lengths)))
+
+
+def test_unsorted_input():
+    clip_names = ["b", "a", "b", "a", "a", "b"]
+    frames = [11, 3, 10, 1, 2, 20]
+
+    events = segment_events(clip_names, frames, diff_tolerance=1, is_sorted=False)
+
+    assert events_list(events) == [("a", 1, 3, 3), ("b", 10, 11, 2), ("b", 20, 20, 1)]
+
+
+def test_no_frames():
+    events = segment_events([], [], clip_column="clip")
+    assert events.empty
+    assert list(events.columns) == ["clip"] + EVENT_COLUMNS
+
+
+@pytest.mark.parametrize("diff_tolerance, min_event_length, max_event_length", [(0, None, None), (2, 2, 6)])
+def test_matches_events_query(diff_tolerance, min_event_length, max_event_length):
+    rng = np.random.default_rng(0)
+    frames = pd.DataFrame({"clip_name": rng.choice(["a", "b", "c"], 300), "grabindex": rng.integers(0, 200, 300)})
+    frames = frames.drop_duplicates(ignore_index=True)
+
+    events = segment_events(
+        frames["clip_name"],
+        frames["grabindex"],
+        diff_tolerance=diff_tolerance,
+        min_event_length=min_event_length,
+        max_event_length=max_event_length,
+        is_sorted=False,
+    )
+
+    query = generate_events_query(
+        "SELECT * FROM frames",
+        diff_tolerance=diff_tolerance,
+        min_event_length=min_event_length,
+        max_event_length=max_event_length,
+    )
+    with sqlite3.connect(":memory:") as conn:
+        frames.to_sql("frames", conn, index=False)
+        query_events = pd.read_sql(query, conn).sort_values(["clip_name", "startframe"], ignore_index=True)
+    assert not events.empty
+    assert events_list(events) == events_list(query_events)
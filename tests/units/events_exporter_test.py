@@ -0,0 +1,130 @@
+"""The PathNet events export against the output of the former generate_jump_file, on local files"""
+
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("cloud_storage_utils")
+
+from road_dashboards.road_eval_dashboard.components.pathnet_events_extractor.events_exporter import (
+    BufferedWriter,
+    export_events,
+    iter_events_chunks,
+)
+
+RECORDS = [
+    {"clip_name": "clip_a", "grabindex": 10, "pred.dist": 1.23456, "role": "host"},
+    {"clip_name": "clip_b", "grabindex": 20, "pred.dist": 2.5, "role": "left"},
+    {"clip_name": "clip_a", "grabindex": 30, "pred.dist": 0.1, "role": "right"},
+]
+# written by generate_jump_file for RECORDS, with the columns renamed by the jump export callback
+# and the extra fields in column order (generate_jump_file ordered them by a set)
+EXPECTED_JUMP = (
+    "clip_a 10 1.24 host\nclip_b 20 2.50 left\nclip_a 30 0.10 right\n\n#format: trackfile startframe pred_dist role\n"
+)
+# as converts_events_df_to_bookmarks_json of the events table
+EXPECTED_BOOKMARKS = [
+    ["clip_a", 10, "pred_dist=1.235; role=host"],
+    ["clip_b", 20, "pred_dist=2.5; role=left"],
+    ["clip_a", 30, "pred_dist=0.1; role=right"],
+]
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "events.jump"), str(tmp_path / "events.json")
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 10])
+def test_export_from_records(paths, chunk_rows):
+    jump_path, bookmarks_path = paths
+    num_events = export_events(iter_events_chunks(records=RECORDS, chunk_rows=chunk_rows), jump_path, bookmarks_path)
+
+    assert num_events == len(RECORDS)
+    assert read(jump_path) == EXPECTED_JUMP
+    assert read(jump_path + ".list").split("\n") == ["clip_a", "clip_b"]
+    assert json.loads(read(bookmarks_path)) == EXPECTED_BOOKMARKS
+
+
+def test_export_from_query_result_csv(tmp_path, paths):
+    jump_path, bookmarks_path = paths
+    csv_path = str(tmp_path / "result.csv")
+    pd.DataFrame(RECORDS).to_csv(csv_path, index=False)
+
+    export_events(iter_events_chunks(csv_path, chunk_rows=2), jump_path, bookmarks_path)
+
+    assert read(jump_path) == EXPECTED_JUMP
+    assert json.loads(read(bookmarks_path)) == EXPECTED_BOOKMARKS
+
+
+def test_export_without_bookmarks(paths):
+    jump_path, bookmarks_path = paths
+    export_events(iter_events_chunks(records=RECORDS), jump_path)
+
+    assert read(jump_path) == EXPECTED_JUMP
+    with pytest.raises(FileNotFoundError):
+        read(bookmarks_path)
+
+
+@pytest.mark.parametrize("max_lines", [1, 2, 3, 5])
+def test_max_lines(paths, max_lines):
+    jump_path, bookmarks_path = paths
+    num_events = export_events(
+        iter_events_chunks(records=RECORDS, chunk_rows=2), jump_path, bookmarks_path, max_lines=max_lines
+    )
+
+    num_lines = min(max_lines, len(RECORDS))
+    assert num_events == num_lines
+    expected_lines = EXPECTED_JUMP.split("\n")
+    assert read(jump_path) == "\n".join(expected_lines[:num_lines] + expected_lines[len(RECORDS) :])
+    assert json.loads(read(bookmarks_path)) == EXPECTED_BOOKMARKS[:num_lines]
+
+
+def test_events_without_clip_are_skipped(paths):
+    jump_path, bookmarks_path = paths
+    records = [{"clip_name": None, "grabindex": 5, "pred.dist": 9.0, "role": "host"}] + RECORDS
+    num_events = export_events(iter_events_chunks(records=records, chunk_rows=2), jump_path, bookmarks_path)
+
+    assert num_events == len(RECORDS)
+    assert read(jump_path) == EXPECTED_JUMP
+    assert json.loads(read(bookmarks_path)) == EXPECTED_BOOKMARKS
+
+
+def test_clipname_to_itrk_location(paths):
+    jump_path, _ = paths
+    export_events(
+        iter_events_chunks(records=RECORDS), jump_path, clipname_to_itrk_location_fn=lambda clip: f"/itrk/{clip}"
+    )
+
+    assert read(jump_path).startswith("/itrk/clip_a 10 1.24 host\n/itrk/clip_b 20 2.50 left\n")
+    assert read(jump_path + ".list").split("\n") == ["clip_a", "clip_b"]
+
+
+def test_no_events(paths):
+    jump_path, bookmarks_path = paths
+    assert export_events(iter_events_chunks(records=[]), jump_path, bookmarks_path) == 0
+
+    assert read(jump_path) == "\n#format: trackfile startframe \n"
+    assert read(jump_path + ".list") == ""
+    assert json.loads(read(bookmarks_path)) == []
+
+
+def test_buffered_writer_writes_large_blocks():
+    writes = []
+
+    class File:
+        def write(self, text):
+            writes.append(text)
+
+    writer = BufferedWriter(File(), buffer_bytes=10)
+    for _ in range(5):
+        writer.write("abcd")
+    writer.flush()
+
+    assert writes == ["abcdabcdabcd", "abcdabcd"]
@@ -0,0 +1,64 @@
+"""The workflows export files, written to and served from a directory private to the dashboard user"""
+
+import os
+
+import pandas as pd
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from road_dashboards.workflows_dashboard.components.selectors.export import export_files
+from road_dashboards.workflows_dashboard.components.selectors.export.export_files import (
+    export_files_blueprint,
+    get_export_file_url,
+    write_export_file,
+)
+
+CHUNKS = [pd.DataFrame({"clip_name": ["a", "b"], "status": ["done", None]}), pd.DataFrame({"clip_name": ["c"]})]
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    export_dir = str(tmp_path / "exports")
+    monkeypatch.setattr(export_files, "EXPORT_FILES_DIR", export_dir)
+    return export_dir
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.register_blueprint(export_files_blueprint)
+    return app.test_client()
+
+
+def test_export_file_is_written_to_a_private_dir_and_served(export_dir, client):
+    file_name, num_rows = write_export_file(iter(CHUNKS))
+
+    assert num_rows == 3
+    assert os.stat(export_dir).st_mode & 0o777 == 0o700
+    pd.testing.assert_frame_equal(
+        pd.read_csv(os.path.join(export_dir, file_name)), pd.concat(CHUNKS, ignore_index=True)
+    )
+
+    response = client.get(get_export_file_url(file_name, "runs.csv"))
+    assert response.status_code == 200
+    assert "runs.csv" in response.headers["Content-Disposition"]
+    assert client.get(get_export_file_url("../" + file_name, "runs.csv")).status_code == 404
+
+
+def test_no_rows_is_no_file(export_dir):
+    assert write_export_file(iter([])) == (None, 0)
+    assert os.listdir(export_dir) == []
+
+
+def test_export_dir_that_is_not_private_is_refused(tmp_path, export_dir, client):
+    # e.g. a fixed name under the shared temp dir, replaced by a link to a directory of another user
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir()
+    (shared_dir / f"{'0' * 32}.csv").write_text("planted")
+    os.symlink(shared_dir, export_dir)
+
+    with pytest.raises(PermissionError):
+        write_export_file(iter(CHUNKS))
+    assert os.listdir(shared_dir) == [f"{'0' * 32}.csv"]
+    assert client.get(get_export_file_url(f"{'0' * 32}.csv", "runs.csv")).status_code == 404
@@ -0,0 +1,191 @@
+"""generate_extract_events_query run on SQLite, against the former pandas subtraction of the ref events"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("road_database_toolkit")
+pytest.importorskip("boto3")
+pytest.importorskip("dash")
+
+from road_dashboards.road_eval_dashboard.components import queries_manager
+from road_dashboards.road_eval_dashboard.components.queries_manager import (
+    generate_extract_acc_events_query,
+    generate_extract_events_query,
+    generate_extract_miss_false_events_query,
+    generate_extract_ool_events_query,
+)
+
+BOOKMARKS_COLUMNS = ["clip_name", "grabindex"]
+DIST = 1.0
+SOURCE = "pred"
+
+
+def subtract_events(df_main, df_ref, metric):
+    """The subtraction of the ref events of the PathNet events extractor before it moved to SQL"""
+    if metric == "miss":
+        merge_df = df_main.merge(df_ref, how="left", indicator=True)
+        only_in_main_df = merge_df[merge_df["_merge"] == "left_only"]
+        only_in_main_df = only_in_main_df.drop(columns=["_merge"])
+        return only_in_main_df
+
+    elif metric == "false":
+        df_main_grouped = df_main.groupby(BOOKMARKS_COLUMNS).size().reset_index(name="count_main")
+        df_ref_grouped = df_ref.groupby(BOOKMARKS_COLUMNS).size().reset_index(name="count_ref")
+        frames_count_df = df_main_grouped.merge(df_ref_grouped, on=BOOKMARKS_COLUMNS, how="left")
+        frames_count_df["count_ref"] = frames_count_df["count_ref"].fillna(0)
+        frames_count_higher_in_main_df = frames_count_df[frames_count_df["count_main"] > frames_count_df["count_ref"]]
+        df_main_filtered = df_main.merge(frames_count_higher_in_main_df[BOOKMARKS_COLUMNS], on=BOOKMARKS_COLUMNS)
+        return df_main_filtered
+
+    elif metric == "inaccurate":
+        df_main_filtered = df_main.merge(
+            df_ref, on=BOOKMARKS_COLUMNS + ["matched_dp_id"], how="inner", suffixes=("", "_ref")
+        )
+        return df_main_filtered
+
+    elif metric == "out-of-lane":
+        df_main_filtered = df_main.merge(df_ref, on=BOOKMARKS_COLUMNS + ["dp_id"], how="inner", suffixes=("", "_ref"))
+        df_main_filtered.drop(columns=[c for c in df_main_filtered.columns if "closer" in c], inplace=True)
+        return df_main_filtered
+
+    else:
+        return df_main
+
+
+def make_frames(seed, num_rows=120):
+    """Rows of dps of a few clips, with repeated (clip, frame, dp) rows and rows of another population"""
+    rng = np.random.default_rng(seed)
+    frames = pd.DataFrame(
+        {
+            "clip_name": rng.choice(["clip_a", "clip_b", "clip_c", "clip_d"], num_rows),
+            "grabindex": rng.integers(0, 6, num_rows),
+            "bin_population": rng.choice([SOURCE, SOURCE, SOURCE, "other"], num_rows),
+            "dp_id": rng.integers(0, 3, num_rows).astype(float),
+            "matched_dp_id": rng.integers(0, 3, num_rows),
+            "match_score": rng.integers(0, 2, num_rows),
+            f"dist_{DIST}": rng.uniform(0, 2, num_rows),
+            f"closer_road_edge_to_dp_{DIST}": rng.integers(0, 2, num_rows),
+            f"dp_dist_from_road_edges_gt_{DIST}": rng.uniform(-2, 2, num_rows),
+            f"closer_boundary_to_dp_{DIST}": rng.integers(0, 2, num_rows),
+            f"dp_dist_from_boundaries_gt_{DIST}": rng.uniform(-2, 2, num_rows),
+        }
+    )
+    frames.loc[rng.choice(num_rows, 5, replace=False), "dp_id"] = np.nan
+    frames.loc[rng.choice(num_rows, 3, replace=False), f"dp_dist_from_road_edges_gt_{DIST}"] = 999
+    return frames
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    monkeypatch.setattr(
+        queries_manager,
+        "generate_base_query",
+        lambda data_tables, meta_data, extra_filters="", **kwargs: f"SELECT * FROM {data_tables} WHERE {extra_filters}",
+    )
+    with sqlite3.connect(":memory:") as conn:
+        make_frames(seed=0).to_sql("main_frames", conn, index=False)
+        make_frames(seed=1).to_sql("ref_frames", conn, index=False)
+        yield conn
+
+
+def source_events(metric, table, is_ref=False):
+    """The (query, event_columns, order_cmd) of a source, with the arguments of the events extractor callbacks"""
+    kwargs = dict(data_tables=table, meta_data=None, meta_data_filters="", bookmarks_columns=BOOKMARKS_COLUMNS, role="")
+    if metric == "inaccurate":
+        return generate_extract_acc_events_query(
+            **kwargs,
+            chosen_source=SOURCE,
+            dist=DIST,
+            threshold=0.5,
+            operator="<" if is_ref else ">",
+            order_by="DESC",
+        )
+    elif metric == "out-of-lane":
+        return generate_extract_ool_events_query(
+            **kwargs,
+            chosen_source=SOURCE,
+            dist=DIST,
+            threshold=0.2,
+            re_threshold=0.3,
+            operator=">" if is_ref else "<",
+            order_by="ASC",
+        )
+    return generate_extract_miss_false_events_query(**kwargs, chosen_source=SOURCE)
+
+
+def former_events_df(conn, metric, num_events, clips_unique, with_ref):
+    """The events as the extractor computed them before: each source queried, deduplicated and subtracted in pandas"""
+
+    def source_df(events):
+        query, event_columns, order_cmd = events
+        unique_columns = [column.strip('"') for column in event_columns if "dist" not in column]
+        df = pd.read_sql(f"SELECT {', '.join(event_columns)} FROM ({query}) ORDER BY {order_cmd}", conn)
+        return df.drop_duplicates(subset=unique_columns)
+
+    df = source_df(source_events(metric, "main_frames"))
+    if with_ref:
+        df = subtract_events(df, source_df(source_events(metric, "ref_frames", is_ref=True)), metric)
+    if clips_unique:
+        df = df.drop_duplicates("clip_name", keep="first")
+    return df.head(num_events).reset_index(drop=True)
+
+
+def events_df(conn, metric, num_events, clips_unique, with_ref):
+    query = generate_extract_events_query(
+        source_events(metric, "main_frames"),
+        source_events(metric, "ref_frames", is_ref=True) if with_ref else None,
+        metric=metric,
+        bookmarks_columns=BOOKMARKS_COLUMNS,
+        num_events=num_events,
+        clips_unique=clips_unique,
+    )
+    return pd.read_sql(query, conn)
+
+
+ORDER_COLUMNS = {"inaccurate": f"dist_{DIST}", "out-of-lane": f"dp_dist_from_boundaries_gt_{DIST}"}
+
+
+def sort_rows(df):
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+def assert_same_events(events, expected, metric):
+    """
+    The same rows, and the same order for the metrics ordered by a distance.
+    The order of the events of a frame (miss / false) and of the ref events joined to an event is arbitrary.
+    """
+    assert list(events.columns) == list(expected.columns)
+    assert not expected.empty
+    if metric in ORDER_COLUMNS:
+        assert events[ORDER_COLUMNS[metric]].tolist() == expected[ORDER_COLUMNS[metric]].tolist()
+    pd.testing.assert_frame_equal(sort_rows(events), sort_rows(expected), check_dtype=False)
+
+
+@pytest.mark.parametrize("metric", ["miss", "false", "inaccurate", "out-of-lane"])
+@pytest.mark.parametrize("with_ref", [False, True])
+def test_all_events_match_the_former_subtraction(conn, metric, with_ref):
+    events = events_df(conn, metric, num_events=1000, clips_unique=False, with_ref=with_ref)
+    expected = former_events_df(conn, metric, num_events=1000, clips_unique=False, with_ref=with_ref)
+    assert_same_events(events, expected, metric)
+
+
+@pytest.mark.parametrize("metric", ["inaccurate", "out-of-lane"])
+@pytest.mark.parametrize("clips_unique", [False, True])
+@pytest.mark.parametrize("with_ref", [False, True])
+def test_top_events_match_the_former_subtraction(conn, metric, clips_unique, with_ref):
+    events = events_df(conn, metric, num_events=3, clips_unique=clips_unique, with_ref=with_ref)
+    expected = former_events_df(conn, metric, num_events=3, clips_unique=clips_unique, with_ref=with_ref)
+    main_columns = [column for column in expected.columns if not column.endswith("_ref")]
+    assert_same_events(events[main_columns], expected[main_columns], metric)
+
+
+@pytest.mark.parametrize("metric", ["miss", "false"])
+@pytest.mark.parametrize("with_ref", [False, True])
+def test_clips_unique_frames_match_the_former_subtraction(conn, metric, with_ref):
+    events = events_df(conn, metric, num_events=2, clips_unique=True, with_ref=with_ref)
+    expected = former_events_df(conn, metric, num_events=2, clips_unique=True, with_ref=with_ref)
+    # the first frame of every clip, which of its dps is kept is arbitrary
+    pd.testing.assert_frame_equal(events[BOOKMARKS_COLUMNS], expected[BOOKMARKS_COLUMNS], check_dtype=False)
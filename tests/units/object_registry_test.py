@@ -0,0 +1,77 @@
+"""Eviction and expiry of the handles of the object registry"""
+
+import os
+import time
+
+import pytest
+
+from road_dashboards.common import object_registry as object_registry_module
+from road_dashboards.common.object_registry import ObjectRegistry
+
+
+def payload_paths(registry):
+    return sorted(os.path.join(registry.storage_dir, name) for name in os.listdir(registry.storage_dir))
+
+
+def age_payloads(registry, hours):
+    old = time.time() - hours * 60 * 60
+    for path in payload_paths(registry):
+        os.utime(path, (old, old))
+
+
+def test_evicted_handle_is_loaded_from_disk(tmp_path):
+    registry = ObjectRegistry(storage_dir=str(tmp_path), max_entries=2)
+    handles = [registry.register({"filter": i}) for i in range(3)]
+
+    assert len(registry) == 2
+    assert registry.get(handles[0]) == {"filter": 0}
+
+
+def test_unknown_handle_raises_key_error(tmp_path):
+    registry = ObjectRegistry(storage_dir=str(tmp_path))
+    with pytest.raises(KeyError):
+        registry.get("obj:" + "0" * 20)
+    with pytest.raises(KeyError):
+        registry.get("../../etc/passwd")
+
+
+@pytest.mark.parametrize("with_disk", [True, False])
+def test_pinned_handle_is_never_evicted(tmp_path, with_disk):
+    registry = ObjectRegistry(storage_dir=str(tmp_path) if with_disk else None, max_entries=2)
+    pinned = registry.register("default filter", pin=True)
+    for i in range(5):
+        registry.register(f"filter {i}")
+    if with_disk:
+        age_payloads(registry, hours=100)
+        registry._enforce_disk_limits()
+
+    assert registry.get(pinned) == "default filter"
+    assert registry.register("default filter") == pinned
+
+
+def test_memory_hits_keep_the_payload_from_expiring(tmp_path, monkeypatch):
+    monkeypatch.setattr(object_registry_module, "OBJECT_REGISTRY_TOUCH_INTERVAL_SECONDS", 0)
+    registry = ObjectRegistry(storage_dir=str(tmp_path), max_entries=1, ttl_hours=72)
+    unused = registry.register("unused")
+    used = registry.register("used")
+    age_payloads(registry, hours=100)
+
+    # a hit of the object in memory, which is then evicted
+    registry.get(used)
+    registry.register("other")
+    registry._enforce_disk_limits()
+
+    assert registry.get(used) == "used"
+    with pytest.raises(KeyError):
+        registry.get(unused)
+
+
+def test_disk_size_cap_removes_oldest_payloads(tmp_path):
+    registry = ObjectRegistry(storage_dir=str(tmp_path), max_entries=1, max_disk_bytes=0)
+    first = registry.register("first")
+    registry.register("second")
+    registry._enforce_disk_limits()
+
+    assert len(payload_paths(registry)) == 1
+    with pytest.raises(KeyError):
+        registry.get(first)
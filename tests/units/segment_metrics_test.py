@@ -0,0 +1,139 @@
+"""The per segment Fb of the fused segments queries, against generate_fb_query per group, both run on SQLite"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("road_database_toolkit")
+pytest.importorskip("boto3")
+pytest.importorskip("dash")
+
+from road_dashboards.road_eval_dashboard.components import queries_manager
+from road_dashboards.road_eval_dashboard.components.queries_manager import (
+    generate_fb_query,
+    generate_segments_fb_queries,
+    generate_stats_filters,
+)
+from road_dashboards.road_eval_dashboard.utils.segment_metrics import build_segments_fb, get_segments_filters
+
+SEGMENTS_GROUPS = {
+    "road_type": {"highway": "road_type = 'highway'", "urban": "road_type = 'urban'"},
+    # overlapping segments, and a filter name shared with another group
+    "curve": {"straight": "curve < 0.3", "curvy": "curve >= 0.3", "all": "TRUE"},
+    "weather": {"all": "TRUE", "rain": "weather = 'rain'"},
+}
+# Athena's UNNEST of the matching segments, as a SQLite json_each of them
+UNNEST_SEGMENTS = "FROM ({base_query})\n    CROSS JOIN UNNEST(FILTER(ARRAY[{segments}], segment -> segment IS NOT NULL)) AS t(segment)"
+SQLITE_UNNEST_SEGMENTS = (
+    "FROM (SELECT tagged.*, t.value AS segment FROM (SELECT *, json_array({segments}) AS segments "
+    "FROM ({base_query})) AS tagged CROSS JOIN json_each(tagged.segments) AS t WHERE t.value IS NOT NULL)"
+)
+
+
+def base_query(data_tables, meta_data, meta_data_filters="", role="", extra_filters="", **kwargs):
+    extra_filters = " AND ".join(ftr for ftr in [meta_data_filters, extra_filters] if ftr)
+    return (
+        f"SELECT * FROM {data_tables} WHERE TRUE {generate_stats_filters('', role=role, extra_filters=extra_filters)}"
+    )
+
+
+def make_rows(rng, num_rows, **columns):
+    return pd.DataFrame(
+        {
+            "net_id": rng.choice(["net_a", "net_b"], num_rows),
+            "role": rng.choice(["host", "next", "other"], num_rows),
+            "confidence": rng.uniform(-1, 2, num_rows).round(2),
+            "road_type": rng.choice(["highway", "urban", "rural"], num_rows),
+            "curve": rng.uniform(0, 1, num_rows).round(2),
+            "weather": rng.choice(["rain", "sun"], num_rows),
+            **columns,
+        }
+    )
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    assert UNNEST_SEGMENTS in queries_manager.SEGMENT_COUNTS_QUERY
+    monkeypatch.setattr(
+        queries_manager,
+        "SEGMENT_COUNTS_QUERY",
+        queries_manager.SEGMENT_COUNTS_QUERY.replace(UNNEST_SEGMENTS, SQLITE_UNNEST_SEGMENTS),
+    )
+    monkeypatch.setattr(queries_manager, "generate_base_query", base_query)
+    rng = np.random.default_rng(0)
+    with sqlite3.connect(":memory:") as conn:
+        make_rows(rng, 600).to_sql("gt_frames", conn, index=False)
+        make_rows(rng, 600, match_score=rng.choice([-1, 0, 0.5, 1, 2], 600)).to_sql("pred_frames", conn, index=False)
+        yield conn
+
+
+def segments_fb(conn, group, input_thresh, role, meta_data_filters):
+    recall_query, precision_query = generate_segments_fb_queries(
+        "gt_frames",
+        "pred_frames",
+        None,
+        get_segments_filters(SEGMENTS_GROUPS),
+        input_thresh=input_thresh,
+        meta_data_filters=meta_data_filters,
+    )
+    recall_counts, precision_counts = pd.read_sql(recall_query, conn), pd.read_sql(precision_query, conn)
+    return build_segments_fb(recall_counts, precision_counts, group, list(SEGMENTS_GROUPS[group]), role=role)
+
+
+def former_fb(conn, group, input_thresh, role, meta_data_filters):
+    """The Fb per meta data filter graphs data before the segments queries: one generate_fb_query per group"""
+    query = generate_fb_query(
+        "gt_frames",
+        "pred_frames",
+        None,
+        interesting_filters=SEGMENTS_GROUPS[group],
+        input_thresh=input_thresh,
+        meta_data_filters=meta_data_filters,
+        role=role,
+    )
+    data = pd.read_sql(query, conn).sort_values("net_id", ignore_index=True)
+    for filter_name in SEGMENTS_GROUPS[group]:
+        data[f"recall_{filter_name}"] = data[f"count_{filter_name}"] / data[f"overall_{filter_name}"]
+    return data
+
+
+@pytest.mark.parametrize("group", list(SEGMENTS_GROUPS))
+@pytest.mark.parametrize("input_thresh", [{}, {"net_a": 0.3, "net_b": 0.8}])
+@pytest.mark.parametrize("role", ["", "host"])
+@pytest.mark.parametrize("meta_data_filters", ["", "curve < 0.9"])
+def test_segments_fb_matches_fb_query(conn, group, input_thresh, role, meta_data_filters):
+    data = segments_fb(conn, group, input_thresh, role, meta_data_filters)
+    expected = former_fb(conn, group, input_thresh, role, meta_data_filters)
+
+    assert data["net_id"].tolist() == ["net_a", "net_b"]
+    pd.testing.assert_frame_equal(data, expected[data.columns], check_dtype=False)
+
+
+def test_threshold_filters_the_detections_and_the_predictions(conn):
+    low = segments_fb(conn, "curve", {"net_a": -1, "net_b": -1}, "", "")
+    high = segments_fb(conn, "curve", {"net_a": 1, "net_b": 1}, "", "")
+
+    # the gts are counted whatever the threshold, the detections and the predictions only above it
+    pd.testing.assert_series_equal(low["overall_all"], high["overall_all"])
+    assert (high["count_all"] < low["count_all"]).all()
+    assert (low["recall_all"] == 1).all()
+
+
+def test_missing_segment_is_zero_counts():
+    recall_counts = pd.DataFrame(
+        {"net_id": ["net_a"], "role": ["host"], "segment": ["road_type/highway"], "positive": [2], "total": [4]}
+    )
+    precision_counts = recall_counts.assign(role="next", positive=1, total=3)
+
+    data = build_segments_fb(recall_counts, precision_counts, "road_type", ["highway", "urban"])
+    host_data = build_segments_fb(recall_counts, precision_counts, "road_type", ["highway"], role="host")
+
+    row = data.to_dict("records")[0]
+    assert (row["count_highway"], row["overall_highway"], row["recall_highway"]) == (2, 4, 0.5)
+    assert row["precision_highway"] == pytest.approx(1 / 3)
+    assert (row["count_urban"], row["overall_urban"]) == (0, 0)
+    assert np.isnan(row["recall_urban"]) and np.isnan(row["precision_urban"])
+    # no host predictions, the net is dropped as by the join of generate_fb_query
+    assert host_data.empty
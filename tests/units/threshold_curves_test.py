@@ -0,0 +1,121 @@
+"""The precision / recall and ROC curves rebuilt from width_bucket histograms, against hand computed counts"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from road_dashboards.road_eval_dashboard.utils.threshold_curves import (
+    build_fb_curves,
+    build_roc_curves,
+    get_histogram_bins,
+)
+
+THRESHOLDS = np.array([0.0, 1.0, 2.0])
+
+
+def histogram(rows, thresholds=THRESHOLDS):
+    """The output of THRESHOLD_HISTOGRAM_QUERY for (net_id, label_sign, pred) rows, width_bucket as in Athena"""
+    bins = get_histogram_bins(thresholds)
+    df = pd.DataFrame(rows, columns=["net_id", "label_sign", "pred"])
+    df["bucket"] = np.where(df["pred"].isna(), np.nan, np.searchsorted(bins, df["pred"], side="right"))
+    return df.groupby(["net_id", "label_sign", "bucket"], dropna=False).size().reset_index(name="count")
+
+
+def curve(row, name, thresholds=THRESHOLDS):
+    return [row[f"{name}_{ind}"] for ind in range(len(thresholds))]
+
+
+RECALL_ROWS = [
+    # a: 7 gt rows, one of them not detected at all
+    *[("a", 1, pred) for pred in [-1.0, 0.0, 0.5, 1.0, 1.5, 2.5, None]],
+    # b: gt rows without a prediction
+    ("b", 1, None),
+    ("b", 1, None),
+    # c: no pred rows, dropped from the curves
+    ("c", 1, 0.5),
+]
+PRECISION_ROWS = [
+    *[("a", 1, pred) for pred in [0.5, 1.5, 3.0]],
+    *[("a", -1, pred) for pred in [-0.5, 0.2, 1.2]],
+    # b: a single true positive below the upper thresholds, 0 / 0 precision there
+    ("b", 1, 0.5),
+]
+
+
+def test_fb_curves():
+    data = build_fb_curves(histogram(RECALL_ROWS), histogram(PRECISION_ROWS), THRESHOLDS)
+
+    assert data["net_id"].tolist() == ["a", "b"]
+    a, b = data.to_dict("records")
+    # pred >= threshold, a value on a threshold counts as detected
+    np.testing.assert_allclose(curve(a, "recall"), [5 / 7, 3 / 7, 1 / 7])
+    np.testing.assert_allclose(curve(a, "precision"), [3 / 5, 2 / 3, 1 / 1])
+    np.testing.assert_allclose(curve(b, "recall"), [0, 0, 0])
+    np.testing.assert_allclose(curve(b, "precision"), [1, np.nan, np.nan])
+
+
+def test_fb_curves_without_gt_rows():
+    precision_rows = [("a", 1, 0.5), ("a", -1, 1.5)]
+    data = build_fb_curves(histogram([("a", -1, 0.5)]), histogram(precision_rows), THRESHOLDS)
+
+    a = data.to_dict("records")[0]
+    assert np.isnan(curve(a, "recall")).all()
+    np.testing.assert_allclose(curve(a, "precision"), [1 / 2, 0, np.nan])
+
+
+def test_roc_curves():
+    rows = [("a", 1, pred) for pred in [-1.0, 0.5, 1.0, 2.5, None]] + [("a", -1, pred) for pred in [0.0, 1.5, None]]
+    data = build_roc_curves(histogram(rows), THRESHOLDS)
+
+    a = data.to_dict("records")[0]
+    assert curve(a, "tp") == [3, 2, 1]
+    # NULL preds are neither above nor below any threshold
+    assert curve(a, "fn") == [1, 2, 3]
+    assert curve(a, "fp") == [2, 1, 0]
+    assert curve(a, "tn") == [0, 1, 2]
+
+
+def test_fb_curves_match_per_threshold_counts():
+    rng = np.random.default_rng(0)
+    thresholds = np.concatenate((np.array([-1000.0, 0.0, 0.0]), np.round(rng.uniform(-3, 3, 10), 1), [1000.0]))
+    preds = [None if rng.random() < 0.1 else round(value, 1) for value in rng.uniform(-4, 4, 500)]
+    nets = rng.choice(["a", "b", "c"], 500)
+    signs = rng.choice([1, -1], 500)
+    recall_rows = [(net, 1, pred) for net, pred in zip(nets[:250], preds[:250])]
+    precision_rows = [(net, sign, pred) for net, sign, pred in zip(nets[250:], signs[250:], preds[250:])]
+
+    data = build_fb_curves(histogram(recall_rows, thresholds), histogram(precision_rows, thresholds), thresholds)
+
+    # COUNT(CASE WHEN pred >= threshold ...) per threshold, as the former per threshold columns
+    recall = pd.DataFrame(recall_rows, columns=["net_id", "label_sign", "pred"])
+    precision = pd.DataFrame(precision_rows, columns=["net_id", "label_sign", "pred"])
+    for row in data.to_dict("records"):
+        net_recall = recall[recall["net_id"] == row["net_id"]]
+        net_precision = precision[precision["net_id"] == row["net_id"]]
+        for ind, threshold in enumerate(thresholds):
+            detected = net_precision[net_precision["pred"] >= threshold]
+            assert row[f"recall_{ind}"] == pytest.approx((net_recall["pred"] >= threshold).sum() / len(net_recall))
+            expected_precision = (detected["label_sign"] == 1).sum() / len(detected) if len(detected) else np.nan
+            assert row[f"precision_{ind}"] == pytest.approx(expected_precision, nan_ok=True)
+
+
+def test_best_thresholds():
+    pytest.importorskip("road_database_toolkit")
+    pytest.importorskip("boto3")
+    pytest.importorskip("dash")
+    from road_dashboards.road_eval_dashboard.components.queries_manager import THRESHOLDS as FB_THRESHOLDS
+    from road_dashboards.road_eval_dashboard.graphs.precision_recall_curve import calc_best_thresh
+
+    recall_rows = [("a", 1, pred) for pred in [2.5, 3.0, 3.5, None]] + [("b", 1, None)]
+    precision_rows = [("a", 1, pred) for pred in [2.5, 3.0, 3.5]] + [("a", -1, pred) for pred in [0.0, 1.0]]
+    precision_rows += [("b", -1, 0.5)]
+    data = build_fb_curves(
+        histogram(recall_rows, FB_THRESHOLDS), histogram(precision_rows, FB_THRESHOLDS), FB_THRESHOLDS
+    )
+    # as get_best_fb_per_net, no detections is a precision of 1
+    best_thresh = calc_best_thresh(data.fillna(1))
+
+    # precision 1 and recall 3 / 4 from the first threshold above the false positives up to the first true positive
+    assert best_thresh["a"] == pytest.approx(1.2)
+    # recall 0 on all thresholds, the first one
+    assert best_thresh["b"] == FB_THRESHOLDS[0]
@@ -0,0 +1,139 @@
+"""The workflow rollups against direct queries of the runs, on a small SQLite workflows database"""
+
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("road_database_toolkit")
+
+from road_database_toolkit.databases.workflows.models import Clip, WorkflowRun
+from road_database_toolkit.databases.workflows.workflow_enums import BrainType, Status, WorkflowType
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session
+
+from road_dashboards.workflows_dashboard import workflow_rollups
+from road_dashboards.workflows_dashboard.workflow_rollups import WorkflowRollups, enum_value
+
+FIRST_DAY = datetime(2024, 1, 1, tzinfo=timezone.utc)
+BRAIN_TYPES = list(BrainType)[:2]
+
+
+@pytest.fixture
+def workflows_engine(monkeypatch):
+    engine = create_engine("sqlite://")
+    Clip.__table__.create(engine)
+    WorkflowRun.__table__.create(engine)
+    monkeypatch.setattr(workflow_rollups, "get_session", lambda db_config: Session(engine))
+    return engine
+
+
+@pytest.fixture
+def rollups(tmp_path, workflows_engine):
+    return WorkflowRollups(db_config=None, rollups_db_url=f"sqlite:///{tmp_path / 'rollups.db'}", enabled=True)
+
+
+def add_runs(engine, num_runs, first_day=FIRST_DAY, updated_at=None):
+    """Adds runs spread over days, workflow types, statuses, messages and clips (some without a brain type)"""
+    workflow_types = [WorkflowType.DV, WorkflowType.GTRM]
+    with Session(engine) as session, session.begin():
+        for i in range(num_runs):
+            clip_name = f"clip_{uuid.uuid4().hex}"
+            session.add(Clip(clip_name=clip_name, brain_type=BRAIN_TYPES[i % 2] if i % 3 else None))
+            status = Status.FAILED if i % 4 == 0 else Status.SUCCESS
+            session.add(
+                WorkflowRun(
+                    id=uuid.uuid4(),
+                    clip_name=clip_name,
+                    workflow_type=workflow_types[i % 2],
+                    status=status,
+                    message=f"Error: failure {i % 3}" if status == Status.FAILED else None,
+                    updated_at=updated_at or first_day + timedelta(days=i % 5, hours=1 + i % 20),
+                )
+            )
+
+
+def direct_counts(engine, start_date=None, end_date=None, statuses=None, brain_types=None, with_message=False):
+    """The counts per (workflow_type, status[, message]) queried from the runs, as the charts do without rollups"""
+    columns = [WorkflowRun.workflow_type, WorkflowRun.status] + ([WorkflowRun.message] if with_message else [])
+    stmt = select(*columns, func.count(WorkflowRun.id)).outerjoin(Clip, WorkflowRun.clip_name == Clip.clip_name)
+    if start_date:
+        stmt = stmt.where(WorkflowRun.updated_at >= datetime.fromisoformat(start_date))
+    if end_date:
+        stmt = stmt.where(WorkflowRun.updated_at <= datetime.fromisoformat(end_date))
+    if statuses:
+        stmt = stmt.where(WorkflowRun.status.in_(statuses))
+    if brain_types:
+        stmt = stmt.where(Clip.brain_type.in_(brain_types))
+    if with_message:
+        stmt = stmt.where(WorkflowRun.message.isnot(None))
+    with Session(engine) as session:
+        rows = session.execute(stmt.group_by(*columns)).all()
+    return Counter({tuple(enum_value(value) for value in row[:-1]): row[-1] for row in rows})
+
+
+def rollup_counts(rollups, **filters):
+    with_message = filters.pop("with_message", False)
+    rows = rollups.get_counts(["workflow_type", "status"], with_message=with_message, **filters)
+    return Counter({tuple(row[:-1]) if not with_message else (*row[:2], row[3]): row[2] for row in rows})
+
+
+FILTERS = [
+    {},
+    {"start_date": "2024-01-02T00:00:00+00:00", "end_date": "2024-01-04T00:00:00+00:00"},
+    {"start_date": "2024-01-03T00:00:00+00:00"},
+    {"statuses": (Status.FAILED,), "with_message": True},
+    {"brain_types": tuple(BRAIN_TYPES[:1])},
+]
+
+
+def assert_matches_direct_counts(rollups, engine):
+    for filters in FILTERS:
+        assert rollup_counts(rollups, **filters) == direct_counts(engine, **filters), filters
+
+
+def test_rollups_match_direct_queries_after_inserts(rollups, workflows_engine):
+    add_runs(workflows_engine, 40)
+    rollups.refresh()
+    assert rollups.is_ready()
+    assert_matches_direct_counts(rollups, workflows_engine)
+
+    add_runs(workflows_engine, 25, first_day=FIRST_DAY + timedelta(days=5))
+    rollups.refresh()
+    assert_matches_direct_counts(rollups, workflows_engine)
+
+
+def test_rollups_match_direct_queries_after_status_updates(rollups, workflows_engine):
+    add_runs(workflows_engine, 40)
+    rollups.refresh()
+
+    # runs retried and finished on a later day move from their previous key
+    with Session(workflows_engine) as session, session.begin():
+        run_ids = session.scalars(select(WorkflowRun.id).where(WorkflowRun.status == Status.FAILED)).all()
+        session.execute(
+            update(WorkflowRun)
+            .where(WorkflowRun.id.in_(run_ids[::2]))
+            .values(status=Status.SUCCESS, message=None, updated_at=FIRST_DAY + timedelta(days=4, hours=23))
+        )
+    rollups.refresh()
+    assert_matches_direct_counts(rollups, workflows_engine)
+
+
+def test_refresh_is_idempotent(rollups, workflows_engine):
+    add_runs(workflows_engine, 30)
+    rollups.refresh()
+    rollups.refresh()
+    assert_matches_direct_counts(rollups, workflows_engine)
+
+
+def test_late_commit_within_lookback_is_counted(rollups, workflows_engine):
+    add_runs(workflows_engine, 10)
+    rollups.refresh()
+
+    # committed after the refresh, with an updated_at before the watermark it set
+    with Session(workflows_engine) as session:
+        watermark = session.scalar(select(func.max(WorkflowRun.updated_at)))
+    add_runs(workflows_engine, 3, updated_at=watermark - workflow_rollups.ROLLUPS_LOOKBACK / 2)
+    rollups.refresh()
+    assert_matches_direct_counts(rollups, workflows_engine)